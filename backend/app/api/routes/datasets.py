@@ -0,0 +1,41 @@
+from fastapi import APIRouter, HTTPException
+from app.services.store import diff_snapshots, store
+
+router = APIRouter()
+
+
+def _get_snapshot(version: int):
+    snapshot = store.get_snapshot(version)
+    if snapshot is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Dataset version {version} is not retained (current: {store.version})",
+        )
+    return snapshot
+
+
+@router.get("/datasets")
+def list_dataset_versions():
+    """Current dataset version and the versions retained for reads and diffs."""
+    current = store.snapshot()
+    return {
+        "current_version": current.version,
+        "retained_versions": store.history.versions(),
+    }
+
+
+@router.get("/datasets/{version}")
+def get_dataset(version: int):
+    """Products and plants exactly as they were at ``version``."""
+    snapshot = _get_snapshot(version)
+    return {
+        "version": snapshot.version,
+        "products": snapshot.product_list,
+        "plants": snapshot.plant_list,
+    }
+
+
+@router.get("/datasets/{from_version}/diff/{to_version}")
+def diff_datasets(from_version: int, to_version: int):
+    """Products and plants added, removed or changed between two versions."""
+    return diff_snapshots(_get_snapshot(from_version), _get_snapshot(to_version))
@@ -1,4 +1,5 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
+from app.services import solver_runtime
 
 router = APIRouter()
 
@@ -7,3 +8,19 @@ router = APIRouter()
 async def health_check():
     """Health check endpoint."""
     return {"status": "healthy"}
+
+
+@router.get("/ready", tags=["health"])
+async def readiness_check(response: Response):
+    """
+    Readiness check endpoint.
+
+    Returns 503 until the optimization stack is loaded and a test solve has
+    gone through the CBC binary; the first call starts that check if the
+    startup warm-up is disabled or failed.
+    """
+    state = solver_runtime.readiness()
+    if not state["ready"]:
+        solver_runtime.start_warmup()
+        response.status_code = 503
+    return {"status": "ready" if state["ready"] else "starting", **state}
@@ -0,0 +1,59 @@
+from typing import Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from app.schemas.item import PlanDiff, PlanSession, PlanSessionSummary
+from app.services import plan_export, plan_sessions
+
+router = APIRouter()
+
+
+@router.get("/plans", response_model=list[PlanSessionSummary])
+def list_plans(session_id: Optional[str] = Query(None, description="Only plans of this session")):
+    """List saved plans without their assignments."""
+    return plan_sessions.list_plans(session_id)
+
+
+@router.get("/plans/{plan_id}", response_model=PlanSession)
+def get_plan(plan_id: int):
+    """Get a saved plan with its full result."""
+    plan = plan_sessions.get_plan(plan_id)
+    if plan is None:
+        raise HTTPException(status_code=404, detail="Plan not found")
+    return plan
+
+
+@router.get("/plans/{plan_id}/export", response_class=StreamingResponse)
+def export_plan(
+    plan_id: int,
+    format: Literal["csv", "json", "arrow"] = Query("csv", description="csv, json (columnar) or arrow (IPC stream)"),
+):
+    """Stream a saved plan's assignments as CSV, columnar JSON or an Arrow IPC stream."""
+    if format == "arrow" and not plan_export.arrow_available():
+        raise HTTPException(status_code=501, detail="Arrow export requires the pyarrow package on the server")
+    chunks = plan_export.export_plan(plan_id, format)
+    if chunks is None:
+        raise HTTPException(status_code=404, detail="Plan not found")
+    media_type, extension = plan_export.EXPORT_FORMATS[format]
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="transfer_plan_{plan_id}.{extension}"'},
+    )
+
+
+@router.delete("/plans/{plan_id}", status_code=204)
+def delete_plan(plan_id: int):
+    """Delete a saved plan."""
+    if not plan_sessions.delete_plan(plan_id):
+        raise HTTPException(status_code=404, detail="Plan not found")
+    return Response(status_code=204)
+
+
+@router.get("/plans/{plan_a}/diff/{plan_b}", response_model=PlanDiff)
+def diff_plans(plan_a: int, plan_b: int):
+    """Moved products, cost and utilization deltas from plan A to plan B, without re-solving."""
+    diff = plan_sessions.diff_plans(plan_a, plan_b)
+    if diff is None:
+        raise HTTPException(status_code=404, detail="Plan not found")
+    return diff
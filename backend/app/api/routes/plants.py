@@ -1,64 +1,49 @@
 from fastapi import APIRouter, HTTPException, Response
 from app.schemas.item import Plant, PlantCreate, PlantUpdate
+from app.services.portfolio import portfolio_summary
+from app.services.store import store
 
 router = APIRouter()
 
-# In-memory storage (replace with database in production)
-plants_db = {}
-plant_counter = 0
-
 
 @router.get("/plants", response_model=list[Plant])
-async def get_plants():
+def get_plants():
     """Get all plants."""
-    return list(plants_db.values())
+    return store.plants.all()
 
 
 @router.get("/plants/{plant_id}", response_model=Plant)
-async def get_plant(plant_id: int):
+def get_plant(plant_id: int):
     """Get a specific plant by ID."""
-    if plant_id not in plants_db:
+    plant = store.plants.get(plant_id)
+    if plant is None:
         raise HTTPException(status_code=404, detail="Plant not found")
-    return plants_db[plant_id]
+    return plant
 
 
 @router.post("/plants", response_model=Plant, status_code=201)
-async def create_plant(plant: PlantCreate):
+def create_plant(plant: PlantCreate):
     """Create a new plant or update if plant_id already exists."""
-    global plant_counter
-
-    # Check if plant with same plant_id already exists
-    for existing_id, existing_plant in plants_db.items():
-        if existing_plant.plant_id == plant.plant_id:
-            # Update existing plant instead of creating duplicate
-            updated_plant = Plant(id=existing_id, **plant.model_dump())
-            plants_db[existing_id] = updated_plant
-            return updated_plant
-
-    # Create new plant
-    plant_counter += 1
-    new_plant = Plant(id=plant_counter, **plant.model_dump())
-    plants_db[plant_counter] = new_plant
-    return new_plant
+    created = store.plants.upsert(plant)
+    portfolio_summary.advance(store.snapshot())
+    return created
 
 
 @router.put("/plants/{plant_id}", response_model=Plant)
-async def update_plant(plant_id: int, plant: PlantUpdate):
+def update_plant(plant_id: int, plant: PlantUpdate):
     """Update an existing plant."""
-    if plant_id not in plants_db:
-        raise HTTPException(status_code=404, detail="Plant not found")
-
-    stored_plant = plants_db[plant_id]
     update_data = plant.model_dump(exclude_unset=True)
-    updated_plant = stored_plant.model_copy(update=update_data)
-    plants_db[plant_id] = updated_plant
+    updated_plant = store.plants.update(plant_id, update_data)
+    if updated_plant is None:
+        raise HTTPException(status_code=404, detail="Plant not found")
+    portfolio_summary.advance(store.snapshot())
     return updated_plant
 
 
 @router.delete("/plants/{plant_id}")
-async def delete_plant(plant_id: int):
+def delete_plant(plant_id: int):
     """Delete a plant."""
-    if plant_id not in plants_db:
+    if not store.plants.delete(plant_id):
         raise HTTPException(status_code=404, detail="Plant not found")
-    del plants_db[plant_id]
+    portfolio_summary.advance(store.snapshot())
     return Response(status_code=204)
@@ -1,326 +1,197 @@
-from fastapi import APIRouter, HTTPException
-from app.schemas.item import TransferPlanConfig, TransferPlanResult, TransferAssignment
-from app.api.routes.products import products_db
-from app.api.routes.plants import plants_db
-import time
-from pulp import LpProblem, LpMinimize, LpVariable, lpSum, LpStatus, LpStatusOptimal, LpStatusInfeasible, LpStatusUnbounded, LpStatusNotSolved, PULP_CBC_CMD, value
+import asyncio
+import uuid
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.schemas.item import PlanSessionCreate, PortfolioSummary, TransferPlanConfig, TransferPlanResult
+from app.services import plan_sessions
+from app.services.cbc import SolveCancelled
+from app.services.cost_matrix import cost_matrix_cache
+from app.services.plan_cache import plan_cache
+from app.services.portfolio import portfolio_summary
+from app.services.prefilter import OptimizationInputError, prefilter_pairs, size_pairs
+from app.services.scheduler import INTERACTIVE, SchedulerOverloaded, scheduler
+from app.services.solve_dedup import run_claimed, run_deduplicated, solve_key
+from app.services.solve_memory import MB, SolveTooLarge, fit_to_cap, peak_tracker
+from app.services.solver_runtime import get_optimizer
+from app.services.store import store
 
 router = APIRouter()
 
+_DISCONNECT_POLL_SECONDS = 0.5
+_WEIGHTED_OBJECTIVES = ("multi_objective", "minimize_time")
+
 
 @router.post("/transfer-plan/generate", response_model=TransferPlanResult)
-async def generate_transfer_plan(config: TransferPlanConfig):
+async def generate_transfer_plan(
+    config: TransferPlanConfig,
+    request: Request,
+    response: Response,
+    x_client_id: Optional[str] = Header(None, description="Client identity for per-client limits"),
+    x_priority: Literal["interactive", "batch"] = Header(INTERACTIVE, description="Scheduling priority"),
+    x_request_id: Optional[str] = Header(None, description="Id used to cancel the request"),
+    save_as: Optional[str] = Query(None, min_length=1, description="Save the plan under this name"),
+    session_id: Optional[str] = Query(None, description="Session the saved plan belongs to"),
+):
     """
     Generate a transfer plan recommendation using MILP/LP optimization.
 
-    Uses PuLP library to solve the optimization problem with:
-    - Binary assignment variables (MILP) or continuous (LP) based on config
-    - Demand satisfaction constraints
-    - Capacity constraints
-    - Optional budget constraints
-    - Multiple objective functions (cost minimization, utilization balancing)
-
-    Performance Optimizations:
-    - Pre-filters infeasible product-plant pairs to reduce problem size
-    - Uses CBC solver with multi-threading and aggressive strategies
-    - Caches lookup dictionaries for O(1) access
-    - Minimizes constraint generation to only feasible assignments
-    - 30-second time limit with heuristics for large problems
+    The request is first sized (feasible pair count). Exclusion what-ifs are
+    then answered from the plan cache when a cached plan is provably still
+    optimal; otherwise the nearest cached plan warm starts CBC. The request
+    is admitted by the solve scheduler: it may wait in a priority queue, or
+    be rejected with 429 and a Retry-After hint when the client or server is
+    overloaded.
+    The solve runs in a worker thread; identical concurrent requests (same
+    config, same dataset version) share a single solve, across workers when
+    storage is shared. Inside a worker only the first of them is queued: the
+    others wait for its result without taking a scheduler slot. Cancelling the request (client disconnect, or
+    ``DELETE /transfer-plan/requests/{request_id}``) kills the CBC process.
+    The whole request works on one immutable dataset snapshot, so edits made
+    while it is queued or solving never leak into the plan; the result's
+    ``dataset_version`` names that snapshot. Requests whose estimated memory
+    is over ``MAX_SOLVE_MEMORY_MB`` are solved with a cheaper formulation
+    (named in ``memory_downgrade``) or rejected with 413
+    (``SOLVE_MEMORY_POLICY``). With ``save_as`` the plan is saved as a plan
+    session and its id returned in ``plan_id``.
+    See ``app.services.optimizer.generate_plan`` for the model itself.
     """
-    start_time = time.time()
+    snapshot = await run_in_threadpool(store.snapshot)
+    version, products, plants = snapshot.version, snapshot.product_list, snapshot.plant_list
+    try:
+        sizing = await run_in_threadpool(size_pairs, products, plants, config)
+    except OptimizationInputError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    # The cap is checked on the pair count, before a tuple per pair is allocated.
+    # A downgraded request is cached (and de-duplicated) as the config actually solved.
+    cap_bytes = settings.MAX_SOLVE_MEMORY_MB * MB if settings.MAX_SOLVE_MEMORY_MB else None
+    try:
+        solve_config, estimate, downgrade_note = fit_to_cap(
+            config, sizing.pairs, products, plants, cap_bytes, settings.SOLVE_MEMORY_POLICY,
+        )
+    except SolveTooLarge as exc:
+        raise HTTPException(status_code=413, detail=str(exc))
+
+    # Cache shortcuts are only sound while the model covers the same products
+    modeled = sizing.modeled_products
+    cached = plan_cache.lookup(version, solve_config, products, modeled)
+    if cached.result is not None:
+        return await _respond(cached.result, config, downgrade_note, save_as, session_id)
+
+    request_id = x_request_id or uuid.uuid4().hex
+    if scheduler.is_active(request_id):
+        raise HTTPException(status_code=409, detail=f"Request {request_id} is already in progress")
+    response.headers["X-Request-ID"] = request_id
+    client_id = x_client_id or (request.client.host if request.client else "anonymous")
+    key = solve_key(version, solve_config)
+
+    async def lead() -> TransferPlanResult:
+        # Only the first of identical concurrent requests gets here; the others wait for its result
+        feasible_pairs = await run_in_threadpool(prefilter_pairs, products, plants, solve_config)
+        async with scheduler.slot(request_id, client_id, x_priority, len(feasible_pairs)) as ticket:
+            def solve() -> TransferPlanResult:
+                optimizer = get_optimizer()
+                with peak_tracker.track(settings.TRACE_SOLVE_MEMORY) as memory:
+                    matrix = cost_matrix_cache.get(snapshot) if solve_config.objective_function in _WEIGHTED_OBJECTIVES else None
+                    result = optimizer.generate_plan(
+                        products, plants, solve_config, feasible_pairs, ticket.token, cached.warm_start, matrix,
+                    )
+                result.dataset_version = version
+                result.estimated_memory_mb = round(estimate.bytes / MB, 1)
+                result.peak_memory_mb = memory.peak_mb
+                plan_cache.store(version, solve_config, modeled, result)
+                return result
+
+            return await scheduler.run(ticket, run_claimed(key, solve))
+
+    watcher = asyncio.ensure_future(_cancel_on_disconnect(request, request_id))
+    try:
+        result = await run_deduplicated(key, lead)
+    except SchedulerOverloaded as exc:
+        raise HTTPException(status_code=429, detail=str(exc), headers={"Retry-After": str(exc.retry_after)})
+    except SolveCancelled:
+        raise HTTPException(status_code=409, detail=f"Request {request_id} was cancelled")
+    finally:
+        watcher.cancel()
+    return await _respond(result, config, downgrade_note, save_as, session_id)
+
+
+async def _respond(
+    result: TransferPlanResult,
+    config: TransferPlanConfig,
+    downgrade_note: Optional[str],
+    save_as: Optional[str],
+    session_id: Optional[str],
+) -> TransferPlanResult:
+    """The response for this request (cached and shared results are never modified), saved when asked."""
+    if downgrade_note:
+        result = result.model_copy(update={"memory_downgrade": downgrade_note})
+    if save_as:
+        plan = PlanSessionCreate(name=save_as, session_id=session_id, config=config, result=result)
+        saved = await run_in_threadpool(plan_sessions.save_plan, plan)
+        result = result.model_copy(update={"plan_id": saved.id})
+    return result
 
-    if not products_db:
-        raise HTTPException(status_code=400, detail="No products available. Please add products first.")
 
-    if not plants_db:
-        raise HTTPException(status_code=400, detail="No plants available. Please add plants first.")
+async def _cancel_on_disconnect(request: Request, request_id: str):
+    """Cancel the solve as soon as the client goes away."""
+    while not await request.is_disconnected():
+        await asyncio.sleep(_DISCONNECT_POLL_SECONDS)
+    scheduler.cancel(request_id)
 
-    products = list(products_db.values())
-    plants = list(plants_db.values())
 
-    # Validate that all products have current plant assignments
-    products_without_plants = [p.product_id for p in products if not p.current_plant_id]
-    if products_without_plants:
-        raise HTTPException(
-            status_code=400,
-            detail=f"The following products must be assigned to a current plant before optimization: {', '.join(products_without_plants)}"
-        )
+@router.delete("/transfer-plan/requests/{request_id}", status_code=204)
+async def cancel_transfer_plan_request(request_id: str):
+    """Cancel a queued or running optimization request handled by this worker."""
+    if not scheduler.cancel(request_id):
+        raise HTTPException(status_code=404, detail="Request not found")
+    return Response(status_code=204)
 
-    # Get exclusion lists from config
-    excluded_product_ids = set(config.excluded_products or [])
-    excluded_plant_ids = set(config.excluded_plants or [])
-
-    # Filter out excluded plants from the optimization
-    available_plants = [t for t in plants if t.plant_id not in excluded_plant_ids]
-
-    # Create lookup for plant_id -> plant object
-    plant_by_plant_id = {t.plant_id: t for t in plants}
-
-    # Create the optimization problem
-    if config.objective_function == "minimize_cost":
-        prob = LpProblem("Transfer_Plan_Cost_Minimization", LpMinimize)
-    elif config.objective_function == "balance_utilization":
-        prob = LpProblem("Transfer_Plan_Utilization_Balance", LpMinimize)
-    else:
-        prob = LpProblem("Transfer_Plan_Optimization", LpMinimize)
-
-    # Pre-filter feasible assignments to reduce problem size
-    # Only create variables for product-plant pairs where the product can fit
-    feasible_pairs = []
-    for p in products:
-        # Check if product is excluded from transfer
-        if p.product_id in excluded_product_ids:
-            # Excluded product: can only stay at current plant
-            current_plant = plant_by_plant_id.get(p.current_plant_id)
-            if current_plant and current_plant.plant_id not in excluded_plant_ids:
-                effective_capacity = current_plant.available_capacity * (current_plant.effective_oee or 1.0)
-                if p.monthly_demand <= effective_capacity:
-                    feasible_pairs.append((p.id, current_plant.id))
-        else:
-            # Normal product: can go to any available plant
-            for t in available_plants:
-                effective_capacity = t.available_capacity * (t.effective_oee or 1.0)
-                # Only consider assignments where product demand fits in plant capacity
-                if p.monthly_demand <= effective_capacity:
-                    feasible_pairs.append((p.id, t.id))
-
-    # Calculate problem size reduction
-    total_possible = len(products) * len(plants)
-    reduction_pct = ((total_possible - len(feasible_pairs)) / total_possible * 100) if total_possible > 0 else 0
-
-    # Decision Variables
-    # x[p, t] = volume of product p assigned to plant t
-    if config.allow_fractional_assignment:
-        # LP: Continuous variables (allow splitting production)
-        x = LpVariable.dicts("assign",
-                           feasible_pairs,
-                           lowBound=0,
-                           cat='Continuous')
-    else:
-        # MILP: Binary assignment (all or nothing)
-        # We'll use a workaround: binary y variables + volume x variables
-        y = LpVariable.dicts("transfer",
-                           feasible_pairs,
-                           cat='Binary')
-        x = LpVariable.dicts("volume",
-                           feasible_pairs,
-                           lowBound=0,
-                           cat='Continuous')
-
-    # Create lookup dictionaries for faster access
-    product_dict = {p.id: p for p in products}
-    plant_dict = {t.id: t for t in plants}
-
-    # Objective Function: Minimize Total Cost
-    if config.objective_function == "minimize_cost":
-        # Total cost = transfer costs + monthly production costs
-        if config.allow_fractional_assignment:
-            # For fractional: Simplified - just minimize production costs
-            # (Transfer costs are relatively fixed, focus on variable costs)
-            prob += (
-                lpSum([
-                    x[product_id, plant_id] * plant_dict[plant_id].unit_production_cost
-                    for product_id, plant_id in feasible_pairs
-                ]),
-                "Total_Cost"
-            )
-        else:
-            # For binary: fixed transfer cost per assignment
-            prob += (
-                lpSum([
-                    y[product_id, plant_id] * plant_dict[plant_id].transfer_fixed_cost
-                    + x[product_id, plant_id] * plant_dict[plant_id].unit_production_cost
-                    for product_id, plant_id in feasible_pairs
-                ]),
-                "Total_Cost"
-            )
-
-    elif config.objective_function == "balance_utilization":
-        # Minimize maximum utilization across plants
-        max_util = LpVariable("max_utilization", lowBound=0, upBound=100)
-        for plant in plants:
-            effective_capacity = plant.available_capacity * (plant.effective_oee or 1.0)
-            if effective_capacity > 0:
-                # Only sum over feasible pairs for this plant
-                plant_pairs = [(p_id, t_id) for p_id, t_id in feasible_pairs if t_id == plant.id]
-                if plant_pairs:
-                    utilization = lpSum([x[p_id, t_id] for p_id, t_id in plant_pairs]) / effective_capacity * 100
-                    prob += (max_util >= utilization, f"MaxUtil_{plant.id}_{plant.plant_id}")
-        prob += max_util, "Minimize_Max_Utilization"
-
-    # Constraint 1: Demand Satisfaction
-    # Sum of assignments for each product must equal its demand
-    for product in products:
-        # Only sum over feasible pairs for this product
-        product_pairs = [(p_id, t_id) for p_id, t_id in feasible_pairs if p_id == product.id]
-        if product_pairs:
-            prob += (
-                lpSum([x[p_id, t_id] for p_id, t_id in product_pairs]) == product.monthly_demand,
-                f"Demand_{product.id}_{product.product_id}"
-            )
-
-    # Constraint 2: Capacity Constraints
-    # Total production at each plant must not exceed its effective capacity
-    for plant in plants:
-        effective_capacity = plant.available_capacity * (plant.effective_oee or 1.0)
-        # Only sum over feasible pairs for this plant
-        plant_pairs = [(p_id, t_id) for p_id, t_id in feasible_pairs if t_id == plant.id]
-        if plant_pairs:
-            prob += (
-                lpSum([x[p_id, t_id] for p_id, t_id in plant_pairs]) <= effective_capacity,
-                f"Capacity_{plant.id}_{plant.plant_id}"
-            )
-
-    # Constraint 3: Binary assignment activation (only for MILP)
-    if not config.allow_fractional_assignment:
-        for product_id, plant_id in feasible_pairs:
-            product = product_dict[product_id]
-            plant = plant_dict[plant_id]
-            # x can only be non-zero if y is 1
-            prob += (
-                x[product_id, plant_id] <= product.monthly_demand * y[product_id, plant_id],
-                f"Activation_{product_id}_{plant_id}"
-            )
-
-    # Constraint 4: Budget constraint (optional)
-    # For simplicity, budget constraint only applies to binary mode
-    if config.budget_capital and not config.allow_fractional_assignment:
-        prob += (
-            lpSum([
-                y[product_id, plant_id] * plant_dict[plant_id].transfer_fixed_cost
-                for product_id, plant_id in feasible_pairs
-            ]) <= config.budget_capital,
-            "Budget_Constraint"
-        )
 
-    # Solve the problem with CBC solver
-    # Use simple settings to avoid solver hanging issues
-    solver = PULP_CBC_CMD(
-        msg=0,              # Silent mode
-        timeLimit=10,       # 10 second time limit
-        gapRel=0.01         # Accept solutions within 1% of optimal
-    )
-
-    # Solve the problem
-    prob.solve(solver)
-
-    # Log solver status for debugging
-    print(f"Solver status: {LpStatus[prob.status]}")
-    print(f"Optimization time: {time.time() - start_time:.2f}s")
-
-    # Extract results
-    assignments = []
-    total_transfer_cost = 0
-    total_monthly_cost = 0
-    constraints_violated = []
-
-    # Accept both optimal and near-optimal solutions (solver might timeout but find good solution)
-    if prob.status == LpStatusOptimal or (prob.status == LpStatusNotSolved and value(prob.objective) is not None):
-        feasible = True
-
-        if prob.status == LpStatusNotSolved:
-            constraints_violated.append("Solver timed out - returning best solution found (may be sub-optimal)")
-
-        # Calculate plant utilizations once
-        plant_utilizations = {}
-        for plant in plants:
-            effective_capacity = plant.available_capacity * (plant.effective_oee or 1.0)
-            plant_pairs = [(p_id, t_id) for p_id, t_id in feasible_pairs if t_id == plant.id]
-            plant_total_volume = sum([value(x[p_id, t_id]) or 0 for p_id, t_id in plant_pairs])
-            plant_utilizations[plant.id] = (plant_total_volume / effective_capacity * 100) if effective_capacity > 0 else 0
-
-        # Extract assignments - only iterate over feasible pairs
-        for product_id, plant_id in feasible_pairs:
-            try:
-                volume = value(x[product_id, plant_id])
-            except:
-                volume = None
-
-            if volume and volume > 0.01:  # Threshold for numerical precision
-                product = product_dict[product_id]
-                plant = plant_dict[plant_id]
-
-                # Calculate costs
-                # Check if this is a transfer (different plant) or staying at same plant
-                is_transfer = product.current_plant_id != plant.plant_id
-
-                if config.allow_fractional_assignment:
-                    # For fractional: proportional transfer cost
-                    transfer_cost = plant.transfer_fixed_cost * (volume / product.monthly_demand) if is_transfer else 0
-                else:
-                    # For binary: full transfer cost if assigned
-                    try:
-                        is_assigned = value(y[product_id, plant_id]) > 0.5
-                    except:
-                        is_assigned = False
-                    transfer_cost = plant.transfer_fixed_cost if (is_assigned and is_transfer) else 0
-
-                monthly_cost = volume * plant.unit_production_cost
-
-                assignment = TransferAssignment(
-                    product_id=product.product_id,
-                    source_plant_id=product.current_plant_id,
-                    target_plant_id=plant.plant_id,
-                    assigned_volume=round(volume, 2),
-                    utilization=round(plant_utilizations[plant.id], 2),
-                    total_cost=round(transfer_cost + monthly_cost, 2),
-                    transfer_cost=round(transfer_cost, 2),
-                    monthly_production_cost=round(monthly_cost, 2),
-                    start_month=int(plant.lead_time_to_start) if plant.lead_time_to_start else 0
-                )
-                assignments.append(assignment)
-                total_transfer_cost += transfer_cost
-                total_monthly_cost += monthly_cost
-
-    else:
-        feasible = False
-        if prob.status == LpStatusInfeasible:
-            constraints_violated.append("Problem is infeasible - no solution satisfies all constraints")
-        elif prob.status == LpStatusUnbounded:
-            constraints_violated.append("Problem is unbounded")
-        elif prob.status == LpStatusNotSolved:
-            constraints_violated.append("Solver timed out without finding any solution")
-        else:
-            constraints_violated.append(f"Solver status: {LpStatus[prob.status]}")
-
-    # Calculate average utilization
-    if assignments:
-        # Group by plant to get unique utilizations
-        plant_utilizations = {}
-        for a in assignments:
-            plant_utilizations[a.target_plant_id] = a.utilization
-        avg_utilization = sum(plant_utilizations.values()) / len(plant_utilizations)
-    else:
-        avg_utilization = 0
-
-    optimization_time = time.time() - start_time
-
-    result = TransferPlanResult(
-        assignments=assignments,
-        total_transfer_cost=round(total_transfer_cost, 2),
-        total_monthly_cost=round(total_monthly_cost, 2),
-        total_cost=round(total_transfer_cost + total_monthly_cost, 2),
-        average_utilization=round(avg_utilization, 2),
-        feasible=feasible,
-        constraints_violated=constraints_violated,
-        optimization_time_seconds=round(optimization_time, 3)
-    )
+@router.get("/transfer-plan/cache/stats")
+async def get_plan_cache_stats():
+    """Plan cache hit counters (including how often exclusions skip the solve), cost matrix and summary reuse."""
+    return {
+        **plan_cache.stats(),
+        "cost_matrix": dict(cost_matrix_cache.stats),
+        "portfolio_summary": dict(portfolio_summary.stats),
+    }
 
-    return result
+
+@router.get("/transfer-plan/scheduler")
+async def get_scheduler_status():
+    """Current solve queue depth, limits and counters for this worker."""
+    return scheduler.status()
 
 
 @router.get("/transfer-plan/status")
-async def get_transfer_plan_status():
+def get_transfer_plan_status():
     """Get current status of products and plants for transfer planning."""
+    products_count = store.products.count()
+    plants_count = store.plants.count()
     return {
-        "products_count": len(products_db),
-        "plants_count": len(plants_db),
-        "ready_for_optimization": len(products_db) > 0 and len(plants_db) > 0
+        "products_count": products_count,
+        "plants_count": plants_count,
+        "ready_for_optimization": products_count > 0 and plants_count > 0
     }
 
 
+@router.get("/transfer-plan/summary", response_model=PortfolioSummary)
+def get_transfer_plan_summary():
+    """
+    Total demand, effective capacity and current load per plant, with quick
+    infeasibility checks (total demand over capacity, a product larger than
+    every plant, products without a plant) that need no solve. Served from
+    aggregates kept up to date on every write, in O(plants).
+    """
+    return portfolio_summary.summary(store.snapshot())
+
+
 @router.post("/transfer-plan/load-example-data")
-async def load_example_data():
+def load_example_data():
     """
     Load example data for demonstration purposes.
 
@@ -330,20 +201,6 @@ async def load_example_data():
 
     Based on the PDF requirements with realistic values.
     """
-    from app.schemas.item import Product, Plant
-    from app.api.routes.products import products_db, product_counter
-    from app.api.routes.plants import plants_db, plant_counter
-
-    global product_counter, plant_counter
-
-    # Clear existing data
-    products_db.clear()
-    plants_db.clear()
-
-    # Reset counters
-    product_counter = 0
-    plant_counter = 0
-
     # Example Products (Automotive Components)
     # Mix of high-value precision parts, mid-range components, and high-volume consumables
     example_products = [
@@ -547,17 +404,9 @@ async def load_example_data():
         }
     ]
 
-    # Add products
-    for prod_data in example_products:
-        product_counter += 1
-        new_product = Product(id=product_counter, **prod_data)
-        products_db[product_counter] = new_product
-
-    # Add plants
-    for plant_data in example_plants:
-        plant_counter += 1
-        new_plant = Plant(id=plant_counter, **plant_data)
-        plants_db[plant_counter] = new_plant
+    # Replace existing data and reset the id counters
+    store.replace_dataset(example_products, example_plants)
+    portfolio_summary.advance(store.snapshot())
 
     return {
         "message": "Example data loaded successfully",
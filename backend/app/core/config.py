@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Literal, Optional
 
 
 class Settings(BaseSettings):
@@ -23,9 +23,45 @@ class Settings(BaseSettings):
         "http://127.0.0.1:5173"
     ]
 
-    # Database Settings (example)
+    # Database Settings
+    # Unset: in-memory storage (single worker only).
+    # "sqlite:///./transfer_plan.db": shared storage for `uvicorn --workers N`.
     DATABASE_URL: Optional[str] = None
 
+    # Solve de-duplication across workers (SQLite storage only)
+    SOLVE_LOCK_TIMEOUT_SECONDS: int = 120
+    SOLVE_RESULT_TTL_SECONDS: int = 30
+
+    # Dataset versions kept (per worker) for GET /datasets/{version} and diffs
+    SNAPSHOT_HISTORY: int = 32
+
+    # Admission control for optimization requests (per worker)
+    MAX_CONCURRENT_SOLVES: Optional[int] = None  # defaults to the CPU count
+    MAX_CONCURRENT_LARGE_SOLVES: int = 1
+    LARGE_SOLVE_PAIR_THRESHOLD: int = 50_000  # feasible product-plant pairs
+    MAX_SOLVES_PER_CLIENT: int = 2
+    MAX_QUEUED_SOLVES: int = 32
+
+    # Memory cap per solve, estimated from the model size before it is built
+    # (see app.services.solve_memory). Over the cap, "downgrade" solves a cheaper
+    # formulation (assignment-only MILP, then LP relaxation) and "reject" answers 413.
+    MAX_SOLVE_MEMORY_MB: Optional[int] = 2048
+    SOLVE_MEMORY_POLICY: Literal["downgrade", "reject"] = "downgrade"
+    # Measure each solve's peak Python memory with tracemalloc (slows solves down)
+    TRACE_SOLVE_MEMORY: bool = False
+
+    # Load PuLP and verify the CBC binary in the background at startup
+    # (otherwise this happens on the first solve or /ready call)
+    SOLVER_WARMUP: bool = True
+
+    # Solved plans kept (per worker) to answer exclusion what-ifs without solving
+    PLAN_CACHE_SIZE: int = 256
+
+    # Response compression: Brotli when the brotli package is installed, else gzip
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # bytes; smaller responses are sent as is
+    GZIP_LEVEL: int = 6
+    BROTLI_QUALITY: int = 4
+
     # Security Settings
     SECRET_KEY: str = "your-secret-key-change-this-in-production"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
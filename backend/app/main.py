@@ -1,7 +1,18 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
-from app.api.routes import health, products, plants, transfer_plans
+from app.api.routes import datasets, health, plans, products, plants, transfer_plans
+from app.services import solver_runtime
+
+
+@asynccontextmanager
+async def lifespan(application: FastAPI):
+    """Warm up the solver in the background; the app serves requests meanwhile."""
+    if settings.SOLVER_WARMUP:
+        solver_runtime.start_warmup()
+    yield
 
 
 def create_application() -> FastAPI:
@@ -10,6 +21,7 @@ def create_application() -> FastAPI:
         title=settings.PROJECT_NAME,
         version=settings.VERSION,
         openapi_url=f"{settings.API_V1_STR}/openapi.json",
+        lifespan=lifespan,
     )
 
     # Set up CORS middleware
@@ -21,11 +33,21 @@ def create_application() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # Compress large responses (plans, product lists, exports)
+    application.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        gzip_level=settings.GZIP_LEVEL,
+        brotli_quality=settings.BROTLI_QUALITY,
+    )
+
     # Include routers
     application.include_router(health.router, prefix=settings.API_V1_STR)
     application.include_router(products.router, prefix=settings.API_V1_STR, tags=["products"])
     application.include_router(plants.router, prefix=settings.API_V1_STR, tags=["plants"])
     application.include_router(transfer_plans.router, prefix=settings.API_V1_STR, tags=["transfer-plans"])
+    application.include_router(datasets.router, prefix=settings.API_V1_STR, tags=["datasets"])
+    application.include_router(plans.router, prefix=settings.API_V1_STR, tags=["plans"])
 
     return application
 
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
-from datetime import date
+from typing import Literal, Optional, List
+from datetime import date, datetime
 
 
 # ==================== PRODUCT SCHEMAS ====================
@@ -65,6 +65,7 @@ class PlantBase(BaseModel):
     lead_time_to_start: Optional[float] = Field(0, ge=0, description="Time to start production (months)")
 
     # Optional data
+    available_machine_hours: Optional[float] = Field(None, ge=0, description="Available machine time (hours/month)")
     available_area_m2: Optional[float] = Field(None, ge=0, description="Available floor area (m²)")
     area_required_per_product_m2: Optional[float] = Field(None, ge=0, description="Area per product (m²)")
     labor_skill_level: Optional[str] = Field(None, description="Required labor skill level")
@@ -93,6 +94,7 @@ class PlantUpdate(BaseModel):
     transfer_fixed_cost: Optional[float] = Field(None, ge=0)
     effective_oee: Optional[float] = Field(None, ge=0, le=1)
     lead_time_to_start: Optional[float] = Field(None, ge=0)
+    available_machine_hours: Optional[float] = Field(None, ge=0)
     available_area_m2: Optional[float] = Field(None, ge=0)
     area_required_per_product_m2: Optional[float] = Field(None, ge=0)
     labor_skill_level: Optional[str] = None
@@ -119,12 +121,19 @@ class Plant(PlantBase):
 
 # ==================== TRANSFER PLAN SCHEMAS ====================
 
+class ObjectiveWeights(BaseModel):
+    """Weights of the multi_objective terms (all in $ per unit, see app.services.cost_matrix)."""
+    cost: float = Field(1.0, ge=0, description="Production + transport + expected delay cost")
+    risk: float = Field(1.0, ge=0, description="Cost scaled by the plant's risk_score")
+    time: float = Field(0.1, ge=0, description="Value of output held up by lead_time_to_start")
+
+
 class TransferPlanConfig(BaseModel):
     """Configuration for transfer plan optimization."""
     budget_capital: Optional[float] = Field(None, ge=0, description="Maximum one-time spend allowed ($)")
     transfer_deadline: Optional[date] = Field(None, description="Transfer deadline date")
     discount_rate: Optional[float] = Field(None, ge=0, le=1, description="Discount rate for NPV")
-    objective_function: str = Field(
+    objective_function: Literal["minimize_cost", "minimize_time", "balance_utilization", "multi_objective"] = Field(
         "minimize_cost",
         description="Optimization objective: minimize_cost, minimize_time, balance_utilization, multi_objective"
     )
@@ -140,6 +149,28 @@ class TransferPlanConfig(BaseModel):
         default_factory=list,
         description="Plant IDs to exclude from optimization (no transfers to/from)"
     )
+    solver_engine: Literal["auto", "milp"] = Field(
+        "auto",
+        description="auto: use dedicated engines where they apply (balance_utilization); milp: always use CBC"
+    )
+    milp_formulation: Literal["volume", "assignment"] = Field(
+        "volume",
+        description="Binary mode only. volume: binaries plus volume variables (a product may be split "
+                    "across plants); assignment: binaries only, each product goes whole to one plant"
+    )
+    objective_weights: ObjectiveWeights = Field(
+        default_factory=ObjectiveWeights,
+        description="Term weights for objective_function=multi_objective"
+    )
+    capacity_constraints: List[Literal["machine_hours", "floor_area", "pallet_storage"]] = Field(
+        default_factory=lambda: ["machine_hours", "floor_area", "pallet_storage"],
+        description="Capacity families to enforce beyond units/month (only where plants carry the data)"
+    )
+    deterministic: bool = Field(
+        False,
+        description="Reproducible solve: canonical variable order, fixed solver seeds, one thread, "
+                    "node limit instead of a time limit, no warm start"
+    )
 
 
 class TransferAssignment(BaseModel):
@@ -165,3 +196,140 @@ class TransferPlanResult(BaseModel):
     feasible: bool = Field(..., description="Whether plan is feasible")
     constraints_violated: list[str] = Field(default_factory=list, description="List of violated constraints")
     optimization_time_seconds: Optional[float] = None
+    solver_status: Optional[str] = Field(None, description="Solver status (Optimal, Infeasible, Not Solved, ...)")
+    plan_source: Optional[str] = Field(
+        None,
+        description="How the plan was produced: solve, warm_start, flow (balancing engine), or cache (no solve needed)"
+    )
+    dataset_version: Optional[int] = Field(
+        None,
+        description="Dataset snapshot the plan was solved on (see GET /datasets/{version})"
+    )
+    estimated_memory_mb: Optional[float] = Field(
+        None,
+        description="Estimated peak memory of the solve, from the model size (MB)"
+    )
+    peak_memory_mb: Optional[float] = Field(
+        None,
+        description="Measured peak Python memory of the solve (MB; only with TRACE_SOLVE_MEMORY)"
+    )
+    memory_downgrade: Optional[str] = Field(
+        None,
+        description="Why a cheaper formulation than requested was solved (over MAX_SOLVE_MEMORY_MB)"
+    )
+    fingerprint: Optional[str] = Field(
+        None,
+        description="SHA-256 of the plan content (assignments, totals, feasibility); equal plans have equal fingerprints"
+    )
+    plan_id: Optional[int] = Field(
+        None,
+        description="Id of the saved plan when the request asked to save it (see GET /plans/{plan_id})"
+    )
+
+
+# ==================== PORTFOLIO SUMMARY SCHEMAS ====================
+
+class PlantLoad(BaseModel):
+    """Capacity of one plant and the demand of the products currently made there."""
+    plant_id: str
+    effective_capacity: float = Field(..., description="available_capacity x OEE (pcs/month)")
+    target_capacity: float = Field(..., description="Effective capacity at max_utilization_target (pcs/month)")
+    current_load: float = Field(..., description="Demand of products whose current plant this is (pcs/month)")
+    current_products: int
+    current_utilization: float = Field(..., description="current_load / effective_capacity (%)")
+    headroom: float = Field(..., description="effective_capacity - current_load (pcs/month)")
+    over_target: bool
+    over_capacity: bool
+
+
+class PortfolioSummary(BaseModel):
+    """Totals and per-plant load of the current assignments, plus a quick feasibility check."""
+    dataset_version: int
+    products_count: int
+    plants_count: int
+    total_demand: float
+    total_effective_capacity: float
+    total_target_capacity: float
+    capacity_headroom: float = Field(..., description="total_effective_capacity - total_demand")
+    demand_to_capacity_pct: float
+    largest_product_demand: float
+    products_without_plant: int
+    demand_at_unknown_plants: float = Field(..., description="Demand of products whose current plant does not exist")
+    plants_over_target: int
+    plants_over_capacity: int
+    plants: list[PlantLoad]
+    infeasible: bool = Field(..., description="True when an issue below makes every plan infeasible")
+    issues: list[str] = Field(default_factory=list)
+
+
+# ==================== PLAN SESSION SCHEMAS ====================
+
+class PlanSessionCreate(BaseModel):
+    """A plan the server generated, to save (``generate?save_as=``)."""
+    name: str = Field(..., min_length=1, description="Display name of the plan")
+    session_id: Optional[str] = Field(None, description="Client-side session the plan belongs to")
+    config: TransferPlanConfig
+    result: TransferPlanResult
+
+
+class PlanSessionSummary(BaseModel):
+    """Saved plan without its assignments."""
+    id: int
+    name: str
+    session_id: Optional[str] = None
+    created_at: datetime
+    dataset_version: Optional[int] = None
+    objective_function: str
+    total_cost: float
+    total_transfer_cost: float
+    total_monthly_cost: float
+    average_utilization: float
+    feasible: bool
+    solver_status: Optional[str] = None
+    assignments_count: int
+
+
+class PlanSession(PlanSessionSummary):
+    """Saved plan with its config and full result."""
+    config: TransferPlanConfig
+    result: TransferPlanResult
+
+
+class MovedProduct(BaseModel):
+    """Product whose target plants differ between two plans."""
+    product_id: str
+    plants_a: list[str] = Field(..., description="Target plants in plan A")
+    plants_b: list[str] = Field(..., description="Target plants in plan B")
+
+
+class ProductCostDelta(BaseModel):
+    """Per-product cost change (B - A)."""
+    product_id: str
+    total_cost_a: float
+    total_cost_b: float
+    total_cost_delta: float
+
+
+class PlantDelta(BaseModel):
+    """Per-plant volume and utilization change (B - A)."""
+    plant_id: str
+    volume_a: float
+    volume_b: float
+    volume_delta: float
+    utilization_a: float
+    utilization_b: float
+    utilization_delta: float
+
+
+class PlanDiff(BaseModel):
+    """Differences between two saved plans, computed without re-solving."""
+    plan_a: int
+    plan_b: int
+    same_dataset: bool = Field(..., description="Both plans were solved on the same dataset version")
+    total_cost_delta: float
+    total_transfer_cost_delta: float
+    total_monthly_cost_delta: float
+    average_utilization_delta: float
+    moved_products: list[MovedProduct]
+    product_cost_deltas: list[ProductCostDelta]
+    plant_deltas: list[PlantDelta]
@@ -0,0 +1,227 @@
+"""
+Dedicated engine for the ``balance_utilization`` objective.
+
+Balancing is min-max load balancing: find the smallest level ``U`` such
+that every plant's load stays within ``U`` times its utilization target
+(``max_utilization_target`` % of effective capacity, never above full
+capacity) while every product's demand is served by its feasible plants.
+For a fixed ``U`` that is a max-flow feasibility check
+(source -> products -> plants -> sink), and feasibility is monotone in
+``U``, so the optimum is found by bisection.
+
+Two things keep it fast on large catalogs:
+
+- products with the same set of feasible plants are merged into a single
+  flow node carrying their total demand (the prefilter produces nested
+  plant sets, so there are at most a few hundred such classes), and
+- no binaries are needed: the MILP's assignment binaries carry no cost
+  and no one-plant-per-product constraint under this objective, so its
+  optimum is the same as this continuous relaxation.
+
+The budget constraint is not modelled here; those requests use the MILP.
+"""
+from collections import defaultdict, deque
+from typing import Optional
+
+from app.schemas.item import Plant, Product, TransferPlanConfig, TransferPlanResult
+from app.services.cbc import CancelToken
+from app.services.results import build_result
+
+# Relative precision of the bisection on U
+_TOLERANCE = 1e-9
+_EPS = 1e-9
+
+
+def utilization_target(plant: Plant) -> float:
+    """Utilization target as a fraction; a missing or zero target means 100%."""
+    return (plant.max_utilization_target or 100) / 100
+
+
+def supports(config: TransferPlanConfig) -> bool:
+    """Whether the flow engine solves exactly the model the MILP would build."""
+    if config.objective_function != "balance_utilization":
+        return False
+    if config.allow_fractional_assignment:
+        return True
+    # The MILP only applies the budget to binary assignments, and the
+    # assignment-only formulation forbids the splits the flow relaxation uses
+    return not config.budget_capital and config.milp_formulation == "volume"
+
+
+class _FlowNetwork:
+    """Dinic max-flow on float capacities."""
+
+    def __init__(self, n: int):
+        self.graph = [[] for _ in range(n)]
+        # Each edge: [to, capacity, index of reverse edge in graph[to]]
+
+    def add_edge(self, u: int, v: int, capacity: float) -> list:
+        forward = [v, capacity, len(self.graph[v])]
+        self.graph[u].append(forward)
+        self.graph[v].append([u, 0.0, len(self.graph[u]) - 1])
+        return forward
+
+    def max_flow(self, source: int, sink: int) -> float:
+        flow = 0.0
+        while True:
+            level = self._levels(source, sink)
+            if level is None:
+                return flow
+            it = [0] * len(self.graph)
+            while True:
+                pushed = self._push(source, sink, float("inf"), level, it)
+                if pushed <= _EPS:
+                    break
+                flow += pushed
+
+    def _levels(self, source: int, sink: int) -> Optional[list[int]]:
+        level = [-1] * len(self.graph)
+        level[source] = 0
+        queue = deque([source])
+        while queue:
+            u = queue.popleft()
+            for v, capacity, _ in self.graph[u]:
+                if capacity > _EPS and level[v] < 0:
+                    level[v] = level[u] + 1
+                    queue.append(v)
+        return level if level[sink] >= 0 else None
+
+    def _push(self, u: int, sink: int, limit: float, level: list[int], it: list[int]) -> float:
+        if u == sink:
+            return limit
+        edges = self.graph[u]
+        while it[u] < len(edges):
+            edge = edges[it[u]]
+            v, capacity, rev = edge
+            if capacity > _EPS and level[v] == level[u] + 1:
+                pushed = self._push(v, sink, min(limit, capacity), level, it)
+                if pushed > _EPS:
+                    edge[1] -= pushed
+                    self.graph[v][rev][1] += pushed
+                    return pushed
+            it[u] += 1
+        return 0.0
+
+
+class _BalanceModel:
+    """Products grouped into classes of identical feasible plant sets."""
+
+    def __init__(self, products: list[Product], plants: list[Plant], feasible_pairs: list[tuple[int, int]]):
+        plants_by_product = defaultdict(list)
+        for product_id, plant_id in feasible_pairs:
+            plants_by_product[product_id].append(plant_id)
+
+        # Order products and plants as given (by id from the store, by business
+        # key in deterministic mode) so the plan does not depend on pair order
+        product_rank = {p.id: i for i, p in enumerate(products)}
+        plant_rank = {t.id: i for i, t in enumerate(plants)}
+        demand = {p.id: p.monthly_demand for p in products}
+        classes = defaultdict(list)
+        for product_id, plant_ids in plants_by_product.items():
+            classes[tuple(sorted(plant_ids, key=plant_rank.get))].append(product_id)
+        self.classes = [
+            (plant_ids, sorted(members, key=product_rank.get))
+            for plant_ids, members in sorted(classes.items(), key=lambda c: [plant_rank[t] for t in c[0]])
+        ]
+        self.class_demand = [sum(demand[p] for p in members) for _, members in self.classes]
+        self.demand = demand
+        self.total_demand = sum(self.class_demand)
+
+        used = sorted({t for plant_ids, _ in self.classes for t in plant_ids}, key=plant_rank.get)
+        plant_dict = {t.id: t for t in plants}
+        self.plant_ids = used
+        self.capacity = {t: plant_dict[t].available_capacity * (plant_dict[t].effective_oee or 1.0) for t in used}
+        self.target = {t: utilization_target(plant_dict[t]) for t in used}
+
+    def max_level(self) -> float:
+        """Level at which every plant is allowed its full capacity."""
+        return max((1 / self.target[t] for t in self.plant_ids), default=1.0)
+
+    def solve_flow(self, level: float) -> tuple[float, list[list[tuple[int, list]]]]:
+        """Max flow with plant limits ``min(level * target, 1) * capacity``."""
+        n_classes = len(self.classes)
+        plant_node = {t: n_classes + i for i, t in enumerate(self.plant_ids)}
+        source = n_classes + len(self.plant_ids)
+        sink = source + 1
+        network = _FlowNetwork(sink + 1)
+
+        class_edges = []
+        for k, (plant_ids, _) in enumerate(self.classes):
+            network.add_edge(source, k, self.class_demand[k])
+            class_edges.append([(t, network.add_edge(k, plant_node[t], self.class_demand[k])) for t in plant_ids])
+        for t in self.plant_ids:
+            network.add_edge(plant_node[t], sink, min(level * self.target[t], 1.0) * self.capacity[t])
+
+        return network.max_flow(source, sink), class_edges
+
+    def feasible(self, flow: float) -> bool:
+        return flow >= self.total_demand * (1 - 1e-9) - _EPS
+
+
+def solve_balance(
+    products: list[Product],
+    plants: list[Plant],
+    config: TransferPlanConfig,
+    feasible_pairs: list[tuple[int, int]],
+    start_time: float,
+    cancel_token: Optional[CancelToken] = None,
+) -> TransferPlanResult:
+    """Minimize the maximum target-relative utilization without CBC."""
+    product_dict = {p.id: p for p in products}
+    plant_dict = {t.id: t for t in plants}
+    model = _BalanceModel(products, plants, feasible_pairs)
+
+    hi = model.max_level()
+    flow, class_edges = model.solve_flow(hi)
+    if not model.feasible(flow):
+        return build_result(
+            product_dict, plant_dict, config, {}, None,
+            feasible=False,
+            constraints_violated=["Problem is infeasible - no solution satisfies all constraints"],
+            start_time=start_time,
+            solver_status="Infeasible",
+            plan_source="flow",
+        )
+
+    # No plan can beat spreading the total demand over every target
+    lo = model.total_demand / sum(model.target[t] * model.capacity[t] for t in model.plant_ids) if model.plant_ids else 0
+    while hi - lo > _TOLERANCE * max(hi, 1e-12):
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+        mid = (lo + hi) / 2
+        mid_flow, mid_edges = model.solve_flow(mid)
+        if model.feasible(mid_flow):
+            hi, class_edges = mid, mid_edges
+        else:
+            lo = mid
+
+    volumes = _disaggregate(model, class_edges)
+    return build_result(
+        product_dict, plant_dict, config, volumes, None,
+        feasible=True,
+        constraints_violated=[],
+        start_time=start_time,
+        solver_status="Optimal",
+        plan_source="flow",
+    )
+
+
+def _disaggregate(model: _BalanceModel, class_edges: list) -> dict[tuple[int, int], float]:
+    """Split each class's plant flows back onto its products, filling in product order."""
+    volumes = {}
+    for k, ((_, members), edges) in enumerate(zip(model.classes, class_edges)):
+        # Flow on a class -> plant edge is its initial capacity (the class demand) minus what's left
+        demand = model.class_demand[k]
+        flows = deque((t, demand - edge[1]) for t, edge in edges if demand - edge[1] > _EPS)
+        for product_id in members:
+            remaining = model.demand[product_id]
+            while remaining > _EPS and flows:
+                t, available = flows[0]
+                take = min(remaining, available)
+                volumes[(product_id, t)] = volumes.get((product_id, t), 0) + take
+                remaining -= take
+                if available - take <= _EPS:
+                    flows.popleft()
+                else:
+                    flows[0] = (t, available - take)
+    return volumes
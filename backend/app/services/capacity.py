@@ -0,0 +1,166 @@
+"""
+Plant capacity model beyond units/month, as sparse per-plant rows.
+
+Each constraint family turns optional plant and product data into one row
+per plant (``sum(coef * var) <= limit``):
+
+- ``machine_hours``: units need ``cycle_time_sec / yield`` machine time and
+  each product line set up at a plant adds ``setup_time_hours``; limited by
+  ``available_machine_hours``
+- ``floor_area``: each product line at a plant occupies
+  ``area_required_per_product_m2``; limited by ``available_area_m2``
+- ``pallet_storage``: units take ``pallets_per_unit``; limited by
+  ``warehouse_capacity_pallets``
+
+A family only produces rows for plants that carry both the limit and a
+coefficient, so data sets without these fields build the same model as
+before. Terms on a product line (setup hours, floor area) use the binary
+assignment in MILP mode and the served share of demand in LP mode, the same
+convention the transfer cost uses.
+
+Rows are generated from a ``PairIndex`` (pairs grouped by product and by
+plant in a single pass), so each family costs O(feasible pairs) to build.
+Nothing here imports PuLP: the prefilter uses the same coefficients to drop
+pairs that can never fit.
+"""
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Optional
+
+from app.schemas.item import Plant, Product, TransferPlanConfig
+
+Pair = tuple[int, int]
+
+
+class PairIndex:
+    """Feasible (product.id, plant.id) pairs grouped by product and by plant."""
+
+    def __init__(self, feasible_pairs: list[Pair]):
+        self.by_product: dict[int, list[Pair]] = defaultdict(list)
+        self.by_plant: dict[int, list[Pair]] = defaultdict(list)
+        for pair in feasible_pairs:
+            self.by_product[pair[0]].append(pair)
+            self.by_plant[pair[1]].append(pair)
+
+
+@dataclass
+class CapacityRow:
+    """``sum(volume_terms * x) + sum(assignment_terms * y) <= limit`` for one plant."""
+    family: str
+    plant: Plant
+    limit: float
+    volume_terms: dict[Pair, float] = field(default_factory=dict)
+    assignment_terms: dict[Pair, float] = field(default_factory=dict)
+
+
+def machine_hours_per_unit(product: Product) -> float:
+    """Machine hours per good unit: cycle time inflated by the scrap rate."""
+    if not product.cycle_time_sec:
+        return 0.0
+    return product.cycle_time_sec / 3600 / ((product.yield_rate or 100) / 100)
+
+
+def one_time_cost(plant: Plant) -> float:
+    """One-time cost of moving a product line to ``plant``: transfer plus changeover."""
+    return plant.transfer_fixed_cost + (plant.changeover_cost or 0)
+
+
+def family_terms(family: str, plant: Plant, timed_products: bool) -> int:
+    """
+    Coefficients per pair ``family`` puts in ``plant``'s row; 0 when the plant gets no row.
+
+    A family needs the plant's limit and at least one coefficient: setup
+    hours or product cycle times (``timed_products``: some product has
+    one), the area per product line, or pallets per unit. Both the model
+    builder and the memory estimate decide with this.
+    """
+    if family == "machine_hours":
+        if plant.available_machine_hours is None:
+            return 0
+        return int(timed_products) + int(bool(plant.setup_time_hours))
+    if family == "floor_area":
+        return int(plant.available_area_m2 is not None and bool(plant.area_required_per_product_m2))
+    if family == "pallet_storage":
+        return int(plant.warehouse_capacity_pallets is not None and bool(plant.pallets_per_unit))
+    raise ValueError(f"Unknown capacity family: {family}")
+
+
+def has_timed_products(products: list[Product]) -> bool:
+    """Whether any product needs machine time per unit."""
+    return any(machine_hours_per_unit(p) for p in products)
+
+
+def _machine_hours(plant: Plant, pairs: list[Pair], products: dict[int, Product]) -> Optional[CapacityRow]:
+    row = CapacityRow("machine_hours", plant, plant.available_machine_hours)
+    for pair in pairs:
+        hours = machine_hours_per_unit(products[pair[0]])
+        if hours:
+            row.volume_terms[pair] = hours
+        if plant.setup_time_hours:
+            row.assignment_terms[pair] = plant.setup_time_hours
+    return row if row.volume_terms or row.assignment_terms else None
+
+
+def _floor_area(plant: Plant, pairs: list[Pair], products: dict[int, Product]) -> Optional[CapacityRow]:
+    return CapacityRow(
+        "floor_area", plant, plant.available_area_m2,
+        assignment_terms={pair: plant.area_required_per_product_m2 for pair in pairs},
+    )
+
+
+def _pallet_storage(plant: Plant, pairs: list[Pair], products: dict[int, Product]) -> Optional[CapacityRow]:
+    return CapacityRow(
+        "pallet_storage", plant, plant.warehouse_capacity_pallets,
+        volume_terms={pair: plant.pallets_per_unit for pair in pairs},
+    )
+
+
+CAPACITY_FAMILIES = {
+    "machine_hours": _machine_hours,
+    "floor_area": _floor_area,
+    "pallet_storage": _pallet_storage,
+}
+
+
+def capacity_rows(
+    products: list[Product],
+    plants: list[Plant],
+    config: TransferPlanConfig,
+    index: PairIndex,
+) -> list[CapacityRow]:
+    """Rows of every enabled family; in LP mode product-line terms move onto volumes."""
+    product_dict = {p.id: p for p in products}
+    timed = has_timed_products(products)
+    rows = []
+    for family in config.capacity_constraints:
+        build = CAPACITY_FAMILIES[family]
+        for plant in plants:
+            pairs = index.by_plant.get(plant.id)
+            if not pairs or not family_terms(family, plant, timed):
+                continue
+            row = build(plant, pairs, product_dict)
+            if row is None:
+                continue
+            if config.allow_fractional_assignment:
+                for pair, coef in row.assignment_terms.items():
+                    share = coef / product_dict[pair[0]].monthly_demand
+                    row.volume_terms[pair] = row.volume_terms.get(pair, 0) + share
+                row.assignment_terms = {}
+            rows.append(row)
+    return rows
+
+
+def fits(product: Product, plant: Plant, config: TransferPlanConfig) -> bool:
+    """Whether the product's full demand fits ``plant`` on every enabled family."""
+    families = config.capacity_constraints
+    if "machine_hours" in families and plant.available_machine_hours is not None:
+        needed = product.monthly_demand * machine_hours_per_unit(product) + (plant.setup_time_hours or 0)
+        if needed > plant.available_machine_hours:
+            return False
+    if "floor_area" in families and plant.available_area_m2 is not None:
+        if (plant.area_required_per_product_m2 or 0) > plant.available_area_m2:
+            return False
+    if "pallet_storage" in families and plant.warehouse_capacity_pallets is not None:
+        if product.monthly_demand * (plant.pallets_per_unit or 0) > plant.warehouse_capacity_pallets:
+            return False
+    return True
@@ -0,0 +1,101 @@
+"""
+Cancellable CBC solves.
+
+PuLP runs CBC through ``subprocess.Popen`` and blocks on ``wait()`` without
+exposing the process, so a cancelled request would otherwise keep burning a
+CPU until the time limit. ``solve_problem`` records the CBC process started
+by the current thread on a ``CancelToken``; ``CancelToken.cancel()`` kills it
+and the solve raises ``SolveCancelled``.
+
+Nothing here imports PuLP at module level, so the scheduler and the routes
+can use ``CancelToken`` without loading the optimization stack.
+"""
+import subprocess
+import threading
+from typing import Optional
+
+
+class SolveCancelled(Exception):
+    """Raised when a solve was cancelled before or while CBC was running."""
+
+
+class CancelToken:
+    """Thread-safe cancellation flag that also owns the running CBC process."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._process: Optional[subprocess.Popen] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self):
+        with self._lock:
+            self._event.set()
+            if self._process is not None and self._process.poll() is None:
+                self._process.kill()
+
+    def raise_if_cancelled(self):
+        if self.cancelled:
+            raise SolveCancelled()
+
+    def _attach(self, process: subprocess.Popen):
+        with self._lock:
+            self._process = process
+            if self._event.is_set():
+                process.kill()
+
+
+_current = threading.local()
+
+
+class _TrackedPopen(subprocess.Popen):
+    """Popen that registers itself on the calling thread's CancelToken."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        token = getattr(_current, "token", None)
+        if token is not None:
+            token._attach(self)
+
+
+class _SubprocessProxy:
+    """Stands in for the ``subprocess`` module inside ``pulp.apis.coin_api``."""
+
+    Popen = _TrackedPopen
+
+    def __getattr__(self, name):
+        return getattr(subprocess, name)
+
+
+def _install_process_tracking():
+    # coin_api looks up ``subprocess.Popen`` at call time, so swapping the module
+    # reference once is enough; threads without a token behave exactly as before.
+    from pulp.apis import coin_api
+
+    if not isinstance(coin_api.subprocess, _SubprocessProxy):
+        coin_api.subprocess = _SubprocessProxy()
+
+
+def solve_problem(prob, solver, cancel_token: Optional[CancelToken] = None):
+    """``prob.solve(solver)`` that honours ``cancel_token``."""
+    from pulp import PulpSolverError
+
+    if cancel_token is None:
+        return prob.solve(solver)
+
+    _install_process_tracking()
+    cancel_token.raise_if_cancelled()
+    _current.token = cancel_token
+    try:
+        status = prob.solve(solver)
+    except PulpSolverError:
+        # A killed CBC exits non-zero, which PuLP reports as a solver error
+        cancel_token.raise_if_cancelled()
+        raise
+    finally:
+        _current.token = None
+    cancel_token.raise_if_cancelled()
+    return status
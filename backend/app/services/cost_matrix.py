@@ -0,0 +1,129 @@
+"""
+Product x plant effective-cost matrix for the weighted objectives.
+
+For every product ``p`` and plant ``t`` the matrix holds, per unit:
+
+- ``cost``: production (``unit_production_cost``) + interplant transport
+  (``interplant_transport_cost_per_unit`` when ``t`` is not the product's
+  current plant) + expected delay cost (``probability_of_delay`` x
+  ``delay_cost_per_day`` x ``lead_time_days`` per month of a product line,
+  spread over the product's monthly demand)
+- ``time``: months to start production (``lead_time_to_start``) times the
+  product's current unit cost, i.e. the value of output held up by a move
+  (0 at the current plant)
+
+plus a per-plant ``risk_score``. ``objective_coefficients`` combines them
+with the request's weights in one pass over the feasible pairs:
+``w_cost * cost + w_risk * risk * cost + w_time * time``.
+
+Rows are ``array('d')`` columns in plant order. ``CostMatrixCache`` keeps
+the matrix of the latest snapshot and, on a new snapshot, recomputes only
+the rows of added or changed products (or everything when plants changed,
+since every row has a column per plant).
+"""
+import threading
+from array import array
+from dataclasses import dataclass
+from typing import Optional
+
+from app.schemas.item import ObjectiveWeights, Plant, Product
+from app.services.store import DatasetSnapshot
+
+# Weights used by objective_function="minimize_time": time first, cost breaks ties
+MINIMIZE_TIME_WEIGHTS = ObjectiveWeights(cost=1e-3, risk=0.0, time=1.0)
+
+
+def expected_delay_cost(plant: Plant) -> float:
+    """Expected delay cost of one product line at ``plant`` per month ($)."""
+    return (plant.probability_of_delay or 0) * (plant.delay_cost_per_day or 0) * (plant.lead_time_days or 1)
+
+
+def _row(product: Product, plants: list[Plant]) -> tuple[array, array]:
+    cost, time = array("d"), array("d")
+    for t in plants:
+        moved = t.plant_id != product.current_plant_id
+        transport = (t.interplant_transport_cost_per_unit or 0) if moved else 0
+        cost.append(t.unit_production_cost + transport + expected_delay_cost(t) / product.monthly_demand)
+        time.append((t.lead_time_to_start or 0) * product.current_unit_cost if moved else 0)
+    return cost, time
+
+
+@dataclass(frozen=True)
+class CostMatrix:
+    """Per-unit cost and time by (product.id, plant.id); built for one dataset version."""
+    version: Optional[int]
+    columns: dict[int, int]
+    risk: array
+    cost: dict[int, array]
+    time: dict[int, array]
+
+    @classmethod
+    def build(cls, products: list[Product], plants: list[Plant], version: Optional[int] = None) -> "CostMatrix":
+        cost, time = {}, {}
+        for p in products:
+            cost[p.id], time[p.id] = _row(p, plants)
+        return cls(
+            version,
+            {t.id: i for i, t in enumerate(plants)},
+            array("d", (t.risk_score or 0 for t in plants)),
+            cost,
+            time,
+        )
+
+    def updated(self, snapshot: DatasetSnapshot, product_ids: list[int], removed: list[int]) -> "CostMatrix":
+        """Copy of this matrix with the rows of ``product_ids`` recomputed and ``removed`` dropped."""
+        cost, time = dict(self.cost), dict(self.time)
+        plants = snapshot.plant_list
+        for product_id in removed:
+            cost.pop(product_id, None)
+            time.pop(product_id, None)
+        for product_id in product_ids:
+            cost[product_id], time[product_id] = _row(snapshot.products[product_id], plants)
+        return CostMatrix(snapshot.version, self.columns, self.risk, cost, time)
+
+    def objective_coefficients(self, pairs: list[tuple[int, int]], weights: ObjectiveWeights) -> list[float]:
+        """Per-unit objective coefficient of each (product.id, plant.id) pair."""
+        columns, risk, cost, time = self.columns, self.risk, self.cost, self.time
+        w_cost, w_risk, w_time = weights.cost, weights.risk, weights.time
+        coefficients = []
+        for product_id, plant_id in pairs:
+            j = columns[plant_id]
+            c = cost[product_id][j]
+            coefficients.append(c * (w_cost + w_risk * risk[j]) + w_time * time[product_id][j])
+        return coefficients
+
+
+class CostMatrixCache:
+    """The matrix of the most recent snapshot, updated incrementally."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot: Optional[DatasetSnapshot] = None
+        self._matrix: Optional[CostMatrix] = None
+        self.stats = {"hits": 0, "full_builds": 0, "incremental_updates": 0, "rows_recomputed": 0}
+
+    def get(self, snapshot: DatasetSnapshot) -> CostMatrix:
+        with self._lock:
+            previous, matrix = self._snapshot, self._matrix
+            if matrix is not None and previous.version == snapshot.version:
+                self.stats["hits"] += 1
+                return matrix
+
+            plants_changed = previous is None or any(previous.plants.changed_ids(snapshot.plants))
+            if plants_changed:
+                matrix = CostMatrix.build(snapshot.product_list, snapshot.plant_list, snapshot.version)
+                self.stats["full_builds"] += 1
+                self.stats["rows_recomputed"] += len(snapshot.products)
+            else:
+                added, removed, changed = previous.products.changed_ids(snapshot.products)
+                matrix = matrix.updated(snapshot, added + changed, removed)
+                self.stats["incremental_updates"] += 1
+                self.stats["rows_recomputed"] += len(added) + len(changed)
+
+            # Only move forward; an older snapshot still gets its matrix but is not kept
+            if previous is None or snapshot.version > previous.version:
+                self._snapshot, self._matrix = snapshot, matrix
+            return matrix
+
+
+cost_matrix_cache = CostMatrixCache()
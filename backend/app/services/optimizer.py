@@ -0,0 +1,398 @@
+"""Transfer plan optimization (MILP/LP) built on PuLP and the CBC solver."""
+import time
+from dataclasses import dataclass
+from typing import Optional
+from pulp import LpAffineExpression, LpConstraint, LpConstraintEQ, LpConstraintLE, LpProblem, LpMinimize, LpVariable, LpStatus, LpStatusOptimal, LpStatusInfeasible, LpStatusUnbounded, LpStatusNotSolved, PULP_CBC_CMD, value
+from app.schemas.item import Plant, Product, TransferPlanConfig, TransferPlanResult
+from app.services.prefilter import prefilter_pairs
+from app.services.balance import solve_balance, supports as balance_engine_supports, utilization_target
+from app.services.capacity import CapacityRow, PairIndex, capacity_rows, one_time_cost
+from app.services.cbc import CancelToken, solve_problem
+from app.services.cost_matrix import MINIMIZE_TIME_WEIGHTS, CostMatrix
+from app.services.results import build_result
+
+# Deterministic mode: fixed CBC seeds, one thread and a node limit, so the
+# search does not depend on machine speed; the time limit is only a backstop
+DETERMINISTIC_SEED = 1234567
+DETERMINISTIC_MAX_NODES = 100_000
+DETERMINISTIC_TIME_LIMIT = 120
+
+
+def generate_plan(
+    products: list[Product],
+    plants: list[Plant],
+    config: TransferPlanConfig,
+    feasible_pairs: Optional[list[tuple[int, int]]] = None,
+    cancel_token: Optional[CancelToken] = None,
+    warm_start: Optional[TransferPlanResult] = None,
+    cost_matrix: Optional[CostMatrix] = None,
+) -> TransferPlanResult:
+    """
+    Generate a transfer plan recommendation using MILP/LP optimization.
+
+    Uses PuLP library to solve the optimization problem with:
+    - Binary assignment variables (MILP) or continuous (LP) based on config
+    - Demand satisfaction constraints
+    - Capacity constraints (units, plus machine hours, floor area and pallet
+      storage where the plants carry that data; see ``app.services.capacity``)
+    - Optional budget constraints
+    - Multiple objective functions (cost minimization, utilization balancing,
+      time-to-production, weighted cost/risk/time multi-objective)
+
+    Performance Optimizations:
+    - Pre-filters infeasible product-plant pairs to reduce problem size
+    - Uses CBC solver with multi-threading and aggressive strategies
+    - Caches lookup dictionaries for O(1) access
+    - Minimizes constraint generation to only feasible assignments
+    - Builds every constraint from a pair index as a sparse coefficient list
+      (O(feasible pairs) per constraint family)
+    - 30-second time limit with heuristics for large problems
+
+    This is a blocking call (CBC runs as a subprocess); async callers should
+    run it in a worker thread. ``feasible_pairs`` may be passed in when the
+    caller already ran ``prefilter_pairs``; ``cancel_token`` kills CBC.
+    ``warm_start`` is a previous plan whose assignments seed CBC's initial
+    MIP solution (binary mode only). ``cost_matrix`` is the cached
+    effective-cost matrix for the weighted objectives (built on the fly when
+    omitted).
+
+    With ``config.deterministic`` products, plants and pairs are put in
+    canonical order (sorted by product_id / plant_id, independent of
+    database ids and insertion order), variables are named by that order,
+    no warm start is used and CBC runs with fixed seeds on one thread under
+    a node limit, so identical inputs give identical plans.
+    """
+    start_time = time.time()
+
+    if feasible_pairs is None:
+        feasible_pairs = prefilter_pairs(products, plants, config)
+    if config.deterministic:
+        products, plants, feasible_pairs = canonical_order(products, plants, feasible_pairs)
+        warm_start = None
+
+    index = PairIndex(feasible_pairs)
+    extra_rows = capacity_rows(products, plants, config, index)
+
+    # Utilization balancing is a min-max flow problem; skip CBC entirely
+    # (the flow network only knows units/month, so not with extra capacity rows)
+    if config.solver_engine == "auto" and balance_engine_supports(config) and not extra_rows:
+        return solve_balance(products, plants, config, feasible_pairs, start_time, cancel_token)
+
+    # Create lookup dictionaries for faster access
+    product_dict = {p.id: p for p in products}
+    plant_dict = {t.id: t for t in plants}
+
+    model = build_problem(products, plants, config, feasible_pairs, index, extra_rows, warm_start, cost_matrix)
+    prob, y, use_warm_start = model.prob, model.y, model.use_warm_start
+
+    # Solve the problem with CBC solver
+    # Use simple settings to avoid solver hanging issues
+    if config.deterministic:
+        solver = PULP_CBC_CMD(
+            msg=0,
+            timeLimit=DETERMINISTIC_TIME_LIMIT,
+            gapRel=0.01,
+            threads=1,
+            options=[
+                f"randomSeed {DETERMINISTIC_SEED}",
+                f"randomCbcSeed {DETERMINISTIC_SEED}",
+                f"maxNodes {DETERMINISTIC_MAX_NODES}",
+            ],
+        )
+    else:
+        solver = PULP_CBC_CMD(
+            msg=0,              # Silent mode
+            timeLimit=10,       # 10 second time limit
+            gapRel=0.01,        # Accept solutions within 1% of optimal
+            warmStart=use_warm_start
+        )
+
+    # Solve the problem (raises SolveCancelled if cancel_token fires)
+    solve_problem(prob, solver, cancel_token)
+
+    # Log solver status for debugging
+    print(f"Solver status: {LpStatus[prob.status]}")
+    print(f"Optimization time: {time.time() - start_time:.2f}s")
+
+    # Extract results
+    constraints_violated = []
+    volumes = {}
+    assigned = None
+
+    # Accept both optimal and near-optimal solutions (solver might timeout but find good solution)
+    if prob.status == LpStatusOptimal or (prob.status == LpStatusNotSolved and value(prob.objective) is not None):
+        feasible = True
+
+        if prob.status == LpStatusNotSolved:
+            constraints_violated.append("Solver timed out - returning best solution found (may be sub-optimal)")
+            if config.deterministic and time.time() - start_time >= DETERMINISTIC_TIME_LIMIT:
+                constraints_violated.append("Deterministic solve hit the time limit - the plan may differ between runs")
+
+        for pair in feasible_pairs:
+            volumes[pair] = model.volume(pair)
+        if not config.allow_fractional_assignment:
+            # For binary: full transfer cost only where the assignment is active
+            assigned = {pair for pair in feasible_pairs if (value(y[pair]) or 0) > 0.5}
+
+    else:
+        feasible = False
+        if prob.status == LpStatusInfeasible:
+            constraints_violated.append("Problem is infeasible - no solution satisfies all constraints")
+        elif prob.status == LpStatusUnbounded:
+            constraints_violated.append("Problem is unbounded")
+        elif prob.status == LpStatusNotSolved:
+            constraints_violated.append("Solver timed out without finding any solution")
+        else:
+            constraints_violated.append(f"Solver status: {LpStatus[prob.status]}")
+
+    return build_result(
+        product_dict, plant_dict, config, volumes, assigned,
+        feasible=feasible,
+        constraints_violated=constraints_violated,
+        start_time=start_time,
+        solver_status=LpStatus[prob.status],
+        plan_source="warm_start" if use_warm_start else "solve",
+    )
+
+
+def canonical_order(
+    products: list[Product], plants: list[Plant], feasible_pairs: list[tuple[int, int]],
+) -> tuple[list[Product], list[Plant], list[tuple[int, int]]]:
+    """Products, plants and pairs sorted by product_id / plant_id."""
+    products = sorted(products, key=lambda p: p.product_id)
+    plants = sorted(plants, key=lambda t: t.plant_id)
+    product_rank = {p.id: i for i, p in enumerate(products)}
+    plant_rank = {t.id: i for i, t in enumerate(plants)}
+    feasible_pairs = sorted(feasible_pairs, key=lambda pair: (product_rank[pair[0]], plant_rank[pair[1]]))
+    return products, plants, feasible_pairs
+
+
+def _pair_variables(name: str, pairs: list[tuple[int, int]], canonical: bool, **kwargs) -> dict:
+    """
+    One variable per pair. PuLP writes variables sorted by name, so in
+    canonical mode they are named by position in ``pairs`` instead of by
+    database ids, and the column order is the order of ``pairs``.
+    """
+    if not canonical:
+        return LpVariable.dicts(name, pairs, **kwargs)
+    width = len(str(len(pairs)))
+    return {pair: LpVariable(f"{name}_{i:0{width}d}", **kwargs) for i, pair in enumerate(pairs)}
+
+
+@dataclass
+class MilpModel:
+    """
+    A built PuLP problem and its variables.
+
+    ``y`` is None in LP mode; ``x`` is None in the assignment-only
+    formulation, where the volume of a pair is ``demand * y``.
+    """
+    prob: LpProblem
+    x: Optional[dict]
+    y: Optional[dict]
+    use_warm_start: bool
+    demand: dict[int, float]
+
+    def volume(self, pair: tuple[int, int]) -> float:
+        if self.x is not None:
+            return value(self.x[pair]) or 0
+        return self.demand[pair[0]] * round(value(self.y[pair]) or 0)
+
+
+def _volume_term(x: Optional[dict], y: Optional[dict], demand: dict[int, float]):
+    """``(variable, coefficient)`` for ``coef * volume[pair]`` in either binary formulation."""
+    if x is not None:
+        return lambda pair, coef: (x[pair], coef)
+    return lambda pair, coef: (y[pair], coef * demand[pair[0]])
+
+
+def _expression(terms) -> LpAffineExpression:
+    """Linear expression from ``(variable, coefficient)`` terms, summing repeated variables."""
+    coefficients = {}
+    for var, coef in terms:
+        coefficients[var] = coefficients.get(var, 0) + coef
+    return LpAffineExpression(coefficients)
+
+
+def build_problem(
+    products: list[Product],
+    plants: list[Plant],
+    config: TransferPlanConfig,
+    feasible_pairs: list[tuple[int, int]],
+    index: PairIndex,
+    extra_rows: list[CapacityRow],
+    warm_start: Optional[TransferPlanResult] = None,
+    cost_matrix: Optional[CostMatrix] = None,
+) -> MilpModel:
+    """Build the MILP/LP for ``generate_plan`` without solving it."""
+    product_dict = {p.id: p for p in products}
+    plant_dict = {t.id: t for t in plants}
+    demand = {p.id: p.monthly_demand for p in products}
+    assignment_only = not config.allow_fractional_assignment and config.milp_formulation == "assignment"
+
+    # Create the optimization problem
+    if config.objective_function == "minimize_cost":
+        prob = LpProblem("Transfer_Plan_Cost_Minimization", LpMinimize)
+    elif config.objective_function == "balance_utilization":
+        prob = LpProblem("Transfer_Plan_Utilization_Balance", LpMinimize)
+    elif config.objective_function == "minimize_time":
+        prob = LpProblem("Transfer_Plan_Time_Minimization", LpMinimize)
+    else:
+        prob = LpProblem("Transfer_Plan_Optimization", LpMinimize)
+
+    # Calculate problem size reduction
+    total_possible = len(products) * len(plants)
+    reduction_pct = ((total_possible - len(feasible_pairs)) / total_possible * 100) if total_possible > 0 else 0
+
+    # Decision Variables
+    # x[p, t] = volume of product p assigned to plant t
+    canonical = config.deterministic
+    if config.allow_fractional_assignment:
+        # LP: Continuous variables (allow splitting production)
+        x = _pair_variables("assign",
+                            feasible_pairs, canonical,
+                            lowBound=0,
+                            cat='Continuous')
+    else:
+        # MILP: Binary assignment (all or nothing)
+        # We'll use a workaround: binary y variables + volume x variables
+        y = _pair_variables("transfer",
+                            feasible_pairs, canonical,
+                            cat='Binary')
+        if assignment_only:
+            # Volume is implied by the assignment: x[p, t] = demand[p] * y[p, t]
+            x = None
+        else:
+            x = _pair_variables("volume",
+                                feasible_pairs, canonical,
+                                lowBound=0,
+                                cat='Continuous')
+    volume = _volume_term(x, y if not config.allow_fractional_assignment else None, demand)
+
+    # Objective Function: Minimize Total Cost
+    if config.objective_function == "minimize_cost":
+        # Total cost = transfer costs + monthly production costs
+        if config.allow_fractional_assignment:
+            # For fractional: Simplified - just minimize production costs
+            # (Transfer costs are relatively fixed, focus on variable costs)
+            prob += (
+                LpAffineExpression(
+                    volume(pair, plant_dict[pair[1]].unit_production_cost) for pair in feasible_pairs
+                ),
+                "Total_Cost"
+            )
+        else:
+            # For binary: fixed transfer (and changeover) cost per assignment
+            terms = []
+            for pair in feasible_pairs:
+                plant = plant_dict[pair[1]]
+                terms.append((y[pair], one_time_cost(plant)))
+                terms.append(volume(pair, plant.unit_production_cost))
+            prob += _expression(terms), "Total_Cost"
+
+    elif config.objective_function == "balance_utilization":
+        # Minimize maximum utilization across plants, measured relative to each
+        # plant's max_utilization_target (100 = exactly at target)
+        max_util = LpVariable("max_utilization", lowBound=0)
+        for plant in plants:
+            effective_capacity = plant.available_capacity * (plant.effective_oee or 1.0)
+            plant_pairs = index.by_plant.get(plant.id)
+            if effective_capacity > 0 and plant_pairs:
+                # max_util >= 100 * load / target capacity
+                coef = 100 / (effective_capacity * utilization_target(plant))
+                terms = [volume(pair, coef) for pair in plant_pairs]
+                terms.append((max_util, -1))
+                prob += LpConstraint(LpAffineExpression(terms), LpConstraintLE,
+                                     f"MaxUtil_{plant.id}_{plant.plant_id}", 0)
+        prob += max_util, "Minimize_Max_Utilization"
+
+    else:
+        # multi_objective / minimize_time: weighted cost, risk and time per unit
+        # from the effective-cost matrix, plus one-time costs of actual moves
+        weights = MINIMIZE_TIME_WEIGHTS if config.objective_function == "minimize_time" else config.objective_weights
+        matrix = cost_matrix or CostMatrix.build(products, plants)
+        coefficients = matrix.objective_coefficients(feasible_pairs, weights)
+        terms = [volume(pair, coef) for pair, coef in zip(feasible_pairs, coefficients)]
+        if not config.allow_fractional_assignment:
+            terms.extend(
+                (y[pair], weights.cost * one_time_cost(plant_dict[pair[1]]))
+                for pair in feasible_pairs
+                if plant_dict[pair[1]].plant_id != product_dict[pair[0]].current_plant_id
+            )
+        prob += _expression(terms), "Weighted_Objective"
+
+    # Constraint 1: Demand Satisfaction
+    # Sum of assignments for each product must equal its demand
+    # (assignment-only: each product goes to exactly one plant)
+    for product in products:
+        product_pairs = index.by_product.get(product.id)
+        if not product_pairs:
+            continue
+        if assignment_only:
+            prob += LpConstraint(
+                LpAffineExpression((y[pair], 1) for pair in product_pairs), LpConstraintEQ,
+                f"Assign_{product.id}_{product.product_id}", 1,
+            )
+        else:
+            prob += LpConstraint(
+                LpAffineExpression((x[pair], 1) for pair in product_pairs), LpConstraintEQ,
+                f"Demand_{product.id}_{product.product_id}", product.monthly_demand,
+            )
+
+    # Constraint 2: Capacity Constraints
+    # Total production at each plant must not exceed its effective capacity
+    for plant in plants:
+        effective_capacity = plant.available_capacity * (plant.effective_oee or 1.0)
+        plant_pairs = index.by_plant.get(plant.id)
+        if plant_pairs:
+            prob += LpConstraint(
+                LpAffineExpression(volume(pair, 1) for pair in plant_pairs), LpConstraintLE,
+                f"Capacity_{plant.id}_{plant.plant_id}", effective_capacity,
+            )
+
+    # Constraint 2b: Machine hours, floor area and pallet storage
+    for row in extra_rows:
+        terms = [volume(pair, coef) for pair, coef in row.volume_terms.items()]
+        terms.extend((y[pair], coef) for pair, coef in row.assignment_terms.items())
+        name = "".join(part.capitalize() for part in row.family.split("_"))
+        prob += LpConstraint(
+            _expression(terms), LpConstraintLE, f"{name}_{row.plant.id}_{row.plant.plant_id}", row.limit,
+        )
+
+    # Constraint 3: Binary assignment activation (only for MILP with volume variables)
+    if not config.allow_fractional_assignment and not assignment_only:
+        for pair in feasible_pairs:
+            # x can only be non-zero if y is 1
+            prob += LpConstraint(
+                LpAffineExpression([(x[pair], 1), (y[pair], -product_dict[pair[0]].monthly_demand)]),
+                LpConstraintLE, f"Activation_{pair[0]}_{pair[1]}", 0,
+            )
+
+    # Constraint 4: Budget constraint (optional)
+    # For simplicity, budget constraint only applies to binary mode
+    if config.budget_capital and not config.allow_fractional_assignment:
+        prob += LpConstraint(
+            LpAffineExpression((y[pair], one_time_cost(plant_dict[pair[1]])) for pair in feasible_pairs),
+            LpConstraintLE, "Budget_Constraint", config.budget_capital,
+        )
+
+    # Seed CBC with a previous plan; pairs that are no longer feasible are
+    # simply dropped and CBC repairs or ignores the partial solution
+    use_warm_start = bool(warm_start and warm_start.feasible and not config.allow_fractional_assignment)
+    if use_warm_start:
+        pair_by_ids = {
+            (product_dict[p_id].product_id, plant_dict[t_id].plant_id): (p_id, t_id)
+            for p_id, t_id in feasible_pairs
+        }
+        for pair in feasible_pairs:
+            if x is not None:
+                x[pair].setInitialValue(0)
+            y[pair].setInitialValue(0)
+        for a in warm_start.assignments:
+            pair = pair_by_ids.get((a.product_id, a.target_plant_id))
+            if pair is not None:
+                if x is not None:
+                    x[pair].setInitialValue(a.assigned_volume)
+                y[pair].setInitialValue(1)
+
+    return MilpModel(prob, x, y if not config.allow_fractional_assignment else None, use_warm_start, demand)
@@ -0,0 +1,181 @@
+"""
+Cache of solved plans for fast ``excluded_plants`` / ``excluded_products`` what-ifs.
+
+Plans are grouped by *family*: dataset version plus every config field
+except the two exclusion lists. Inside a family a new request is answered
+without solving when
+
+- the exact exclusion sets were solved (or proven infeasible) before, or
+- a cached plan with a subset of the exclusions was solved to optimality
+  and is still valid under the added exclusions (no assignment targets a
+  newly excluded plant, every newly excluded product stays at its current
+  plant). Adding exclusions only removes options, so that plan is still
+  optimal, or
+- a cached plan with a subset of the exclusions was proven infeasible:
+  removing options cannot make it feasible.
+
+Both subset rules only hold while the model keeps the same demand rows.
+``prefilter_pairs`` leaves a product out of the model once it has no
+feasible pair left, so exclusions can also remove a constraint (and turn an
+infeasible model feasible). Every entry therefore records the products the
+model covered, and subset entries are only used when the new request
+covers exactly the same products.
+
+Otherwise the nearest cached plan (fewest differing exclusions) is returned
+as a warm start for CBC. Deterministic requests only take exact and
+infeasible hits, so they always get the plan a fresh solve would produce.
+"""
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from app.core.config import settings
+from app.schemas.item import Product, TransferPlanConfig, TransferPlanResult
+
+
+@dataclass(frozen=True)
+class _Entry:
+    excluded_plants: frozenset
+    excluded_products: frozenset
+    modeled_products: frozenset
+    result: TransferPlanResult
+
+    @property
+    def optimal(self) -> bool:
+        return self.result.feasible and self.result.solver_status == "Optimal"
+
+    @property
+    def infeasible(self) -> bool:
+        return self.result.solver_status == "Infeasible"
+
+
+@dataclass
+class CacheLookup:
+    """Outcome of ``PlanCache.lookup``: a ready plan, a warm start, or neither."""
+    result: Optional[TransferPlanResult] = None
+    warm_start: Optional[TransferPlanResult] = None
+
+
+def _family_key(dataset_version, config: TransferPlanConfig) -> str:
+    return f"{dataset_version}:{config.model_dump_json(exclude={'excluded_plants', 'excluded_products'})}"
+
+
+def _still_valid(entry: _Entry, excluded_plants: frozenset, excluded_products: frozenset,
+                 current_plant: dict[str, Optional[str]]) -> bool:
+    """Whether ``entry``'s plan satisfies the extra exclusions of the new request."""
+    new_products = excluded_products - entry.excluded_products
+    for a in entry.result.assignments:
+        if a.target_plant_id in excluded_plants:
+            return False
+        if a.product_id in new_products and a.target_plant_id != current_plant.get(a.product_id):
+            return False
+    return True
+
+
+class PlanCache:
+    """LRU of solved plans, bounded by ``PLAN_CACHE_SIZE`` entries in total."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.RLock()
+        self._families: OrderedDict[str, dict[tuple, _Entry]] = OrderedDict()
+        self._size = 0
+        self._stats = Counter()
+
+    def lookup(self, dataset_version, config: TransferPlanConfig, products: list[Product],
+               modeled: frozenset) -> CacheLookup:
+        """``modeled`` is the request's ``PairSizing.modeled_products`` (see the module docstring)."""
+        start = time.time()
+        excluded_plants = frozenset(config.excluded_plants)
+        excluded_products = frozenset(config.excluded_products)
+        has_exclusions = bool(excluded_plants or excluded_products)
+        self._count("requests", has_exclusions)
+
+        with self._lock:
+            family_key = _family_key(dataset_version, config)
+            family = self._families.get(family_key)
+            if family is None:
+                self._count("cold", has_exclusions)
+                return CacheLookup()
+            self._families.move_to_end(family_key)
+            entries = list(family.values())
+
+        exact = next((e for e in entries if e.excluded_plants == excluded_plants
+                      and e.excluded_products == excluded_products), None)
+        if exact is not None and (exact.optimal or exact.infeasible):
+            self._count("exact_hits", has_exclusions)
+            return CacheLookup(result=self._answer(exact.result, start))
+
+        subsets = [e for e in entries if e.excluded_plants <= excluded_plants
+                   and e.excluded_products <= excluded_products and e.modeled_products == modeled]
+        infeasible = next((e for e in subsets if e.infeasible), None)
+        if infeasible is not None:
+            self._count("infeasible_hits", has_exclusions)
+            return CacheLookup(result=self._answer(infeasible.result, start))
+
+        if config.deterministic:
+            # Reused plans and warm starts may break ties differently from a fresh solve
+            self._count("deterministic_solves", has_exclusions)
+            return CacheLookup()
+
+        current_plant = {p.product_id: p.current_plant_id for p in products}
+        for entry in subsets:
+            if entry.optimal and _still_valid(entry, excluded_plants, excluded_products, current_plant):
+                self._count("reuse_hits", has_exclusions)
+                return CacheLookup(result=self._answer(entry.result, start))
+
+        candidates = [e for e in entries if e.result.feasible]
+        if not candidates:
+            self._count("cold", has_exclusions)
+            return CacheLookup()
+        nearest = min(candidates, key=lambda e: len(e.excluded_plants ^ excluded_plants)
+                      + len(e.excluded_products ^ excluded_products))
+        self._count("warm_starts", has_exclusions)
+        return CacheLookup(warm_start=nearest.result)
+
+    def store(self, dataset_version, config: TransferPlanConfig, modeled: frozenset, result: TransferPlanResult):
+        """Remember ``result``; timed-out or failed solves are kept only as warm starts."""
+        entry = _Entry(frozenset(config.excluded_plants), frozenset(config.excluded_products), modeled, result)
+        with self._lock:
+            family_key = _family_key(dataset_version, config)
+            family = self._families.setdefault(family_key, {})
+            self._families.move_to_end(family_key)
+            key = (entry.excluded_plants, entry.excluded_products)
+            if key not in family:
+                self._size += 1
+            family[key] = entry
+            while self._size > self.max_entries and self._families:
+                _, evicted = self._families.popitem(last=False)
+                self._size -= len(evicted)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            entries = self._size
+        answered = sum(stats.get(f"exclusion_{k}", 0) for k in ("exact_hits", "reuse_hits", "infeasible_hits"))
+        exclusion_requests = stats.get("exclusion_requests", 0)
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            **{k: v for k, v in sorted(stats.items())},
+            "exclusion_answered_without_solve_ratio": round(answered / exclusion_requests, 4)
+            if exclusion_requests else 0.0,
+        }
+
+    def _count(self, name: str, has_exclusions: bool):
+        with self._lock:
+            self._stats[name] += 1
+            if has_exclusions:
+                self._stats[f"exclusion_{name}"] += 1
+
+    @staticmethod
+    def _answer(result: TransferPlanResult, start: float) -> TransferPlanResult:
+        return result.model_copy(update={
+            "plan_source": "cache",
+            "optimization_time_seconds": round(time.time() - start, 3),
+        })
+
+
+plan_cache = PlanCache(settings.PLAN_CACHE_SIZE)
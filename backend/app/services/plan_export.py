@@ -0,0 +1,141 @@
+"""
+Streamed exports of saved plans.
+
+Exports read the stored columns of a plan (see ``plan_sessions``) and
+write them out batch by batch, so neither ``TransferAssignment`` models nor
+the full output document are ever built in memory. Only the output is
+streamed: the stored record is read whole, and ``csv`` and ``arrow`` parse
+its column JSON into Python lists before the first batch (a few times the
+stored size, far less than the models). ``json`` passes the stored text
+through without parsing it.
+
+- ``csv``: one row per assignment, with the ``TransferAssignment`` field
+  names as header, for ERP imports and spreadsheets
+- ``json``: the plan summary plus the dictionary-encoded columns exactly as
+  stored (``{"products": [...], "plants": [...], "product": [codes], ...}``)
+- ``arrow``: an Arrow IPC stream with dictionary-encoded product/plant
+  columns; needs the optional ``pyarrow`` package
+"""
+import csv
+import io
+import json
+from typing import Iterator, Optional
+
+from app.services.plan_sessions import NUMERIC_COLUMNS
+from app.services.store import store
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "json": ("application/json", "json"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrow"),
+}
+CSV_HEADER = ("product_id", "source_plant_id", "target_plant_id", *NUMERIC_COLUMNS, "start_month")
+
+_CSV_BATCH_ROWS = 2000
+_JSON_CHUNK_CHARS = 64 * 1024
+_ARROW_BATCH_ROWS = 65536
+
+
+def arrow_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def export_plan(plan_id: int, fmt: str) -> Optional[Iterator[bytes]]:
+    """Encoded chunks of saved plan ``plan_id`` in format ``fmt``; None if the plan does not exist."""
+    record = store.plans.get(plan_id)
+    if record is None:
+        return None
+    if fmt == "csv":
+        return _csv_chunks(json.loads(record["columns"]))
+    if fmt == "json":
+        return _json_chunks(record)
+    if fmt == "arrow":
+        return _arrow_chunks(record)
+    raise ValueError(f"Unknown export format: {fmt}")
+
+
+def _csv_chunks(columns: dict) -> Iterator[bytes]:
+    products, plants = columns["products"], columns["plants"]
+    rows = zip(
+        columns["product"], columns["source"], columns["target"],
+        *(columns[name] for name in NUMERIC_COLUMNS), columns["start_month"],
+    )
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(CSV_HEADER)
+    count = 0
+    for product, source, target, *values, start_month in rows:
+        writer.writerow((
+            products[product], plants[source] if source >= 0 else "", plants[target],
+            *values, "" if start_month is None else start_month,
+        ))
+        count += 1
+        if count % _CSV_BATCH_ROWS == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+def _json_chunks(record: dict) -> Iterator[bytes]:
+    head = {
+        "id": record["id"],
+        "name": record["name"],
+        "dataset_version": record["dataset_version"],
+        "summary": json.loads(record["summary"]),
+    }
+    # The stored columns are already JSON; pass them through without parsing
+    yield (json.dumps(head, separators=(",", ":"))[:-1] + ',"columns":').encode()
+    stored = record["columns"]
+    for start in range(0, len(stored), _JSON_CHUNK_CHARS):
+        yield stored[start:start + _JSON_CHUNK_CHARS].encode()
+    yield b"}"
+
+
+def _arrow_chunks(record: dict) -> Iterator[bytes]:
+    import pyarrow as pa
+
+    columns = json.loads(record["columns"])
+    products = pa.array(columns["products"], pa.string())
+    plants = pa.array(columns["plants"], pa.string())
+    schema = pa.schema(
+        [
+            ("product_id", pa.dictionary(pa.int32(), pa.string())),
+            ("source_plant_id", pa.dictionary(pa.int32(), pa.string())),
+            ("target_plant_id", pa.dictionary(pa.int32(), pa.string())),
+            *((name, pa.float64()) for name in NUMERIC_COLUMNS),
+            ("start_month", pa.int32()),
+        ],
+        metadata={"summary": record["summary"], "dataset_version": str(record["dataset_version"])},
+    )
+
+    sink = io.BytesIO()
+
+    def drain() -> bytes:
+        data = sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        return data
+
+    with pa.ipc.new_stream(sink, schema) as writer:
+        total = len(columns["product"])
+        for start in range(0, total, _ARROW_BATCH_ROWS):
+            window = slice(start, start + _ARROW_BATCH_ROWS)
+            source = [code if code >= 0 else None for code in columns["source"][window]]
+            batch = pa.record_batch(
+                [
+                    pa.DictionaryArray.from_arrays(pa.array(columns["product"][window], pa.int32()), products),
+                    pa.DictionaryArray.from_arrays(pa.array(source, pa.int32()), plants),
+                    pa.DictionaryArray.from_arrays(pa.array(columns["target"][window], pa.int32()), plants),
+                    *(pa.array(columns[name][window], pa.float64()) for name in NUMERIC_COLUMNS),
+                    pa.array(columns["start_month"][window], pa.int32()),
+                ],
+                schema=schema,
+            )
+            writer.write_batch(batch)
+            yield drain()
+    yield drain()
@@ -0,0 +1,202 @@
+"""
+Server-side plan sessions.
+
+A saved plan keeps its config, the dataset version it was solved on and the
+``TransferPlanResult`` in columnar form: product and plant ids are
+dictionary-encoded once, and every assignment field is a parallel column.
+That is several times smaller than a list of assignment objects, and diffs
+run column-by-column over the stored columns without re-solving or
+rebuilding the assignment models.
+"""
+import json
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.schemas.item import (
+    MovedProduct, PlanDiff, PlanSession, PlanSessionCreate, PlanSessionSummary, PlantDelta,
+    ProductCostDelta, TransferAssignment, TransferPlanConfig, TransferPlanResult,
+)
+from app.services.store import store
+
+NUMERIC_COLUMNS = ("assigned_volume", "utilization", "total_cost", "transfer_cost", "monthly_production_cost")
+_RESULT_FIELDS = (
+    "total_transfer_cost", "total_monthly_cost", "total_cost", "average_utilization", "feasible",
+    "constraints_violated", "optimization_time_seconds", "solver_status", "plan_source", "dataset_version",
+    "estimated_memory_mb", "peak_memory_mb", "memory_downgrade", "fingerprint",
+)
+
+
+class _Dictionary:
+    """String -> small integer code, in first-seen order."""
+
+    def __init__(self):
+        self.values: list[str] = []
+        self._codes: dict[str, int] = {}
+
+    def code(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+def encode_assignments(assignments: list[TransferAssignment]) -> dict:
+    """Columnar, dictionary-encoded form of ``assignments``."""
+    products, plants = _Dictionary(), _Dictionary()
+    columns = {
+        "product": [products.code(a.product_id) for a in assignments],
+        "source": [plants.code(a.source_plant_id) for a in assignments],
+        "target": [plants.code(a.target_plant_id) for a in assignments],
+        **{name: [getattr(a, name) for a in assignments] for name in NUMERIC_COLUMNS},
+        "start_month": [a.start_month for a in assignments],
+    }
+    return {"products": products.values, "plants": plants.values, **columns}
+
+
+def decode_assignments(columns: dict) -> list[TransferAssignment]:
+    products, plants = columns["products"], columns["plants"]
+    return [
+        TransferAssignment(
+            product_id=products[product],
+            source_plant_id=plants[source] if source >= 0 else None,
+            target_plant_id=plants[target],
+            start_month=start_month,
+            **dict(zip(NUMERIC_COLUMNS, values)),
+        )
+        for product, source, target, start_month, *values in zip(
+            columns["product"], columns["source"], columns["target"], columns["start_month"],
+            *(columns[name] for name in NUMERIC_COLUMNS),
+        )
+    ]
+
+
+def save_plan(plan: PlanSessionCreate) -> PlanSession:
+    """Store a plan the server just generated (see ``generate?save_as=``)."""
+    result = plan.result
+    summary = {
+        **{name: getattr(result, name) for name in _RESULT_FIELDS},
+        "objective_function": plan.config.objective_function,
+        "assignments_count": len(result.assignments),
+    }
+    record = {
+        "name": plan.name,
+        "session_id": plan.session_id,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "dataset_version": result.dataset_version,
+        "config": plan.config.model_dump_json(),
+        "summary": json.dumps(summary),
+        "columns": json.dumps(encode_assignments(result.assignments), separators=(",", ":")),
+    }
+    plan_id = store.plans.add(record)
+    return PlanSession(**_summary({**record, "id": plan_id}).model_dump(), config=plan.config, result=result)
+
+
+def list_plans(session_id: Optional[str] = None) -> list[PlanSessionSummary]:
+    return [_summary(record) for record in store.plans.list(session_id)]
+
+
+def get_plan(plan_id: int) -> Optional[PlanSession]:
+    record = store.plans.get(plan_id)
+    if record is None:
+        return None
+    summary = json.loads(record["summary"])
+    result = TransferPlanResult(
+        assignments=decode_assignments(json.loads(record["columns"])),
+        **{name: summary.get(name) for name in _RESULT_FIELDS},
+    )
+    return PlanSession(
+        **_summary(record).model_dump(),
+        config=TransferPlanConfig.model_validate_json(record["config"]),
+        result=result,
+    )
+
+
+def delete_plan(plan_id: int) -> bool:
+    return store.plans.delete(plan_id)
+
+
+def diff_plans(plan_a: int, plan_b: int) -> Optional[PlanDiff]:
+    """Moved products, cost and utilization deltas (B - A); None if a plan is missing."""
+    record_a, record_b = store.plans.get(plan_a), store.plans.get(plan_b)
+    if record_a is None or record_b is None:
+        return None
+    summary_a, summary_b = json.loads(record_a["summary"]), json.loads(record_b["summary"])
+    view_a, view_b = _PlanView(json.loads(record_a["columns"])), _PlanView(json.loads(record_b["columns"]))
+
+    product_ids = sorted(view_a.targets.keys() | view_b.targets.keys())
+    moved = [
+        MovedProduct(product_id=p, plants_a=sorted(view_a.targets.get(p, ())), plants_b=sorted(view_b.targets.get(p, ())))
+        for p in product_ids
+        if view_a.targets.get(p) != view_b.targets.get(p)
+    ]
+    cost_deltas = []
+    for p in product_ids:
+        cost_a, cost_b = view_a.cost.get(p, 0.0), view_b.cost.get(p, 0.0)
+        if round(cost_b - cost_a, 2):
+            cost_deltas.append(ProductCostDelta(
+                product_id=p, total_cost_a=round(cost_a, 2), total_cost_b=round(cost_b, 2),
+                total_cost_delta=round(cost_b - cost_a, 2),
+            ))
+    plant_deltas = []
+    for t in sorted(view_a.volume.keys() | view_b.volume.keys()):
+        volume_a, volume_b = view_a.volume.get(t, 0.0), view_b.volume.get(t, 0.0)
+        util_a, util_b = view_a.utilization.get(t, 0.0), view_b.utilization.get(t, 0.0)
+        plant_deltas.append(PlantDelta(
+            plant_id=t,
+            volume_a=round(volume_a, 2), volume_b=round(volume_b, 2), volume_delta=round(volume_b - volume_a, 2),
+            utilization_a=util_a, utilization_b=util_b, utilization_delta=round(util_b - util_a, 2),
+        ))
+
+    def delta(name: str) -> float:
+        return round(summary_b[name] - summary_a[name], 2)
+
+    return PlanDiff(
+        plan_a=plan_a,
+        plan_b=plan_b,
+        same_dataset=record_a["dataset_version"] is not None
+        and record_a["dataset_version"] == record_b["dataset_version"],
+        total_cost_delta=delta("total_cost"),
+        total_transfer_cost_delta=delta("total_transfer_cost"),
+        total_monthly_cost_delta=delta("total_monthly_cost"),
+        average_utilization_delta=delta("average_utilization"),
+        moved_products=moved,
+        product_cost_deltas=cost_deltas,
+        plant_deltas=plant_deltas,
+    )
+
+
+class _PlanView:
+    """Per-product and per-plant aggregates of one plan's columns."""
+
+    def __init__(self, columns: dict):
+        products, plants = columns["products"], columns["plants"]
+        self.targets = defaultdict(set)
+        self.cost = defaultdict(float)
+        self.volume = defaultdict(float)
+        self.utilization = {}
+        for product, target, volume, utilization, cost in zip(
+            columns["product"], columns["target"], columns["assigned_volume"],
+            columns["utilization"], columns["total_cost"],
+        ):
+            product_id, plant_id = products[product], plants[target]
+            self.targets[product_id].add(plant_id)
+            self.cost[product_id] += cost
+            self.volume[plant_id] += volume
+            # Utilization is per plant, repeated on each of its assignments
+            self.utilization[plant_id] = utilization
+
+
+def _summary(record: dict) -> PlanSessionSummary:
+    summary = json.loads(record["summary"])
+    return PlanSessionSummary(
+        id=record["id"],
+        name=record["name"],
+        session_id=record["session_id"],
+        created_at=record["created_at"],
+        dataset_version=record["dataset_version"],
+        **{name: summary[name] for name in PlanSessionSummary.model_fields if name in summary and name not in record},
+    )
@@ -0,0 +1,185 @@
+"""
+Portfolio summary: demand, capacity and current load per plant.
+
+The product side is kept as running aggregates (total demand, demand and
+product count per current plant, products without a plant, the largest
+single demand) and moved forward from one dataset snapshot to the next by
+applying only the products that were added, removed or changed, the same
+way ``CostMatrixCache`` follows the snapshots. The products and plants
+routers advance it after every write, so a summary request only walks the
+plants: O(plants) regardless of catalog size.
+
+The summary doubles as a pre-solve check. Before any model is built it
+tells whether total demand exceeds total effective capacity, whether some
+product is larger than every plant, or whether products lack a current
+plant; any of these rules out a plan that serves every product.
+"""
+import heapq
+import threading
+from collections import Counter, defaultdict
+from typing import Optional
+
+from app.schemas.item import PlantLoad, PortfolioSummary, Product
+from app.services.balance import utilization_target
+from app.services.store import DatasetSnapshot
+
+
+class _ProductAggregates:
+    """Running totals over the products of one snapshot; updated in place."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_demand = 0.0
+        self.load = defaultdict(float)       # current_plant_id -> demand
+        self.load_count = Counter()          # current_plant_id -> products
+        self.without_plant = 0
+        # Largest demand: value counts plus a max-heap with lazy deletion
+        self._demand_counts = Counter()
+        self._demand_heap: list[float] = []
+
+    @classmethod
+    def build(cls, products) -> "_ProductAggregates":
+        aggregates = cls()
+        for product in products:
+            aggregates.add(product)
+        return aggregates
+
+    def add(self, product: Product):
+        self._apply(product, 1)
+        if self._demand_counts[product.monthly_demand] == 1:
+            heapq.heappush(self._demand_heap, -product.monthly_demand)
+            # Drop stale heap entries once they outnumber the live values
+            if len(self._demand_heap) > 2 * len(self._demand_counts) + 64:
+                self._demand_heap = [-demand for demand in self._demand_counts]
+                heapq.heapify(self._demand_heap)
+
+    def remove(self, product: Product):
+        self._apply(product, -1)
+        if self._demand_counts[product.monthly_demand] <= 0:
+            del self._demand_counts[product.monthly_demand]
+
+    def _apply(self, product: Product, sign: int):
+        self.count += sign
+        self.total_demand += sign * product.monthly_demand
+        self._demand_counts[product.monthly_demand] += sign
+        plant_id = product.current_plant_id
+        if plant_id is None:
+            self.without_plant += sign
+            return
+        self.load[plant_id] += sign * product.monthly_demand
+        self.load_count[plant_id] += sign
+        if self.load_count[plant_id] == 0:
+            del self.load[plant_id], self.load_count[plant_id]
+
+    def largest_demand(self) -> float:
+        heap = self._demand_heap
+        while heap and self._demand_counts[-heap[0]] <= 0:
+            heapq.heappop(heap)
+        return -heap[0] if heap else 0.0
+
+
+class PortfolioSummaryCache:
+    """Product aggregates of the most recent snapshot, moved forward incrementally."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot: Optional[DatasetSnapshot] = None
+        self._products: Optional[_ProductAggregates] = None
+        self.stats = {"full_builds": 0, "incremental_updates": 0, "products_applied": 0}
+
+    def advance(self, snapshot: DatasetSnapshot):
+        """Bring the aggregates up to ``snapshot`` (a no-op for older snapshots)."""
+        with self._lock:
+            self._advance(snapshot)
+
+    def summary(self, snapshot: DatasetSnapshot) -> PortfolioSummary:
+        with self._lock:
+            if self._advance(snapshot):
+                return _summarize(snapshot, self._products)
+        # An older snapshot than the one tracked (rare): summarize it from scratch
+        return _summarize(snapshot, _ProductAggregates.build(snapshot.products.values()))
+
+    def _advance(self, snapshot: DatasetSnapshot) -> bool:
+        """Whether the aggregates now describe ``snapshot``."""
+        previous = self._snapshot
+        if previous is not None and snapshot.version < previous.version:
+            return False
+        if previous is None:
+            self._products = _ProductAggregates.build(snapshot.products.values())
+            self.stats["full_builds"] += 1
+            self.stats["products_applied"] += len(snapshot.products)
+        elif snapshot.version > previous.version:
+            added, removed, changed = previous.products.changed_ids(snapshot.products)
+            for product_id in removed + changed:
+                self._products.remove(previous.products[product_id])
+            for product_id in added + changed:
+                self._products.add(snapshot.products[product_id])
+            self.stats["incremental_updates"] += 1
+            self.stats["products_applied"] += len(added) + len(removed) + 2 * len(changed)
+        self._snapshot = snapshot
+        return True
+
+
+def _summarize(snapshot: DatasetSnapshot, products: _ProductAggregates) -> PortfolioSummary:
+    plants = []
+    known = set()
+    for plant in snapshot.plant_list:
+        known.add(plant.plant_id)
+        effective_capacity = plant.available_capacity * (plant.effective_oee or 1.0)
+        target_capacity = effective_capacity * min(utilization_target(plant), 1.0)
+        load = products.load.get(plant.plant_id, 0.0)
+        utilization = load / effective_capacity * 100 if effective_capacity > 0 else 0.0
+        plants.append(PlantLoad(
+            plant_id=plant.plant_id,
+            effective_capacity=round(effective_capacity, 2),
+            target_capacity=round(target_capacity, 2),
+            current_load=round(load, 2),
+            current_products=products.load_count.get(plant.plant_id, 0),
+            current_utilization=round(utilization, 2),
+            headroom=round(effective_capacity - load, 2),
+            over_target=load > target_capacity,
+            over_capacity=load > effective_capacity,
+        ))
+
+    unknown = [plant_id for plant_id in products.load if plant_id not in known]
+    total_capacity = sum(t.effective_capacity for t in plants)
+    largest_plant = max((t.effective_capacity for t in plants), default=0.0)
+    largest_demand = products.largest_demand()
+
+    issues = []
+    if not products.count:
+        issues.append("No products available")
+    if not plants:
+        issues.append("No plants available")
+    if products.total_demand > total_capacity + 1e-6 and plants:
+        issues.append(
+            f"Total demand {products.total_demand:,.0f} exceeds total effective capacity {total_capacity:,.0f}"
+        )
+    if largest_demand > largest_plant + 1e-6 and plants:
+        issues.append(
+            f"Largest product demand {largest_demand:,.0f} exceeds the largest plant capacity {largest_plant:,.0f}"
+        )
+    if products.without_plant:
+        issues.append(f"{products.without_plant} products have no current plant")
+
+    return PortfolioSummary(
+        dataset_version=snapshot.version,
+        products_count=products.count,
+        plants_count=len(plants),
+        total_demand=round(products.total_demand, 2),
+        total_effective_capacity=round(total_capacity, 2),
+        total_target_capacity=round(sum(t.target_capacity for t in plants), 2),
+        capacity_headroom=round(total_capacity - products.total_demand, 2),
+        demand_to_capacity_pct=round(products.total_demand / total_capacity * 100, 2) if total_capacity else 0.0,
+        largest_product_demand=round(largest_demand, 2),
+        products_without_plant=products.without_plant,
+        demand_at_unknown_plants=round(sum(products.load[p] for p in unknown), 2),
+        plants_over_target=sum(t.over_target for t in plants),
+        plants_over_capacity=sum(t.over_capacity for t in plants),
+        plants=plants,
+        infeasible=bool(issues),
+        issues=issues,
+    )
+
+
+portfolio_summary = PortfolioSummaryCache()
@@ -0,0 +1,95 @@
+"""
+Input validation and feasible-pair prefiltering.
+
+Kept free of PuLP so the API can size and admit requests without loading
+the optimization stack.
+"""
+from dataclasses import dataclass
+from typing import Iterator
+
+from app.schemas.item import Plant, Product, TransferPlanConfig
+from app.services.capacity import fits
+
+
+class OptimizationInputError(ValueError):
+    """Raised when the products/plants data cannot be optimized as given."""
+
+
+@dataclass(frozen=True)
+class PairSizing:
+    """Feasible pair count of a request and the products with at least one pair."""
+    pairs: int
+    modeled_products: frozenset
+
+
+def prefilter_pairs(products: list[Product], plants: list[Plant], config: TransferPlanConfig) -> list[tuple[int, int]]:
+    """
+    Validate the inputs and return the feasible (product.id, plant.id) pairs.
+
+    The pair count is the size of the model that will be built, which is why
+    the scheduler calls this before admitting a solve.
+    """
+    _validate(products, plants)
+    return list(_feasible_pairs(products, plants, config))
+
+
+def size_pairs(products: list[Product], plants: list[Plant], config: TransferPlanConfig) -> PairSizing:
+    """
+    Validate the inputs and count the feasible pairs without building the list.
+
+    Lets the API size a request (and reject it with 413) before allocating
+    a tuple per pair.
+    """
+    _validate(products, plants)
+    count, modeled = 0, set()
+    for product_id, _ in _feasible_pairs(products, plants, config):
+        count += 1
+        modeled.add(product_id)
+    return PairSizing(count, frozenset(modeled))
+
+
+def _validate(products: list[Product], plants: list[Plant]):
+    if not products:
+        raise OptimizationInputError("No products available. Please add products first.")
+
+    if not plants:
+        raise OptimizationInputError("No plants available. Please add plants first.")
+
+    # Validate that all products have current plant assignments
+    products_without_plants = [p.product_id for p in products if not p.current_plant_id]
+    if products_without_plants:
+        raise OptimizationInputError(
+            f"The following products must be assigned to a current plant before optimization: {', '.join(products_without_plants)}"
+        )
+
+
+def _feasible_pairs(products: list[Product], plants: list[Plant], config: TransferPlanConfig) -> Iterator[tuple[int, int]]:
+    # Get exclusion lists from config
+    excluded_product_ids = set(config.excluded_products or [])
+    excluded_plant_ids = set(config.excluded_plants or [])
+
+    # Filter out excluded plants from the optimization
+    available_plants = [t for t in plants if t.plant_id not in excluded_plant_ids]
+
+    # Create lookup for plant_id -> plant object
+    plant_by_plant_id = {t.plant_id: t for t in plants}
+
+    # Pre-filter feasible assignments to reduce problem size
+    # Only create variables for product-plant pairs where the product can fit
+    for p in products:
+        # Check if product is excluded from transfer
+        if p.product_id in excluded_product_ids:
+            # Excluded product: can only stay at current plant
+            current_plant = plant_by_plant_id.get(p.current_plant_id)
+            if current_plant and current_plant.plant_id not in excluded_plant_ids:
+                effective_capacity = current_plant.available_capacity * (current_plant.effective_oee or 1.0)
+                if p.monthly_demand <= effective_capacity and fits(p, current_plant, config):
+                    yield p.id, current_plant.id
+        else:
+            # Normal product: can go to any available plant
+            for t in available_plants:
+                effective_capacity = t.available_capacity * (t.effective_oee or 1.0)
+                # Only consider assignments where product demand fits in plant capacity
+                # (units, and machine hours / floor area / pallets where enforced)
+                if p.monthly_demand <= effective_capacity and fits(p, t, config):
+                    yield p.id, t.id
@@ -0,0 +1,122 @@
+"""Conversion of solved volumes into ``TransferPlanResult`` (shared by all engines)."""
+import hashlib
+import json
+import time
+from typing import Optional
+from app.schemas.item import Plant, Product, TransferPlanConfig, TransferPlanResult, TransferAssignment
+from app.services.capacity import one_time_cost
+
+
+def build_result(
+    product_dict: dict[int, Product],
+    plant_dict: dict[int, Plant],
+    config: TransferPlanConfig,
+    volumes: dict[tuple[int, int], float],
+    assigned: Optional[set[tuple[int, int]]],
+    feasible: bool,
+    constraints_violated: list[str],
+    start_time: float,
+    solver_status: str,
+    plan_source: str,
+) -> TransferPlanResult:
+    """
+    Turn solved (product.id, plant.id) volumes into a ``TransferPlanResult``.
+
+    ``assigned`` holds the pairs whose binary assignment is active (binary
+    mode); when it is None every pair with volume counts as assigned.
+    """
+    assignments = []
+    total_transfer_cost = 0
+    total_monthly_cost = 0
+
+    # Calculate plant utilizations once
+    plant_volumes = {}
+    for (product_id, plant_id), volume in volumes.items():
+        plant_volumes[plant_id] = plant_volumes.get(plant_id, 0) + volume
+    plant_utilizations = {}
+    for plant in plant_dict.values():
+        effective_capacity = plant.available_capacity * (plant.effective_oee or 1.0)
+        plant_total_volume = plant_volumes.get(plant.id, 0)
+        plant_utilizations[plant.id] = (plant_total_volume / effective_capacity * 100) if effective_capacity > 0 else 0
+
+    # Extract assignments - only pairs that carry volume
+    for (product_id, plant_id), volume in volumes.items():
+        if volume and volume > 0.01:  # Threshold for numerical precision
+            product = product_dict[product_id]
+            plant = plant_dict[plant_id]
+
+            # Calculate costs
+            # Check if this is a transfer (different plant) or staying at same plant
+            is_transfer = product.current_plant_id != plant.plant_id
+
+            if config.allow_fractional_assignment:
+                # For fractional: proportional transfer cost
+                transfer_cost = one_time_cost(plant) * (volume / product.monthly_demand) if is_transfer else 0
+            else:
+                # For binary: full transfer cost if assigned
+                is_assigned = assigned is None or (product_id, plant_id) in assigned
+                transfer_cost = one_time_cost(plant) if (is_assigned and is_transfer) else 0
+
+            monthly_cost = volume * plant.unit_production_cost
+
+            assignment = TransferAssignment(
+                product_id=product.product_id,
+                source_plant_id=product.current_plant_id,
+                target_plant_id=plant.plant_id,
+                assigned_volume=round(volume, 2),
+                utilization=round(min(plant_utilizations[plant.id], 100), 2),
+                total_cost=round(transfer_cost + monthly_cost, 2),
+                transfer_cost=round(transfer_cost, 2),
+                monthly_production_cost=round(monthly_cost, 2),
+                start_month=int(plant.lead_time_to_start) if plant.lead_time_to_start else 0
+            )
+            assignments.append(assignment)
+            total_transfer_cost += transfer_cost
+            total_monthly_cost += monthly_cost
+
+    # Calculate average utilization
+    if assignments:
+        # Group by plant to get unique utilizations
+        plant_utilizations = {}
+        for a in assignments:
+            plant_utilizations[a.target_plant_id] = a.utilization
+        avg_utilization = sum(plant_utilizations.values()) / len(plant_utilizations)
+    else:
+        avg_utilization = 0
+
+    optimization_time = time.time() - start_time
+
+    result = TransferPlanResult(
+        assignments=assignments,
+        total_transfer_cost=round(total_transfer_cost, 2),
+        total_monthly_cost=round(total_monthly_cost, 2),
+        total_cost=round(total_transfer_cost + total_monthly_cost, 2),
+        average_utilization=round(avg_utilization, 2),
+        feasible=feasible,
+        constraints_violated=constraints_violated,
+        optimization_time_seconds=round(optimization_time, 3),
+        solver_status=solver_status,
+        plan_source=plan_source
+    )
+    result.fingerprint = plan_fingerprint(result)
+
+    return result
+
+
+def plan_fingerprint(result: TransferPlanResult) -> str:
+    """
+    SHA-256 over the plan content in canonical form: assignments sorted by
+    product and target plant, totals and feasibility. Timing, provenance
+    (plan_source, dataset_version) and messages are left out, so two solves
+    that produce the same plan have the same fingerprint.
+    """
+    content = {
+        "assignments": sorted(
+            (a.model_dump() for a in result.assignments),
+            key=lambda a: (a["product_id"], a["target_plant_id"]),
+        ),
+        **result.model_dump(include={
+            "total_transfer_cost", "total_monthly_cost", "total_cost", "average_utilization", "feasible",
+        }),
+    }
+    return hashlib.sha256(json.dumps(content, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
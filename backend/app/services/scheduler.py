@@ -0,0 +1,211 @@
+"""
+Admission control in front of the optimizer.
+
+Every solve request gets a ``SolveTicket`` before CBC is started:
+
+- requests are sized by their feasible pair count (from ``prefilter_pairs``);
+  "large" solves get a smaller share of the solve slots so a few of them
+  cannot occupy every CPU
+- ``interactive`` requests are always dispatched before ``batch`` ones
+- each client may only have a few requests queued or running at once
+- when the queue is full the request is rejected with a retry hint
+- a ticket can be cancelled while queued or running; a running CBC
+  process is killed through the ticket's ``CancelToken``
+
+All methods run on the event loop thread, so no locking is needed here.
+"""
+import asyncio
+import math
+import os
+import time
+from collections import Counter, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Awaitable, Optional
+
+from app.core.config import settings
+from app.services.cbc import CancelToken, SolveCancelled
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+PRIORITIES = (INTERACTIVE, BATCH)
+
+
+class SchedulerOverloaded(Exception):
+    """Raised when a request cannot be admitted; carries a Retry-After hint."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.retry_after = retry_after
+
+
+@dataclass(eq=False)
+class SolveTicket:
+    """A request waiting for, or holding, a solve slot."""
+    request_id: str
+    client_id: str
+    priority: str
+    pair_count: int
+    large: bool
+    granted: asyncio.Future
+    token: CancelToken = field(default_factory=CancelToken)
+    cancelled: asyncio.Event = field(default_factory=asyncio.Event)
+    state: str = "queued"
+    submitted_at: float = field(default_factory=time.monotonic)
+    started_at: Optional[float] = None
+
+
+class SolveScheduler:
+    """Priority queues plus global, large-solve and per-client limits."""
+
+    def __init__(self, max_running: int, max_large: int, max_per_client: int, max_queued: int, large_threshold: int):
+        self.max_running = max_running
+        self.max_large = max_large
+        self.max_per_client = max_per_client
+        self.max_queued = max_queued
+        self.large_threshold = large_threshold
+        self._queues = {priority: deque() for priority in PRIORITIES}
+        self._running: set[SolveTicket] = set()
+        self._tickets: dict[str, SolveTicket] = {}
+        self._per_client: Counter = Counter()
+        self._avg_solve_seconds = 1.0
+        self.rejected = 0
+        self.cancelled = 0
+
+    # ---- public API ----
+
+    def is_active(self, request_id: str) -> bool:
+        return request_id in self._tickets
+
+    @asynccontextmanager
+    async def slot(self, request_id: str, client_id: str, priority: str, pair_count: int):
+        """Wait for a solve slot; raises SchedulerOverloaded or SolveCancelled."""
+        ticket = self._submit(request_id, client_id, priority, pair_count)
+        try:
+            await ticket.granted
+            yield ticket
+        finally:
+            self._finish(ticket)
+
+    async def run(self, ticket: SolveTicket, work: Awaitable):
+        """Await ``work`` unless the ticket is cancelled first."""
+        work_task = asyncio.ensure_future(work)
+        cancel_task = asyncio.ensure_future(ticket.cancelled.wait())
+        try:
+            done, _ = await asyncio.wait({work_task, cancel_task}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            cancel_task.cancel()
+        if work_task in done:
+            return work_task.result()
+        work_task.cancel()
+        raise SolveCancelled()
+
+    def cancel(self, request_id: str) -> bool:
+        """Cancel a queued or running request. Returns False if it is unknown."""
+        ticket = self._tickets.get(request_id)
+        if ticket is None or ticket.cancelled.is_set():
+            return False
+        self.cancelled += 1
+        ticket.cancelled.set()
+        ticket.token.cancel()
+        if ticket.state == "queued":
+            self._queues[ticket.priority].remove(ticket)
+            ticket.granted.set_exception(SolveCancelled())
+            # The waiter re-raises it; don't warn about an unretrieved exception
+            ticket.granted.exception()
+        return True
+
+    def status(self) -> dict:
+        return {
+            "running": len(self._running),
+            "running_large": self._running_large(),
+            "queued": {priority: len(queue) for priority, queue in self._queues.items()},
+            "max_running": self.max_running,
+            "max_large": self.max_large,
+            "max_per_client": self.max_per_client,
+            "max_queued": self.max_queued,
+            "large_pair_threshold": self.large_threshold,
+            "average_solve_seconds": round(self._avg_solve_seconds, 3),
+            "rejected": self.rejected,
+            "cancelled": self.cancelled,
+        }
+
+    # ---- internals ----
+
+    def _queued_count(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def _running_large(self) -> int:
+        return sum(1 for ticket in self._running if ticket.large)
+
+    def _retry_after(self) -> int:
+        backlog = self._queued_count() + len(self._running) + 1
+        return max(1, math.ceil(self._avg_solve_seconds * backlog / self.max_running))
+
+    def _submit(self, request_id: str, client_id: str, priority: str, pair_count: int) -> SolveTicket:
+        if self._per_client[client_id] >= self.max_per_client:
+            self.rejected += 1
+            raise SchedulerOverloaded(
+                f"Client already has {self.max_per_client} optimization requests in progress",
+                self._retry_after(),
+            )
+        if self._queued_count() >= self.max_queued:
+            self.rejected += 1
+            raise SchedulerOverloaded("Optimization queue is full", self._retry_after())
+
+        ticket = SolveTicket(
+            request_id=request_id,
+            client_id=client_id,
+            priority=priority,
+            pair_count=pair_count,
+            large=pair_count >= self.large_threshold,
+            granted=asyncio.get_running_loop().create_future(),
+        )
+        self._tickets[request_id] = ticket
+        self._per_client[client_id] += 1
+        self._queues[priority].append(ticket)
+        self._dispatch()
+        return ticket
+
+    def _dispatch(self):
+        while len(self._running) < self.max_running:
+            ticket = self._next_eligible()
+            if ticket is None:
+                return
+            self._queues[ticket.priority].remove(ticket)
+            ticket.state = "running"
+            ticket.started_at = time.monotonic()
+            self._running.add(ticket)
+            ticket.granted.set_result(None)
+
+    def _next_eligible(self) -> Optional[SolveTicket]:
+        large_full = self._running_large() >= self.max_large
+        for priority in PRIORITIES:
+            for ticket in self._queues[priority]:
+                if not (ticket.large and large_full):
+                    return ticket
+        return None
+
+    def _finish(self, ticket: SolveTicket):
+        if ticket.state == "running":
+            self._running.discard(ticket)
+            if not ticket.cancelled.is_set():
+                elapsed = time.monotonic() - ticket.started_at
+                self._avg_solve_seconds = 0.8 * self._avg_solve_seconds + 0.2 * elapsed
+        elif ticket.state == "queued" and ticket in self._queues[ticket.priority]:
+            self._queues[ticket.priority].remove(ticket)
+        ticket.state = "done"
+        self._tickets.pop(ticket.request_id, None)
+        self._per_client[ticket.client_id] -= 1
+        if self._per_client[ticket.client_id] <= 0:
+            del self._per_client[ticket.client_id]
+        self._dispatch()
+
+
+scheduler = SolveScheduler(
+    max_running=settings.MAX_CONCURRENT_SOLVES or os.cpu_count() or 1,
+    max_large=settings.MAX_CONCURRENT_LARGE_SOLVES,
+    max_per_client=settings.MAX_SOLVES_PER_CLIENT,
+    max_queued=settings.MAX_QUEUED_SOLVES,
+    large_threshold=settings.LARGE_SOLVE_PAIR_THRESHOLD,
+)
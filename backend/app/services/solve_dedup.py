@@ -0,0 +1,95 @@
+"""
+De-duplication of identical concurrent solves.
+
+Two ``generate`` requests with the same config against the same dataset
+version produce the same plan, so only one of them should pay for CBC.
+Inside a process ``run_deduplicated`` makes the followers await the
+leader's future; this happens before admission, so only the leader queues
+for a scheduler slot. With the shared SQLite store ``run_claimed`` (called
+by the leader once it holds a slot) uses the ``solves`` table as a
+cross-worker lock, and the other workers poll it for the leader's result.
+"""
+import asyncio
+import hashlib
+import os
+import time
+import uuid
+from typing import Awaitable, Callable
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.schemas.item import TransferPlanConfig, TransferPlanResult
+from app.services.cbc import SolveCancelled
+from app.services.scheduler import SchedulerOverloaded
+from app.services.store import store
+
+_POLL_INTERVAL_SECONDS = 0.1
+_OWNER = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+_inflight: dict[str, asyncio.Future] = {}
+
+
+def solve_key(dataset_version: int, config: TransferPlanConfig) -> str:
+    """Key identifying a solve: dataset version plus the full config."""
+    payload = f"{dataset_version}:{config.model_dump_json()}"
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+async def run_deduplicated(key: str, lead: Callable[[], Awaitable[TransferPlanResult]]) -> TransferPlanResult:
+    """Await ``lead()`` once per ``key`` in this process no matter how many callers ask concurrently."""
+    while key in _inflight:
+        try:
+            return await asyncio.shield(_inflight[key])
+        except (SolveCancelled, SchedulerOverloaded):
+            # The leader's request was cancelled or not admitted; take over the solve
+            continue
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        result = await lead()
+        future.set_result(result)
+        return result
+    except BaseException as exc:
+        if isinstance(exc, asyncio.CancelledError):
+            exc = SolveCancelled()
+        future.set_exception(exc)
+        # Followers re-raise it; don't warn about an unretrieved exception
+        future.exception()
+        raise
+    finally:
+        del _inflight[key]
+
+
+async def run_claimed(key: str, solve: Callable[[], TransferPlanResult]) -> TransferPlanResult:
+    """Run ``solve`` in a worker thread, once across workers when storage is shared."""
+    if store.shared:
+        return await _run_shared(key, solve)
+    return await run_in_threadpool(solve)
+
+
+async def _run_shared(key: str, solve: Callable[[], TransferPlanResult]) -> TransferPlanResult:
+    """Cross-worker single flight backed by the store's ``solves`` table."""
+    while True:
+        if await run_in_threadpool(store.claim_solve, key, _OWNER):
+            try:
+                result = await run_in_threadpool(solve)
+            except BaseException:
+                await run_in_threadpool(store.release_solve, key)
+                raise
+            await run_in_threadpool(store.finish_solve, key, result.model_dump_json())
+            return result
+
+        # Another worker owns the solve: wait for its result. If the row
+        # disappears (leader failed, or its lock expired) try to claim again.
+        while True:
+            await asyncio.sleep(_POLL_INTERVAL_SECONDS)
+            row = await run_in_threadpool(store.get_solve, key)
+            if row is None:
+                break
+            started_at, result_json = row
+            if result_json is not None:
+                return TransferPlanResult.model_validate_json(result_json)
+            if time.time() - started_at > settings.SOLVE_LOCK_TIMEOUT_SECONDS:
+                break
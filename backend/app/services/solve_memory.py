@@ -0,0 +1,191 @@
+"""
+Memory estimates, caps and peak tracking for optimization requests.
+
+PuLP keeps every variable, constraint and coefficient as Python objects,
+so the memory of a solve grows linearly with the model. Measured with
+tracemalloc over ``generate_plan`` (``benchmarks/solve_memory.py``), the
+peak is about 480 bytes per nonzero coefficient, 950 bytes per constraint
+row and 330 bytes per binary variable on top, covering the PuLP objects,
+the MPS file written for CBC and the solution read back. The flow engine
+for ``balance_utilization`` needs about 100 bytes per pair. The CBC
+subprocess allocates its own memory and is not included.
+
+``estimate_model`` lays the model out the way ``build_problem`` does, from
+the feasible pair count alone, so a request is sized before anything is
+built. Capacity rows are counted with ``capacity.family_terms``, the check
+the model builder uses, so plants with a limit but no coefficients add
+nothing (and keep ``balance_utilization`` on the flow engine). ``fit_to_cap`` enforces ``MAX_SOLVE_MEMORY_MB``: with the
+``downgrade`` policy an oversized request is solved with the cheapest
+formulation that fits (the assignment-only MILP, then the LP relaxation)
+and only rejected when even that is over the cap.
+
+Nothing here imports PuLP, so the API can size requests without loading
+the optimization stack.
+"""
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Optional
+
+from app.schemas.item import Plant, Product, TransferPlanConfig
+from app.services.balance import supports as balance_engine_supports
+from app.services.capacity import family_terms, has_timed_products
+
+BYTES_PER_NONZERO = 480
+BYTES_PER_ROW = 950
+BYTES_PER_BINARY = 330
+FLOW_BYTES_PER_PAIR = 110
+
+MB = 1024 * 1024
+
+class SolveTooLarge(Exception):
+    """The request's estimated memory is over the cap, even after downgrading."""
+
+    def __init__(self, estimate: "ModelEstimate", cap_bytes: int):
+        self.estimate = estimate
+        self.cap_bytes = cap_bytes
+        super().__init__(
+            f"Estimated solve memory {estimate.bytes / MB:.0f} MB ({estimate.variables} variables, "
+            f"{estimate.nonzeros} nonzeros) exceeds the {cap_bytes / MB:.0f} MB limit. "
+            "Exclude products or plants to shrink the model."
+        )
+
+
+@dataclass(frozen=True)
+class ModelEstimate:
+    """Size of the model a request would build and its estimated peak memory."""
+    engine: str
+    variables: int
+    binaries: int
+    rows: int
+    nonzeros: int
+    bytes: int
+
+
+def estimate_model(
+    config: TransferPlanConfig, pair_count: int, products: list[Product], plants: list[Plant],
+) -> ModelEstimate:
+    """Estimated model size and peak memory of ``generate_plan`` for ``pair_count`` feasible pairs."""
+    n_products, n_plants = len(products), len(plants)
+    binary = not config.allow_fractional_assignment
+    assignment_only = binary and config.milp_formulation == "assignment"
+    volume_variables = binary and not assignment_only
+
+    capacity_rows, capacity_nonzeros = 0, 0
+    timed = has_timed_products(products) if config.capacity_constraints else False
+    for family in config.capacity_constraints:
+        for plant in plants:
+            terms = family_terms(family, plant, timed)
+            if terms:
+                # Volume and product-line terms only stay apart with volume variables
+                capacity_rows += 1
+                capacity_nonzeros += (terms if volume_variables else 1) * pair_count // n_plants
+
+    if config.solver_engine == "auto" and balance_engine_supports(config) and not capacity_rows:
+        return ModelEstimate("flow", 0, 0, 0, 0, FLOW_BYTES_PER_PAIR * pair_count)
+
+    variables = pair_count * (2 if volume_variables else 1)
+    binaries = pair_count if binary else 0
+    # Demand (or Assign) rows and unit capacity rows: one term per pair each
+    rows = n_products + n_plants + capacity_rows
+    nonzeros = 2 * pair_count + capacity_nonzeros
+    if config.objective_function == "balance_utilization":
+        variables += 1
+        rows += n_plants
+        nonzeros += pair_count + n_plants + 1
+    else:
+        # Volume and one-time cost terms; they share the variable in the assignment formulation
+        nonzeros += pair_count * (2 if volume_variables else 1)
+    if volume_variables:
+        rows += pair_count
+        nonzeros += 2 * pair_count
+    if binary and config.budget_capital:
+        rows += 1
+        nonzeros += pair_count
+
+    estimate = BYTES_PER_NONZERO * nonzeros + BYTES_PER_ROW * rows + BYTES_PER_BINARY * binaries
+    return ModelEstimate("milp", variables, binaries, rows, nonzeros, estimate)
+
+
+def fit_to_cap(
+    config: TransferPlanConfig,
+    pair_count: int,
+    products: list[Product],
+    plants: list[Plant],
+    cap_bytes: Optional[int],
+    policy: str,
+) -> tuple[TransferPlanConfig, ModelEstimate, Optional[str]]:
+    """
+    The config to solve under the memory cap, its estimate and a downgrade note.
+
+    Raises ``SolveTooLarge`` when the request (or, with the ``downgrade``
+    policy, its cheapest formulation) is over ``cap_bytes``.
+    """
+    estimate = estimate_model(config, pair_count, products, plants)
+    if cap_bytes is None or estimate.bytes <= cap_bytes:
+        return config, estimate, None
+    if policy == "downgrade":
+        candidates = []
+        if not config.allow_fractional_assignment and config.milp_formulation == "volume":
+            candidates.append(("the assignment-only MILP", {"milp_formulation": "assignment"}))
+        if not config.allow_fractional_assignment:
+            candidates.append(("the LP relaxation (fractional assignment)", {"allow_fractional_assignment": True}))
+        for label, update in candidates:
+            downgraded = config.model_copy(update=update)
+            smaller = estimate_model(downgraded, pair_count, products, plants)
+            if smaller.bytes <= cap_bytes:
+                note = (
+                    f"Solved with {label}: the requested model needs an estimated "
+                    f"{estimate.bytes / MB:.0f} MB, over the {cap_bytes / MB:.0f} MB limit"
+                )
+                return downgraded, smaller, note
+    raise SolveTooLarge(estimate, cap_bytes)
+
+
+@dataclass
+class MemoryMeasurement:
+    peak_bytes: Optional[int] = None
+
+    @property
+    def peak_mb(self) -> Optional[float]:
+        return None if self.peak_bytes is None else round(self.peak_bytes / MB, 1)
+
+
+class PeakTracker:
+    """
+    Peak traced memory during a block, via tracemalloc.
+
+    Tracing starts with the first active block and stops with the last.
+    tracemalloc has one process-wide peak, so when solves overlap in a
+    worker each one reports the peak of all of them (an upper bound).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active = 0
+
+    @contextmanager
+    def track(self, enabled: bool = True):
+        """Yields a ``MemoryMeasurement`` whose peak is filled in when the block exits."""
+        measurement = MemoryMeasurement()
+        if not enabled:
+            yield measurement
+            return
+        with self._lock:
+            if self._active == 0:
+                tracemalloc.start()
+                tracemalloc.reset_peak()
+            self._active += 1
+            baseline = tracemalloc.get_traced_memory()[0]
+        try:
+            yield measurement
+        finally:
+            with self._lock:
+                measurement.peak_bytes = max(0, tracemalloc.get_traced_memory()[1] - baseline)
+                self._active -= 1
+                if self._active == 0:
+                    tracemalloc.stop()
+
+
+peak_tracker = PeakTracker()
@@ -0,0 +1,83 @@
+"""
+Lazy loading and readiness of the optimization stack.
+
+Importing PuLP and starting CBC for the first time is the slowest part of
+a cold start, and most requests (CRUD, status, cache hits) never need it.
+The routes therefore get the optimizer through ``get_optimizer()``, which
+imports it on first use. ``start_warmup()`` does the same in a background
+thread at startup and also runs a tiny LP through CBC, so ``/ready`` can
+report that the solver binary actually works.
+"""
+import logging
+import threading
+import time
+from types import ModuleType
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_optimizer: Optional[ModuleType] = None
+_load_seconds: Optional[float] = None
+_verify_seconds: Optional[float] = None
+_solver_verified = False
+_solver_error: Optional[str] = None
+_warmup_thread: Optional[threading.Thread] = None
+
+
+def get_optimizer() -> ModuleType:
+    """Import ``app.services.optimizer`` (and PuLP) on first use."""
+    global _optimizer, _load_seconds
+    if _optimizer is None:
+        with _lock:
+            if _optimizer is None:
+                start = time.perf_counter()
+                from app.services import optimizer
+                _load_seconds = time.perf_counter() - start
+                _optimizer = optimizer
+    return _optimizer
+
+
+def verify_solver() -> bool:
+    """Solve a one-variable LP with CBC; records the outcome for ``/ready``."""
+    global _solver_verified, _solver_error, _verify_seconds
+    get_optimizer()
+    from pulp import LpMinimize, LpProblem, LpStatusOptimal, LpVariable, PULP_CBC_CMD
+
+    start = time.perf_counter()
+    try:
+        prob = LpProblem("Solver_Check", LpMinimize)
+        v = LpVariable("v", lowBound=1)
+        prob += v
+        prob.solve(PULP_CBC_CMD(msg=0))
+        if prob.status != LpStatusOptimal:
+            raise RuntimeError(f"CBC returned status {prob.status}")
+    except Exception as exc:
+        _solver_error = str(exc)
+        logger.error("CBC solver check failed: %s", exc)
+        return False
+    finally:
+        _verify_seconds = time.perf_counter() - start
+    _solver_verified = True
+    _solver_error = None
+    return True
+
+
+def start_warmup():
+    """Load the optimizer and verify CBC in a background thread (once)."""
+    global _warmup_thread
+    with _lock:
+        if _warmup_thread is not None and (_warmup_thread.is_alive() or _solver_verified):
+            return
+        _warmup_thread = threading.Thread(target=verify_solver, name="solver-warmup", daemon=True)
+        _warmup_thread.start()
+
+
+def readiness() -> dict:
+    return {
+        "ready": _solver_verified,
+        "optimizer_loaded": _optimizer is not None,
+        "optimizer_load_seconds": round(_load_seconds, 3) if _load_seconds is not None else None,
+        "solver_check_seconds": round(_verify_seconds, 3) if _verify_seconds is not None else None,
+        "solver_error": _solver_error,
+    }
@@ -0,0 +1,651 @@
+"""
+Storage backends for products and plants.
+
+The in-memory backend keeps everything in process-local dictionaries and is
+only consistent inside a single process. When ``DATABASE_URL`` points at a
+SQLite file (``sqlite:///./transfer_plan.db``) every uvicorn worker reads and
+writes the same database, so the API can be run with ``--workers N``.
+
+Both backends expose the same interface:
+
+- ``store.products`` / ``store.plants``: collections keyed by the integer ``id``
+  and de-duplicated on the business key (``product_id`` / ``plant_id``)
+- ``store.version``: a counter bumped on every mutation, used to key solves
+- ``store.replace_dataset(products, plants)``: swap the whole dataset as one mutation
+- ``store.snapshot()``: an immutable ``DatasetSnapshot`` of the current version
+- ``store.get_snapshot(version)``: one of the last ``SNAPSHOT_HISTORY`` versions
+- ``store.plans``: saved plan sessions (see ``app.services.plan_sessions``)
+
+Snapshots share structure: rows live in ``PersistentMap``s whose buckets are
+never mutated, so a write copies one bucket instead of the whole dataset and
+diffing two versions only visits the buckets that differ.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Iterator, Mapping, Optional, Type
+
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.schemas.item import Plant, Product
+
+
+# ==================== SNAPSHOTS ====================
+
+_BUCKETS = 64
+_EMPTY_BUCKETS = ({},) * _BUCKETS
+
+
+class PersistentMap(Mapping):
+    """
+    Immutable ``id -> row`` map with structural sharing.
+
+    Rows are spread over a fixed number of buckets; ``set`` and ``remove``
+    return a new map that copies only the touched bucket and shares the rest.
+    """
+
+    __slots__ = ("_buckets", "_len")
+
+    def __init__(self, buckets: tuple = _EMPTY_BUCKETS, length: int = 0):
+        self._buckets = buckets
+        self._len = length
+
+    @classmethod
+    def from_rows(cls, rows) -> "PersistentMap":
+        buckets = [{} for _ in range(_BUCKETS)]
+        for row in rows:
+            buckets[row.id % _BUCKETS][row.id] = row
+        return cls(tuple(buckets), sum(len(b) for b in buckets))
+
+    def __getitem__(self, row_id: int):
+        return self._buckets[row_id % _BUCKETS][row_id]
+
+    def __iter__(self) -> Iterator[int]:
+        for bucket in self._buckets:
+            yield from bucket
+
+    def __len__(self) -> int:
+        return self._len
+
+    def set(self, row) -> "PersistentMap":
+        index = row.id % _BUCKETS
+        bucket = dict(self._buckets[index])
+        added = row.id not in bucket
+        bucket[row.id] = row
+        return self._replace(index, bucket, self._len + added)
+
+    def remove(self, row_id: int) -> "PersistentMap":
+        index = row_id % _BUCKETS
+        if row_id not in self._buckets[index]:
+            return self
+        bucket = dict(self._buckets[index])
+        del bucket[row_id]
+        return self._replace(index, bucket, self._len - 1)
+
+    def _replace(self, index: int, bucket: dict, length: int) -> "PersistentMap":
+        buckets = list(self._buckets)
+        buckets[index] = bucket
+        return PersistentMap(tuple(buckets), length)
+
+    def changed_ids(self, newer: "PersistentMap") -> tuple[list[int], list[int], list[int]]:
+        """``(added, removed, changed)`` ids going from this map to ``newer``."""
+        added, removed, changed = [], [], []
+        for old_bucket, new_bucket in zip(self._buckets, newer._buckets):
+            if old_bucket is new_bucket:
+                continue
+            for row_id, row in new_bucket.items():
+                previous = old_bucket.get(row_id)
+                if previous is None:
+                    added.append(row_id)
+                elif previous is not row and previous != row:
+                    changed.append(row_id)
+            removed.extend(row_id for row_id in old_bucket if row_id not in new_bucket)
+        return sorted(added), sorted(removed), sorted(changed)
+
+
+@dataclass(frozen=True)
+class DatasetSnapshot:
+    """Products and plants exactly as they were at ``version``. Never mutated."""
+    version: int
+    products: PersistentMap
+    plants: PersistentMap
+
+    @cached_property
+    def product_list(self) -> list[Product]:
+        return [self.products[i] for i in sorted(self.products)]
+
+    @cached_property
+    def plant_list(self) -> list[Plant]:
+        return [self.plants[i] for i in sorted(self.plants)]
+
+
+def diff_snapshots(old: DatasetSnapshot, new: DatasetSnapshot) -> dict:
+    """Business keys added, removed and changed between two snapshots."""
+    def section(old_rows: PersistentMap, new_rows: PersistentMap, key_field: str) -> dict:
+        added, removed, changed = old_rows.changed_ids(new_rows)
+        return {
+            "added": [getattr(new_rows[i], key_field) for i in added],
+            "removed": [getattr(old_rows[i], key_field) for i in removed],
+            "changed": [getattr(new_rows[i], key_field) for i in changed],
+        }
+
+    return {
+        "from_version": old.version,
+        "to_version": new.version,
+        "products": section(old.products, new.products, "product_id"),
+        "plants": section(old.plants, new.plants, "plant_id"),
+    }
+
+
+class _SnapshotHistory:
+    """The last ``SNAPSHOT_HISTORY`` snapshots a process has seen, by version."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._lock = threading.Lock()
+        self._snapshots: OrderedDict[int, DatasetSnapshot] = OrderedDict()
+
+    def add(self, snapshot: DatasetSnapshot):
+        with self._lock:
+            self._snapshots[snapshot.version] = snapshot
+            self._snapshots.move_to_end(snapshot.version)
+            while len(self._snapshots) > self.size:
+                self._snapshots.popitem(last=False)
+
+    def get(self, version: int) -> Optional[DatasetSnapshot]:
+        with self._lock:
+            return self._snapshots.get(version)
+
+    def latest(self) -> Optional[DatasetSnapshot]:
+        with self._lock:
+            return max(self._snapshots.values(), key=lambda s: s.version, default=None)
+
+    def versions(self) -> list[int]:
+        with self._lock:
+            return sorted(self._snapshots)
+
+
+# ==================== IN-MEMORY BACKEND ====================
+
+class MemoryCollection:
+    """Dictionary-backed collection (single process only)."""
+
+    def __init__(self, store: "MemoryStore", model: Type[BaseModel], key_field: str):
+        self._store = store
+        self._model = model
+        self._key_field = key_field
+        self.rows = PersistentMap()
+        self._ids = {}
+        self._counter = 0
+
+    def all(self) -> list:
+        rows = self.rows
+        return [rows[i] for i in sorted(rows)]
+
+    def get(self, row_id: int):
+        return self.rows.get(row_id)
+
+    def count(self) -> int:
+        return len(self.rows)
+
+    def upsert(self, data: BaseModel):
+        """Create a row, or replace the row with the same business key."""
+        with self._store.lock:
+            key = getattr(data, self._key_field)
+            row_id = self._ids.get(key)
+            if row_id is None:
+                self._counter += 1
+                row_id = self._ids[key] = self._counter
+            row = self._model(id=row_id, **data.model_dump())
+            self.rows = self.rows.set(row)
+            self._store.bump()
+            return row
+
+    def update(self, row_id: int, changes: dict):
+        with self._store.lock:
+            stored = self.rows.get(row_id)
+            if stored is None:
+                return None
+            row = stored.model_copy(update=changes)
+            self.rows = self.rows.set(row)
+            self._store.bump()
+            return row
+
+    def delete(self, row_id: int) -> bool:
+        with self._store.lock:
+            stored = self.rows.get(row_id)
+            if stored is None:
+                return False
+            self.rows = self.rows.remove(row_id)
+            del self._ids[getattr(stored, self._key_field)]
+            self._store.bump()
+            return True
+
+    def _replace_rows(self, rows: list[dict]) -> list:
+        """Drop every row, reset the id counter and insert ``rows`` (caller holds the lock and bumps)."""
+        models = [self._model(id=counter, **data) for counter, data in enumerate(rows, start=1)]
+        self.rows = PersistentMap.from_rows(models)
+        self._ids = {getattr(m, self._key_field): m.id for m in models}
+        self._counter = len(rows)
+        return models
+
+
+class MemoryPlans:
+    """Saved plans kept in process memory (lost on restart)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows: dict[int, dict] = {}
+        self._counter = 0
+
+    def add(self, record: dict) -> int:
+        with self._lock:
+            self._counter += 1
+            self._rows[self._counter] = {**record, "id": self._counter}
+            return self._counter
+
+    def list(self, session_id: Optional[str] = None) -> list[dict]:
+        with self._lock:
+            rows = list(self._rows.values())
+        return [r for r in rows if session_id is None or r["session_id"] == session_id]
+
+    def get(self, plan_id: int) -> Optional[dict]:
+        return self._rows.get(plan_id)
+
+    def delete(self, plan_id: int) -> bool:
+        with self._lock:
+            return self._rows.pop(plan_id, None) is not None
+
+
+class MemoryStore:
+    """Process-local store. Identical solves are de-duplicated in-process."""
+
+    shared = False
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.version = 0
+        self.products = MemoryCollection(self, Product, "product_id")
+        self.plants = MemoryCollection(self, Plant, "plant_id")
+        self.plans = MemoryPlans()
+        self.history = _SnapshotHistory(settings.SNAPSHOT_HISTORY)
+        self._snapshot = DatasetSnapshot(0, self.products.rows, self.plants.rows)
+        self.history.add(self._snapshot)
+
+    def bump(self):
+        self.version += 1
+        self._snapshot = DatasetSnapshot(self.version, self.products.rows, self.plants.rows)
+        self.history.add(self._snapshot)
+
+    def replace_dataset(self, products: list[dict], plants: list[dict]) -> tuple[list, list]:
+        """Replace all products and plants as one write (a single version bump)."""
+        with self.lock:
+            replaced = self.products._replace_rows(products), self.plants._replace_rows(plants)
+            self.bump()
+            return replaced
+
+    def snapshot(self) -> DatasetSnapshot:
+        return self._snapshot
+
+    def get_snapshot(self, version: int) -> Optional[DatasetSnapshot]:
+        return self.history.get(version)
+
+
+# ==================== SQLITE BACKEND ====================
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL UNIQUE,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS plants (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL UNIQUE,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS solves (
+    key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    result TEXT
+);
+CREATE TABLE IF NOT EXISTS changes (
+    version INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    row_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS changes_version ON changes (version);
+CREATE TABLE IF NOT EXISTS plans (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    session_id TEXT,
+    created_at TEXT NOT NULL,
+    dataset_version INTEGER,
+    config TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    columns TEXT NOT NULL
+);
+INSERT OR IGNORE INTO meta (name, value) VALUES ('version', 0);
+"""
+
+# Versions kept in the ``changes`` log; a worker further behind reloads everything
+_CHANGE_LOG_RETENTION = 1000
+
+
+class SqliteCollection:
+    """Table-backed collection shared by every worker using the same file."""
+
+    def __init__(self, store: "SqliteStore", table: str, model: Type[BaseModel], key_field: str):
+        self._store = store
+        self._table = table
+        self._model = model
+        self._key_field = key_field
+
+    def _row(self, row_id: int, data: str):
+        return self._model(id=row_id, **json.loads(data))
+
+    def all(self, conn: Optional[sqlite3.Connection] = None) -> list:
+        conn = conn or self._store.connection()
+        rows = conn.execute(f"SELECT id, data FROM {self._table} ORDER BY id").fetchall()
+        return [self._row(row_id, data) for row_id, data in rows]
+
+    def get(self, row_id: int):
+        row = self._store.connection().execute(
+            f"SELECT id, data FROM {self._table} WHERE id = ?", (row_id,)
+        ).fetchone()
+        return self._row(*row) if row else None
+
+    def count(self) -> int:
+        return self._store.connection().execute(f"SELECT COUNT(*) FROM {self._table}").fetchone()[0]
+
+    def upsert(self, data: BaseModel):
+        """Create a row, or replace the row with the same business key."""
+        payload = data.model_dump_json()
+        with self._store.transaction() as tx:
+            row_id = tx.conn.execute(
+                f"INSERT INTO {self._table} (key, data) VALUES (?, ?) "
+                f"ON CONFLICT(key) DO UPDATE SET data = excluded.data RETURNING id",
+                (getattr(data, self._key_field), payload),
+            ).fetchone()[0]
+            tx.log_change(self._table, row_id)
+        return self._row(row_id, payload)
+
+    def update(self, row_id: int, changes: dict):
+        with self._store.transaction() as tx:
+            row = tx.conn.execute(f"SELECT id, data FROM {self._table} WHERE id = ?", (row_id,)).fetchone()
+            if row is None:
+                return None
+            updated = self._row(*row).model_copy(update=changes)
+            tx.conn.execute(
+                f"UPDATE {self._table} SET data = ? WHERE id = ?",
+                (updated.model_dump_json(exclude={"id"}), row_id),
+            )
+            tx.log_change(self._table, row_id)
+        return updated
+
+    def delete(self, row_id: int) -> bool:
+        with self._store.transaction() as tx:
+            deleted = tx.conn.execute(f"DELETE FROM {self._table} WHERE id = ?", (row_id,)).rowcount
+            if deleted:
+                tx.log_change(self._table, row_id)
+        return deleted > 0
+
+    def _replace_rows(self, tx: "_Transaction", rows: list[dict]) -> list:
+        """Drop every row, reset the id counter and insert ``rows`` inside ``tx``."""
+        models = [self._model(id=counter, **data) for counter, data in enumerate(rows, start=1)]
+        tx.conn.execute(f"DELETE FROM {self._table}")
+        tx.conn.execute("DELETE FROM sqlite_sequence WHERE name = ?", (self._table,))
+        tx.conn.executemany(
+            f"INSERT INTO {self._table} (id, key, data) VALUES (?, ?, ?)",
+            [
+                (m.id, getattr(m, self._key_field), m.model_dump_json(exclude={"id"}))
+                for m in models
+            ],
+        )
+        tx.log_change(self._table, None)
+        return models
+
+    def refresh(self, conn: sqlite3.Connection, rows: PersistentMap, row_ids: set) -> PersistentMap:
+        """Apply the current state of ``row_ids`` on top of ``rows``."""
+        for row_id in row_ids:
+            row = conn.execute(f"SELECT id, data FROM {self._table} WHERE id = ?", (row_id,)).fetchone()
+            rows = rows.set(self._row(*row)) if row else rows.remove(row_id)
+        return rows
+
+
+_PLAN_FIELDS = ("name", "session_id", "created_at", "dataset_version", "config", "summary", "columns")
+
+
+class SqlitePlans:
+    """Saved plans in the ``plans`` table, visible to every worker."""
+
+    def __init__(self, store: "SqliteStore"):
+        self._store = store
+
+    def add(self, record: dict) -> int:
+        with self._store.transaction(bump=False) as tx:
+            return tx.conn.execute(
+                f"INSERT INTO plans ({', '.join(_PLAN_FIELDS)}) VALUES ({', '.join('?' * len(_PLAN_FIELDS))})",
+                tuple(record[f] for f in _PLAN_FIELDS),
+            ).lastrowid
+
+    def list(self, session_id: Optional[str] = None) -> list[dict]:
+        fields = ("id",) + _PLAN_FIELDS[:-1]
+        query = f"SELECT {', '.join(fields)} FROM plans"
+        params = ()
+        if session_id is not None:
+            query += " WHERE session_id = ?"
+            params = (session_id,)
+        rows = self._store.connection().execute(query + " ORDER BY id", params).fetchall()
+        return [dict(zip(fields, row)) for row in rows]
+
+    def get(self, plan_id: int) -> Optional[dict]:
+        fields = ("id",) + _PLAN_FIELDS
+        row = self._store.connection().execute(
+            f"SELECT {', '.join(fields)} FROM plans WHERE id = ?", (plan_id,)
+        ).fetchone()
+        return dict(zip(fields, row)) if row else None
+
+    def delete(self, plan_id: int) -> bool:
+        with self._store.transaction(bump=False) as tx:
+            return tx.conn.execute("DELETE FROM plans WHERE id = ?", (plan_id,)).rowcount > 0
+
+
+class SqliteStore:
+    """
+    SQLite-backed store shared across worker processes.
+
+    Every data write runs in an IMMEDIATE transaction that bumps the dataset
+    version and logs the touched rows in ``changes``. ``snapshot()`` reads
+    the version and rows in one transaction, and only re-reads the logged
+    rows when this worker already holds a recent snapshot.
+    The ``solves`` table doubles as a cross-worker lock for identical solves.
+    """
+
+    shared = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self.connection().executescript(_SCHEMA)
+        self.products = SqliteCollection(self, "products", Product, "product_id")
+        self.plants = SqliteCollection(self, "plants", Plant, "plant_id")
+        self.plans = SqlitePlans(self)
+        self.history = _SnapshotHistory(settings.SNAPSHOT_HISTORY)
+        self._refresh_lock = threading.Lock()
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def transaction(self, bump: bool = True) -> "_Transaction":
+        """Write transaction; data writes (``bump=True``) also advance the version."""
+        return _Transaction(self.connection(), bump)
+
+    def replace_dataset(self, products: list[dict], plants: list[dict]) -> tuple[list, list]:
+        """Replace all products and plants in one transaction (a single version bump)."""
+        with self.transaction() as tx:
+            return self.products._replace_rows(tx, products), self.plants._replace_rows(tx, plants)
+
+    @property
+    def version(self) -> int:
+        return self.connection().execute("SELECT value FROM meta WHERE name = 'version'").fetchone()[0]
+
+    def snapshot(self) -> DatasetSnapshot:
+        # One refresh at a time, so concurrent requests share the same snapshot
+        with self._refresh_lock:
+            conn = self.connection()
+            conn.execute("BEGIN")
+            try:
+                version = conn.execute("SELECT value FROM meta WHERE name = 'version'").fetchone()[0]
+                cached = self.history.get(version)
+                if cached is not None:
+                    return cached
+                snapshot = self._load(conn, version, self.history.latest())
+            finally:
+                conn.execute("COMMIT")
+            self.history.add(snapshot)
+            return snapshot
+
+    def get_snapshot(self, version: int) -> Optional[DatasetSnapshot]:
+        """A retained snapshot; versions written by other workers appear once read here."""
+        if version == self.version:
+            return self.snapshot()
+        return self.history.get(version)
+
+    def _load(self, conn: sqlite3.Connection, version: int, base: Optional[DatasetSnapshot]) -> DatasetSnapshot:
+        if base is not None and base.version < version and version - base.version <= _CHANGE_LOG_RETENTION:
+            touched = {"products": set(), "plants": set()}
+            for kind, row_id in conn.execute(
+                "SELECT kind, row_id FROM changes WHERE version > ? AND version <= ?", (base.version, version)
+            ):
+                if row_id is None:
+                    touched[kind] = None
+                elif touched[kind] is not None:
+                    touched[kind].add(row_id)
+            maps = {}
+            for kind, collection, rows in (
+                ("products", self.products, base.products), ("plants", self.plants, base.plants),
+            ):
+                if touched[kind] is None:
+                    maps[kind] = PersistentMap.from_rows(collection.all(conn))
+                else:
+                    maps[kind] = collection.refresh(conn, rows, touched[kind])
+            return DatasetSnapshot(version, maps["products"], maps["plants"])
+        return DatasetSnapshot(
+            version,
+            PersistentMap.from_rows(self.products.all(conn)),
+            PersistentMap.from_rows(self.plants.all(conn)),
+        )
+
+    # ---- cross-worker solve coordination ----
+
+    def claim_solve(self, key: str, owner: str) -> bool:
+        """Try to become the worker that runs solve ``key``. Returns True on success."""
+        now = time.time()
+        with self.transaction(bump=False) as tx:
+            tx.conn.execute(
+                "DELETE FROM solves WHERE (finished_at IS NOT NULL AND finished_at < ?) "
+                "OR (finished_at IS NULL AND started_at < ?)",
+                (now - settings.SOLVE_RESULT_TTL_SECONDS, now - settings.SOLVE_LOCK_TIMEOUT_SECONDS),
+            )
+            inserted = tx.conn.execute(
+                "INSERT OR IGNORE INTO solves (key, owner, started_at) VALUES (?, ?, ?)",
+                (key, owner, now),
+            ).rowcount
+        return inserted > 0
+
+    def finish_solve(self, key: str, result: str):
+        with self.transaction(bump=False) as tx:
+            tx.conn.execute(
+                "UPDATE solves SET result = ?, finished_at = ? WHERE key = ?",
+                (result, time.time(), key),
+            )
+
+    def release_solve(self, key: str):
+        with self.transaction(bump=False) as tx:
+            tx.conn.execute("DELETE FROM solves WHERE key = ?", (key,))
+
+    def get_solve(self, key: str) -> Optional[tuple[float, Optional[str]]]:
+        """Return ``(started_at, result_json)`` for ``key``, or None if unclaimed."""
+        return self.connection().execute(
+            "SELECT started_at, result FROM solves WHERE key = ?", (key,)
+        ).fetchone()
+
+
+class _Transaction:
+    """
+    ``BEGIN IMMEDIATE`` ... ``COMMIT`` block.
+
+    For data writes (``bump=True``) the first ``log_change`` advances the
+    version, so a write that touches nothing leaves the version alone.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, bump: bool):
+        self.conn = conn
+        self._bump = bump
+        self.version: Optional[int] = None
+
+    def __enter__(self) -> "_Transaction":
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self
+
+    def log_change(self, kind: str, row_id: Optional[int]):
+        """Record that ``row_id`` of table ``kind`` changed (None: the whole table)."""
+        if not self._bump:
+            raise RuntimeError("log_change needs a data transaction")
+        if self.version is None:
+            self.version = self.conn.execute(
+                "UPDATE meta SET value = value + 1 WHERE name = 'version' RETURNING value"
+            ).fetchone()[0]
+            self.conn.execute("DELETE FROM changes WHERE version <= ?", (self.version - _CHANGE_LOG_RETENTION,))
+        self.conn.execute("INSERT INTO changes (version, kind, row_id) VALUES (?, ?, ?)", (self.version, kind, row_id))
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.conn.execute("ROLLBACK")
+            return False
+        self.conn.execute("COMMIT")
+        return False
+
+
+# ==================== FACTORY ====================
+
+def create_store(database_url: Optional[str]):
+    """
+    Pick a backend from ``DATABASE_URL`` (unset -> in-memory, ``sqlite:///`` -> SQLite).
+
+    Any other scheme is refused at startup: quietly falling back to memory
+    would give every worker its own copy of the data.
+    """
+    if not database_url:
+        return MemoryStore()
+    if database_url.startswith("sqlite:///"):
+        path = database_url[len("sqlite:///"):]
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        return SqliteStore(path)
+    raise ValueError(
+        f"Unsupported DATABASE_URL scheme {database_url.split(':', 1)[0]!r}: use sqlite:///path/to/file.db, "
+        "or leave DATABASE_URL unset for in-memory storage (single worker only)"
+    )
+
+
+store = create_store(settings.DATABASE_URL)
@@ -0,0 +1,79 @@
+"""
+Build and solve cost of each capacity constraint family.
+
+Solves the same synthetic catalog (with machine hours, floor area and
+pallet data filled in) once without extra families and once per family,
+then with all of them, and reports the rows added, model build time
+(PuLP objects, excluding CBC) and CBC solve time.
+
+Usage (from the ``backend`` directory)::
+
+    python benchmarks/capacity_constraints.py --products 10000 --plants 20
+    python benchmarks/capacity_constraints.py --products 10000 --plants 20 --fractional
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pulp import LpStatus, PULP_CBC_CMD  # noqa: E402
+
+from synthetic import make_dataset  # noqa: E402
+from app.schemas.item import Plant, Product, TransferPlanConfig  # noqa: E402
+from app.services.capacity import CAPACITY_FAMILIES, PairIndex, capacity_rows  # noqa: E402
+from app.services.optimizer import build_problem  # noqa: E402
+from app.services.prefilter import prefilter_pairs  # noqa: E402
+
+
+def run(products: list[Product], plants: list[Plant], families: list[str], fractional: bool, time_limit: int) -> dict:
+    config = TransferPlanConfig(allow_fractional_assignment=fractional, capacity_constraints=families)
+    start = time.perf_counter()
+    feasible_pairs = prefilter_pairs(products, plants, config)
+    index = PairIndex(feasible_pairs)
+    rows = capacity_rows(products, plants, config, index)
+    rows_s = time.perf_counter() - start
+    model = build_problem(products, plants, config, feasible_pairs, index, rows)
+    build_s = time.perf_counter() - start
+    model.prob.solve(PULP_CBC_CMD(msg=0, timeLimit=time_limit, gapRel=0.01))
+    solve_s = time.perf_counter() - start - build_s
+    return {
+        "pairs": len(feasible_pairs),
+        "rows": len(rows),
+        "nonzeros": sum(len(r.volume_terms) + len(r.assignment_terms) for r in rows),
+        "rows_s": rows_s,
+        "build_s": build_s,
+        "solve_s": solve_s,
+        "status": LpStatus[model.prob.status],
+        "objective": model.prob.objective.value(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=10000)
+    parser.add_argument("--plants", type=int, default=20)
+    parser.add_argument("--fractional", action="store_true", help="LP instead of MILP")
+    parser.add_argument("--time-limit", type=int, default=60, help="CBC time limit per solve (s)")
+    args = parser.parse_args()
+
+    products_data, plants_data = make_dataset(args.products, args.plants, seed=args.products, capacity_data=True)
+    products = [Product(id=i, **d) for i, d in enumerate(products_data, start=1)]
+    plants = [Plant(id=i, **d) for i, d in enumerate(plants_data, start=1)]
+
+    print(f"{args.products} products x {args.plants} plants, {'LP' if args.fractional else 'MILP'}")
+    print(f"{'families':>16} {'pairs':>8} {'rows':>5} {'nonzeros':>9} {'prefilter+rows s':>17} "
+          f"{'build s':>8} {'+build s':>9} {'solve s':>8} {'+solve s':>9} {'status':>11} {'objective':>14}")
+    base = None
+    for families in [[], *([f] for f in CAPACITY_FAMILIES), list(CAPACITY_FAMILIES)]:
+        row = run(products, plants, families, args.fractional, args.time_limit)
+        base = base or row
+        name = "+".join(families) if len(families) == 1 else ("none" if not families else "all")
+        print(f"{name:>16} {row['pairs']:>8} {row['rows']:>5} {row['nonzeros']:>9} {row['rows_s']:>17.3f} "
+              f"{row['build_s']:>8.3f} {row['build_s'] - base['build_s']:>+9.3f} {row['solve_s']:>8.3f} "
+              f"{row['solve_s'] - base['solve_s']:>+9.3f} {row['status']:>11} {row['objective'] or float('nan'):>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Reproducibility of ``generate_plan`` with and without ``deterministic``.
+
+Each configuration is solved ``--runs`` times on the same synthetic catalog,
+with products and plants shuffled and given different database ids every
+run (as after a re-import). It reports how many distinct plans (result
+fingerprints) came out and the spread of total cost; a deterministic solve
+should always give exactly one.
+
+Usage (from the ``backend`` directory)::
+
+    python benchmarks/determinism.py --products 400 --plants 12 --runs 5
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import make_dataset  # noqa: E402
+from app.schemas.item import Plant, Product, TransferPlanConfig  # noqa: E402
+from app.services.optimizer import generate_plan  # noqa: E402
+
+CONFIGS = {
+    "milp-volume": {},
+    "milp-assignment": {"milp_formulation": "assignment"},
+    "lp": {"allow_fractional_assignment": True},
+    "multi-objective": {"objective_function": "multi_objective"},
+    "balance-flow": {"objective_function": "balance_utilization"},
+}
+
+
+def shuffled(raw_products: list[dict], raw_plants: list[dict], seed: int) -> tuple[list[Product], list[Plant]]:
+    rng = random.Random(seed)
+    raw_products, raw_plants = raw_products[:], raw_plants[:]
+    rng.shuffle(raw_products)
+    rng.shuffle(raw_plants)
+    product_ids = rng.sample(range(1, 10 * len(raw_products)), len(raw_products))
+    plant_ids = rng.sample(range(1, 10 * len(raw_plants)), len(raw_plants))
+    products = sorted((Product(id=i, **p) for i, p in zip(product_ids, raw_products)), key=lambda p: p.id)
+    plants = sorted((Plant(id=i, **t) for i, t in zip(plant_ids, raw_plants)), key=lambda t: t.id)
+    return products, plants
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=400)
+    parser.add_argument("--plants", type=int, default=12)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--configs", nargs="+", choices=CONFIGS, default=list(CONFIGS))
+    args = parser.parse_args()
+
+    raw_products, raw_plants = make_dataset(args.products, args.plants, seed=args.products)
+    print(f"{'config':<16} {'mode':<14} {'plans':>5} {'min cost':>16} {'max cost':>16} {'mean s':>7}")
+    for name in args.configs:
+        for deterministic in (False, True):
+            config = TransferPlanConfig(**CONFIGS[name], deterministic=deterministic)
+            fingerprints, costs, seconds = set(), [], 0.0
+            for run in range(args.runs):
+                products, plants = shuffled(raw_products, raw_plants, run)
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    result = generate_plan(products, plants, config)
+                seconds += time.perf_counter() - start
+                fingerprints.add(result.fingerprint)
+                costs.append(result.total_cost)
+            mode = "deterministic" if deterministic else "default"
+            print(f"{name:<16} {mode:<14} {len(fingerprints):>5} {min(costs):>16,.2f} {max(costs):>16,.2f} "
+                  f"{seconds / args.runs:>7.2f}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,451 @@
+"""
+Load test and latency SLO report for the ``/api/v1`` endpoints.
+
+Simulated planners (``--users``, each with its own ``X-Client-Id``) loop
+over a weighted mix of requests with a short think time. Each phase has
+its own dataset and mix:
+
+- ``crud``: list/get/create/update/delete products and plants, status
+- ``planner``: the example data; mostly reads, some edits (new dataset
+  versions) and ``transfer-plan/generate`` with varied objectives and
+  exclusions, plus occasional ``load-example-data``
+- ``large``: a synthetic ``--products`` x ``--plants`` catalog; reads and
+  ``transfer-plan/generate`` what-ifs
+
+The app is driven in-process through a minimal ASGI client by default
+(no server, no extra dependencies), against ``--uvicorn N`` local workers
+(fresh SQLite database), or against a running server via ``--url``.
+
+The report has p50/p95/p99 latency, throughput, error rate (5xx and
+unexpected 4xx) and rejections (429) per endpoint and phase. With
+``--thresholds`` the run fails (exit code 1) when an endpoint's p95/p99 or
+the error rate exceeds its limit; with ``--baseline`` it also fails when
+an endpoint's p95 regressed by more than ``max_regression`` (and more
+than ``min_regression_ms``) against a report saved earlier with ``--save``.
+
+Usage (from the ``backend`` directory)::
+
+    python benchmarks/load_test.py --duration 20 --users 8
+    python benchmarks/load_test.py --save baseline.json
+    python benchmarks/load_test.py --thresholds benchmarks/load_test_thresholds.json --baseline baseline.json
+    python benchmarks/load_test.py --uvicorn 2 --phases planner large
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from load_test_workers import BACKEND_DIR, _free_port, _wait_until_up  # noqa: E402
+from synthetic import make_dataset  # noqa: E402
+
+API = "/api/v1"
+PHASES = ("crud", "planner", "large")
+
+
+# ==================== CLIENTS ====================
+
+class AsgiClient:
+    """Calls the ASGI app directly on the running event loop."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def request(self, method: str, path: str, body=None, headers=None) -> tuple[int, bytes]:
+        raw = json.dumps(body).encode() if body is not None else b""
+        path, _, query = path.partition("?")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": [
+                (b"host", b"loadtest"),
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(raw)).encode()),
+                *((k.lower().encode(), v.encode()) for k, v in (headers or {}).items()),
+            ],
+            "client": ("127.0.0.1", 50000),
+            "server": ("loadtest", 80),
+        }
+        status, chunks = 0, []
+        body_sent = False
+        finished = asyncio.Event()
+
+        async def receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": raw, "more_body": False}
+            # The client stays connected until the response is complete
+            await finished.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body"):
+                    finished.set()
+
+        await self.app(scope, receive, send)
+        return status, b"".join(chunks)
+
+
+class HttpClient:
+    """Blocking HTTP calls run in a thread pool sized to the number of users."""
+
+    def __init__(self, base_url: str, users: int):
+        self.base_url = base_url
+        self.pool = ThreadPoolExecutor(max_workers=users + 2)
+
+    def _call(self, method, path, body, headers) -> tuple[int, bytes]:
+        data = json.dumps(body).encode() if body is not None else None
+        req = urllib.request.Request(
+            f"{self.base_url}{path}", data=data, method=method,
+            headers={"Content-Type": "application/json", **(headers or {})},
+        )
+        try:
+            with urllib.request.urlopen(req, timeout=600) as resp:
+                return resp.status, resp.read()
+        except urllib.error.HTTPError as exc:
+            return exc.code, exc.read()
+
+    async def request(self, method: str, path: str, body=None, headers=None) -> tuple[int, bytes]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.pool, self._call, method, path, body, headers)
+
+
+@contextmanager
+def uvicorn_server(workers: int):
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'loadtest.db')}")
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+             "--workers", str(workers), "--log-level", "warning"],
+            cwd=BACKEND_DIR, env=env,
+        )
+        try:
+            _wait_until_up(base_url)
+            yield base_url
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+
+# ==================== WORKLOAD ====================
+
+class Recorder:
+    """Latency samples and outcome counts per endpoint."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.rejected = defaultdict(int)
+
+    def record(self, endpoint: str, seconds: float, status: int, expected: tuple = ()):
+        self.samples[endpoint].append(seconds)
+        if status == 429:
+            self.rejected[endpoint] += 1
+        elif status >= 400 and status not in expected:
+            self.errors[endpoint] += 1
+
+
+class Workload:
+    """Shared state of one phase: dataset ids and the weighted request mix."""
+
+    def __init__(self, client, recorder: Recorder, rng: random.Random):
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+        self.product_ids: list[int] = []
+        self.plant_codes: list[str] = []
+        self.product_codes: list[str] = []
+        self.created = 0
+
+    async def call(self, endpoint: str, method: str, path: str, body=None, headers=None, expected=()):
+        start = time.perf_counter()
+        status, raw = await self.client.request(method, path, body, headers)
+        self.recorder.record(endpoint, time.perf_counter() - start, status, expected)
+        return status, raw
+
+    async def refresh_ids(self):
+        _, raw = await self.client.request("GET", f"{API}/products")
+        products = json.loads(raw)
+        _, raw = await self.client.request("GET", f"{API}/plants")
+        self.product_ids = [p["id"] for p in products]
+        self.product_codes = [p["product_id"] for p in products]
+        self.plant_codes = [t["plant_id"] for t in json.loads(raw)]
+
+    # ---- operations ----
+
+    async def list_products(self, user):
+        await self.call("GET /products", "GET", f"{API}/products")
+
+    async def list_plants(self, user):
+        await self.call("GET /plants", "GET", f"{API}/plants")
+
+    async def get_product(self, user):
+        product_id = self.rng.choice(self.product_ids)
+        await self.call("GET /products/{id}", "GET", f"{API}/products/{product_id}", expected=(404,))
+
+    async def status(self, user):
+        await self.call("GET /transfer-plan/status", "GET", f"{API}/transfer-plan/status")
+
+    async def update_product(self, user):
+        product_id = self.rng.choice(self.product_ids)
+        body = {"monthly_demand": float(self.rng.randint(1000, 20000))}
+        await self.call("PUT /products/{id}", "PUT", f"{API}/products/{product_id}", body, expected=(404,))
+
+    async def create_and_delete_product(self, user):
+        self.created += 1
+        body = {
+            "product_id": f"LOADTEST-{user}-{self.created}",
+            "monthly_demand": 100.0,
+            "current_unit_cost": 10.0,
+            "current_plant_id": self.rng.choice(self.plant_codes),
+        }
+        status, raw = await self.call("POST /products", "POST", f"{API}/products", body)
+        if status == 201:
+            product_id = json.loads(raw)["id"]
+            await self.call("DELETE /products/{id}", "DELETE", f"{API}/products/{product_id}", expected=(404,))
+
+    async def load_example(self, user):
+        await self.call("POST /transfer-plan/load-example-data", "POST", f"{API}/transfer-plan/load-example-data")
+        await self.refresh_ids()
+
+    async def generate(self, user):
+        rng = self.rng
+        config = {
+            "objective_function": rng.choice(["minimize_cost", "minimize_cost", "balance_utilization", "multi_objective"]),
+            "allow_fractional_assignment": rng.random() < 0.3,
+            "milp_formulation": "assignment",
+        }
+        if rng.random() < 0.5 and len(self.plant_codes) > 2:
+            config["excluded_plants"] = [rng.choice(self.plant_codes)]
+        if rng.random() < 0.3:
+            config["excluded_products"] = rng.sample(self.product_codes, k=min(2, len(self.product_codes)))
+        await self.call(
+            "POST /transfer-plan/generate", "POST", f"{API}/transfer-plan/generate", config,
+            headers={"X-Client-Id": f"planner-{user}"}, expected=(400, 409),
+        )
+
+
+MIXES = {
+    "crud": {
+        "list_products": 25, "list_plants": 15, "get_product": 25, "status": 10,
+        "update_product": 15, "create_and_delete_product": 10,
+    },
+    "planner": {
+        "list_products": 20, "list_plants": 10, "get_product": 15, "status": 10,
+        "update_product": 10, "generate": 33, "load_example": 2,
+    },
+    "large": {
+        "list_products": 10, "list_plants": 10, "get_product": 20, "status": 10, "generate": 50,
+    },
+}
+
+
+async def setup_phase(workload: Workload, phase: str, args):
+    client = workload.client
+    if phase == "large":
+        products, plants = make_dataset(args.products, args.plants, seed=args.seed)
+        for plant in plants:
+            await client.request("POST", f"{API}/plants", plant)
+        for product in products:
+            await client.request("POST", f"{API}/products", product)
+        # Drop leftovers of earlier phases so only the synthetic catalog remains
+        await workload.refresh_ids()
+        _, raw = await client.request("GET", f"{API}/products")
+        keep = {p["product_id"] for p in products}
+        for p in json.loads(raw):
+            if p["product_id"] not in keep:
+                await client.request("DELETE", f"{API}/products/{p['id']}")
+        _, raw = await client.request("GET", f"{API}/plants")
+        keep = {t["plant_id"] for t in plants}
+        for t in json.loads(raw):
+            if t["plant_id"] not in keep:
+                await client.request("DELETE", f"{API}/plants/{t['id']}")
+    else:
+        await client.request("POST", f"{API}/transfer-plan/load-example-data")
+    await workload.refresh_ids()
+
+
+async def run_phase(client, phase: str, args) -> dict:
+    recorder = Recorder()
+    workload = Workload(client, recorder, random.Random(args.seed))
+    await setup_phase(workload, phase, args)
+    operations = list(MIXES[phase].items())
+    names = [name for name, _ in operations]
+    weights = [weight for _, weight in operations]
+    deadline = time.perf_counter() + args.duration
+
+    async def user(index: int):
+        rng = random.Random(args.seed * 1000 + index)
+        while time.perf_counter() < deadline:
+            await getattr(workload, rng.choices(names, weights)[0])(index)
+            await asyncio.sleep(rng.uniform(0, 2 * args.think_time))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user(i) for i in range(args.users)))
+    return summarize(recorder, time.perf_counter() - start)
+
+
+# ==================== REPORT ====================
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return float("nan")
+    rank = max(1, int(round(q / 100 * len(sorted_values) + 0.5 - 1e-9)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(recorder: Recorder, elapsed: float) -> dict:
+    endpoints = {}
+    for endpoint, samples in sorted(recorder.samples.items()):
+        values = sorted(samples)
+        endpoints[endpoint] = {
+            "requests": len(values),
+            "errors": recorder.errors[endpoint],
+            "rejected": recorder.rejected[endpoint],
+            "rps": len(values) / elapsed,
+            "p50_ms": percentile(values, 50) * 1000,
+            "p95_ms": percentile(values, 95) * 1000,
+            "p99_ms": percentile(values, 99) * 1000,
+        }
+    total = sum(e["requests"] for e in endpoints.values())
+    errors = sum(e["errors"] for e in endpoints.values())
+    return {
+        "elapsed_s": elapsed,
+        "requests": total,
+        "rps": total / elapsed,
+        "error_rate": errors / total if total else 0.0,
+        "rejected": sum(e["rejected"] for e in endpoints.values()),
+        "endpoints": endpoints,
+    }
+
+
+def print_report(report: dict):
+    for phase, result in report["phases"].items():
+        print(f"\n[{phase}] {result['requests']} requests in {result['elapsed_s']:.1f}s "
+              f"({result['rps']:.1f} req/s), error rate {result['error_rate']:.2%}, {result['rejected']} rejected (429)")
+        print(f"  {'endpoint':<40} {'n':>6} {'req/s':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'err':>5} {'429':>5}")
+        for endpoint, e in result["endpoints"].items():
+            print(f"  {endpoint:<40} {e['requests']:>6} {e['rps']:>7.1f} {e['p50_ms']:>9.1f} {e['p95_ms']:>9.1f} "
+                  f"{e['p99_ms']:>9.1f} {e['errors']:>5} {e['rejected']:>5}")
+
+
+def check(report: dict, thresholds: dict, baseline: dict = None) -> list[str]:
+    """Threshold and regression violations (empty when the run passes)."""
+    failures = []
+    max_error_rate = thresholds.get("max_error_rate")
+    max_regression = thresholds.get("max_regression")
+    # Sub-millisecond endpoints jitter by more than any sensible percentage
+    min_regression_ms = thresholds.get("min_regression_ms", 5.0)
+    for phase, result in report["phases"].items():
+        if max_error_rate is not None and result["error_rate"] > max_error_rate:
+            failures.append(f"{phase}: error rate {result['error_rate']:.2%} > {max_error_rate:.2%}")
+        for endpoint, e in result["endpoints"].items():
+            limits = thresholds.get("endpoints", {}).get(endpoint, {})
+            for metric in ("p95_ms", "p99_ms"):
+                if metric in limits and e[metric] > limits[metric]:
+                    failures.append(f"{phase} {endpoint}: {metric} {e[metric]:.1f} > {limits[metric]}")
+            previous = (baseline or {}).get("phases", {}).get(phase, {}).get("endpoints", {}).get(endpoint)
+            if previous and max_regression is not None and previous["p95_ms"] > 0:
+                change = e["p95_ms"] / previous["p95_ms"] - 1
+                if change > max_regression and e["p95_ms"] - previous["p95_ms"] > min_regression_ms:
+                    failures.append(f"{phase} {endpoint}: p95 {e['p95_ms']:.1f} ms is {change:+.0%} "
+                                    f"vs baseline {previous['p95_ms']:.1f} ms (limit {max_regression:+.0%})")
+    return failures
+
+
+# ==================== MAIN ====================
+
+async def run_all(client, args) -> dict:
+    report = {"config": {k: v for k, v in vars(args).items() if k not in ("thresholds", "baseline", "save")},
+              "phases": {}}
+    for phase in args.phases:
+        report["phases"][phase] = await run_phase(client, phase, args)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--phases", nargs="+", choices=PHASES, default=list(PHASES))
+    parser.add_argument("--duration", type=float, default=20, help="seconds per phase")
+    parser.add_argument("--users", type=int, default=8, help="concurrent simulated planners")
+    parser.add_argument("--think-time", type=float, default=0.05, help="mean pause between a user's requests (s)")
+    parser.add_argument("--products", type=int, default=300, help="synthetic catalog size for the large phase")
+    parser.add_argument("--plants", type=int, default=15)
+    parser.add_argument("--seed", type=int, default=0)
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--uvicorn", type=int, metavar="WORKERS", help="start local uvicorn with N workers")
+    target.add_argument("--url", help="base URL of a running server, e.g. http://127.0.0.1:8000")
+    parser.add_argument("--thresholds", help="JSON file with max_error_rate, max_regression, min_regression_ms and per-endpoint p95_ms/p99_ms")
+    parser.add_argument("--baseline", help="report saved with --save to compare p95 against")
+    parser.add_argument("--save", help="write the JSON report here")
+    args = parser.parse_args()
+
+    if args.url:
+        report = asyncio.run(run_all(HttpClient(args.url.rstrip("/"), args.users), args))
+    elif args.uvicorn:
+        with uvicorn_server(args.uvicorn) as base_url:
+            report = asyncio.run(run_all(HttpClient(base_url, args.users), args))
+    else:
+        os.environ.setdefault("SOLVER_WARMUP", "false")
+        os.environ.pop("DATABASE_URL", None)
+        with open(os.devnull, "w") as devnull:
+            # The optimizer prints solver status on every solve
+            stdout, sys.stdout = sys.stdout, devnull
+            try:
+                from app.main import app
+                report = asyncio.run(run_all(AsgiClient(app), args))
+            finally:
+                sys.stdout = stdout
+
+    print_report(report)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+
+    thresholds = {}
+    if args.thresholds:
+        with open(args.thresholds) as f:
+            thresholds = json.load(f)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    failures = check(report, thresholds, baseline)
+    if failures:
+        print("\nFAILED")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    if args.thresholds or args.baseline:
+        print("\nPASSED")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Throughput of ``/transfer-plan/generate`` versus uvicorn worker count.
+
+For every worker count this starts ``uvicorn app.main:app --workers N`` on a
+fresh SQLite database (shared storage is required for more than one worker),
+loads a synthetic dataset and fires two bursts:
+
+- distinct: every request uses a different ``excluded_plants`` set, so each
+  one is a real solve and throughput should scale with the worker count
+- identical: every request is the same, so the cross-worker de-duplication
+  should answer the whole burst in roughly the time of a single solve
+
+Usage (from the ``backend`` directory)::
+
+    python benchmarks/load_test_workers.py --workers 1 2 4 --products 400 --plants 20
+"""
+import argparse
+import itertools
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from synthetic import make_dataset
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _request(base_url: str, method: str, path: str, body=None) -> dict:
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(
+        f"{base_url}{path}", data=data, method=method, headers={"Content-Type": "application/json"}
+    )
+    with urllib.request.urlopen(req, timeout=300) as resp:
+        return json.loads(resp.read() or b"null")
+
+
+def _wait_until_up(base_url: str, timeout: float = 30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            _request(base_url, "GET", "/api/v1/health")
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("uvicorn did not start in time")
+
+
+def _burst(base_url: str, configs: list[dict], concurrency: int) -> float:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(
+            lambda cfg: _request(base_url, "POST", "/api/v1/transfer-plan/generate", cfg), configs
+        ))
+    elapsed = time.perf_counter() - start
+    if not all(r["feasible"] for r in results):
+        print("  warning: some plans were infeasible", file=sys.stderr)
+    return elapsed
+
+
+def run(workers: int, args) -> dict:
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+             "--workers", str(workers), "--log-level", "warning"],
+            cwd=BACKEND_DIR, env=env,
+        )
+        try:
+            _wait_until_up(base_url)
+            products, plants = make_dataset(args.products, args.plants, seed=args.seed)
+            for plant in plants:
+                _request(base_url, "POST", "/api/v1/plants", plant)
+            for product in products:
+                _request(base_url, "POST", "/api/v1/products", product)
+
+            plant_ids = [p["plant_id"] for p in plants]
+            pairs = itertools.islice(itertools.combinations(plant_ids, 2), args.requests)
+            distinct = [{"excluded_plants": list(pair)} for pair in pairs]
+            identical = [{"excluded_plants": [plant_ids[0]]}] * args.requests
+
+            distinct_s = _burst(base_url, distinct, args.concurrency)
+            identical_s = _burst(base_url, identical, args.concurrency)
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+    return {
+        "workers": workers,
+        "distinct_rps": len(distinct) / distinct_s,
+        "distinct_s": distinct_s,
+        "identical_s": identical_s,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--requests", type=int, default=24)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--products", type=int, default=300)
+    parser.add_argument("--plants", type=int, default=15)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}, "
+          f"{args.products} products x {args.plants} plants")
+    print(f"{'workers':>8} {'distinct req/s':>15} {'distinct s':>11} {'identical s':>12}")
+    baseline = None
+    for workers in args.workers:
+        row = run(workers, args)
+        baseline = baseline or row["distinct_rps"]
+        print(f"{row['workers']:>8} {row['distinct_rps']:>15.2f} {row['distinct_s']:>11.2f} "
+              f"{row['identical_s']:>12.2f}   (x{row['distinct_rps'] / baseline:.2f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Volume vs. assignment-only MILP formulation (binary mode, minimize_cost).
+
+- ``volume``: binaries ``y`` plus volume variables ``x`` and one
+  ``Activation`` row (``x <= demand * y``) per feasible pair
+- ``assignment``: binaries only, volume is ``demand * y`` and each product
+  is assigned to exactly one plant
+
+For each instance (the ``test_data`` scenarios plus synthetic catalogs) it
+reports variables, constraints, the LP relaxation bound and its gap to the
+MILP objective (smaller gap = tighter formulation), and wall time for the
+LP relaxation and the MILP. The volume formulation may split a product
+across plants, so its MILP optimum can be lower.
+
+Usage (from the ``backend`` directory)::
+
+    python benchmarks/milp_formulation.py --sizes 500x10 2000x20 --time-limit 60
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pulp import LpStatus, PULP_CBC_CMD  # noqa: E402
+
+from synthetic import make_dataset  # noqa: E402
+from app.schemas.item import Plant, Product, TransferPlanConfig  # noqa: E402
+from app.services.capacity import PairIndex, capacity_rows  # noqa: E402
+from app.services.optimizer import build_problem  # noqa: E402
+from app.services.prefilter import prefilter_pairs  # noqa: E402
+
+TEST_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "test_data")
+
+
+def read_csv(path: str) -> list[dict]:
+    with open(path, newline="") as f:
+        return [{k: v for k, v in row.items() if v not in ("", None)} for row in csv.DictReader(f)]
+
+
+def instances(sizes: list[str]):
+    if os.path.isdir(TEST_DATA_DIR):
+        for name in sorted(os.listdir(TEST_DATA_DIR)):
+            folder = os.path.join(TEST_DATA_DIR, name)
+            if os.path.isfile(os.path.join(folder, "products.csv")):
+                yield name, read_csv(os.path.join(folder, "products.csv")), read_csv(os.path.join(folder, "plants.csv"))
+    for size in sizes:
+        n_products, n_plants = (int(v) for v in size.split("x"))
+        yield f"synthetic {size}", *make_dataset(n_products, n_plants, seed=n_products)
+
+
+def run(products: list[Product], plants: list[Plant], formulation: str, time_limit: int) -> dict:
+    config = TransferPlanConfig(milp_formulation=formulation)
+    start = time.perf_counter()
+    pairs = prefilter_pairs(products, plants, config)
+    index = PairIndex(pairs)
+    model = build_problem(products, plants, config, pairs, index, capacity_rows(products, plants, config, index))
+    build_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    model.prob.solve(PULP_CBC_CMD(msg=0, mip=False))
+    lp_s = time.perf_counter() - start
+    lp_bound = model.prob.objective.value()
+
+    start = time.perf_counter()
+    model.prob.solve(PULP_CBC_CMD(msg=0, timeLimit=time_limit, gapRel=0.01))
+    milp_s = time.perf_counter() - start
+    milp = model.prob.objective.value()
+    return {
+        "variables": len(model.prob.variables()),
+        "constraints": len(model.prob.constraints),
+        "build_s": build_s,
+        "lp_bound": lp_bound,
+        "lp_s": lp_s,
+        "milp": milp,
+        "milp_s": milp_s,
+        "status": LpStatus[model.prob.status],
+        "gap": (milp - lp_bound) / abs(milp) * 100 if milp and lp_bound is not None else float("nan"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", default=["500x10", "2000x20"], help="synthetic PRODUCTSxPLANTS")
+    parser.add_argument("--time-limit", type=int, default=60, help="CBC time limit per MILP solve (s)")
+    args = parser.parse_args()
+
+    print(f"{'instance':>30} {'formulation':>11} {'vars':>7} {'rows':>7} {'build s':>8} {'LP bound':>15} "
+          f"{'MILP obj':>15} {'LP gap %':>9} {'LP s':>7} {'MILP s':>8} {'status':>11}")
+    for name, products_data, plants_data in instances(args.sizes):
+        products = [Product(id=i, **d) for i, d in enumerate(products_data, start=1)]
+        plants = [Plant(id=i, **d) for i, d in enumerate(plants_data, start=1)]
+        for formulation in ("volume", "assignment"):
+            row = run(products, plants, formulation, args.time_limit)
+            print(f"{name:>30} {formulation:>11} {row['variables']:>7} {row['constraints']:>7} {row['build_s']:>8.3f} "
+                  f"{row['lp_bound'] or float('nan'):>15.2f} {row['milp'] or float('nan'):>15.2f} {row['gap']:>9.3f} "
+                  f"{row['lp_s']:>7.3f} {row['milp_s']:>8.3f} {row['status']:>11}")
+
+
+if __name__ == "__main__":
+    main()
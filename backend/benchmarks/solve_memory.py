@@ -0,0 +1,91 @@
+"""
+Solve memory vs. instance size, and the accuracy of the memory estimate.
+
+For each synthetic instance and formulation it runs ``generate_plan``
+under tracemalloc and reports the feasible pairs, the model size, the
+estimated peak (``app.services.solve_memory.estimate_model``) and the
+measured peak of Python allocations. ``--cap`` also shows what the route
+would do with that ``MAX_SOLVE_MEMORY_MB``.
+
+Usage (from the ``backend`` directory)::
+
+    python benchmarks/solve_memory.py --sizes 500x10 2000x20 5000x20
+    python benchmarks/solve_memory.py --sizes 1000x20 --capacity-data --cap 64
+"""
+import argparse
+import contextlib
+import gc
+import io
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import make_dataset  # noqa: E402
+from app.schemas.item import Plant, Product, TransferPlanConfig  # noqa: E402
+from app.services.optimizer import generate_plan  # noqa: E402
+from app.services.prefilter import prefilter_pairs  # noqa: E402
+from app.services.solve_memory import MB, SolveTooLarge, estimate_model, fit_to_cap  # noqa: E402
+
+CONFIGS = {
+    "lp": {"allow_fractional_assignment": True},
+    "milp-volume": {},
+    "milp-assignment": {"milp_formulation": "assignment"},
+    "multi-objective": {"objective_function": "multi_objective"},
+    "balance-flow": {"objective_function": "balance_utilization"},
+}
+
+
+def measure(products: list[Product], plants: list[Plant], config: TransferPlanConfig) -> dict:
+    pairs = prefilter_pairs(products, plants, config)
+    estimate = estimate_model(config, len(pairs), products, plants)
+    gc.collect()
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = generate_plan(products, plants, config, pairs)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "pairs": len(pairs),
+        "engine": estimate.engine,
+        "variables": estimate.variables,
+        "nonzeros": estimate.nonzeros,
+        "estimate_mb": estimate.bytes / MB,
+        "peak_mb": peak / MB,
+        "status": result.solver_status,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", default=["500x10", "2000x20"], help="PRODUCTSxPLANTS")
+    parser.add_argument("--configs", nargs="+", choices=CONFIGS, default=list(CONFIGS))
+    parser.add_argument("--capacity-data", action="store_true", help="add machine hours, floor area and pallets")
+    parser.add_argument("--cap", type=int, help="MAX_SOLVE_MEMORY_MB to evaluate (downgrade policy)")
+    args = parser.parse_args()
+
+    print(f"{'instance':<12} {'config':<16} {'pairs':>8} {'engine':>6} {'vars':>8} {'nonzeros':>9} "
+          f"{'est MB':>8} {'peak MB':>8} {'est/peak':>8}  {'status':<10} {'cap':<}")
+    for size in args.sizes:
+        n_products, n_plants = (int(v) for v in size.split("x"))
+        raw_products, raw_plants = make_dataset(n_products, n_plants, seed=n_products, capacity_data=args.capacity_data)
+        products = [Product(id=i + 1, **p) for i, p in enumerate(raw_products)]
+        plants = [Plant(id=i + 1, **t) for i, t in enumerate(raw_plants)]
+        for name in args.configs:
+            config = TransferPlanConfig(**CONFIGS[name])
+            row = measure(products, plants, config)
+            verdict = ""
+            if args.cap:
+                try:
+                    _, _, note = fit_to_cap(config, row["pairs"], products, plants, args.cap * MB, "downgrade")
+                    verdict = note.split(":")[0] if note else "fits"
+                except SolveTooLarge:
+                    verdict = "rejected (413)"
+            print(f"{size:<12} {name:<16} {row['pairs']:>8} {row['engine']:>6} {row['variables']:>8} "
+                  f"{row['nonzeros']:>9} {row['estimate_mb']:>8.1f} {row['peak_mb']:>8.1f} "
+                  f"{row['estimate_mb'] / row['peak_mb']:>8.2f}  {row['status']:<10} {verdict}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Cold-start profile of the API process.
+
+Runs fresh interpreters (``python -X importtime``) and reports:
+
+- the slowest modules imported by ``import app.main`` (median over runs)
+- time to import the app, to lazily load the optimizer (PuLP), to verify
+  the CBC binary, and to run the first and second solve of the example data
+
+Usage (from the ``backend`` directory)::
+
+    python benchmarks/startup_profile.py --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PHASES = r"""
+import contextlib, io, json, time
+t0 = time.perf_counter()
+import app.main
+t1 = time.perf_counter()
+from app.services import solver_runtime
+optimizer = solver_runtime.get_optimizer()
+t2 = time.perf_counter()
+solver_runtime.verify_solver()
+t3 = time.perf_counter()
+import asyncio
+from app.api.routes.transfer_plans import load_example_data
+from app.schemas.item import TransferPlanConfig
+from app.services.store import store
+asyncio.run(load_example_data())
+snapshot = store.snapshot()
+products, plants = snapshot.product_list, snapshot.plant_list
+with contextlib.redirect_stdout(io.StringIO()):
+    optimizer.generate_plan(products, plants, TransferPlanConfig())
+    t4 = time.perf_counter()
+    optimizer.generate_plan(products, plants, TransferPlanConfig())
+t5 = time.perf_counter()
+print(json.dumps({
+    "import app.main": t1 - t0,
+    "load optimizer (PuLP)": t2 - t1,
+    "verify CBC binary": t3 - t2,
+    "first solve": t4 - t3,
+    "second solve": t5 - t4,
+}))
+"""
+
+
+def import_times(runs: int) -> dict[str, list[float]]:
+    """Cumulative import time in ms per module, one sample per run."""
+    samples: dict[str, list[float]] = {}
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import app.main"],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        )
+        for line in proc.stderr.splitlines():
+            if not line.startswith("import time:") or "imported package" in line:
+                continue
+            parts = line.split("|")
+            try:
+                cumulative = int(parts[1]) / 1000
+            except ValueError:
+                continue
+            samples.setdefault(parts[2].strip(), []).append(cumulative)
+    return samples
+
+
+def phases(runs: int) -> dict[str, list[float]]:
+    samples: dict[str, list[float]] = {}
+    env = dict(os.environ, SOLVER_WARMUP="false")
+    env.pop("DATABASE_URL", None)
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-c", _PHASES], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+        )
+        for name, seconds in json.loads(proc.stdout.strip().splitlines()[-1]).items():
+            samples.setdefault(name, []).append(seconds * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    imports = import_times(args.runs)
+    print(f"Slowest imports under `import app.main` (median cumulative ms, {args.runs} runs)")
+    ranked = sorted(((statistics.median(v), k) for k, v in imports.items()), reverse=True)
+    for ms, module in ranked[:args.top]:
+        print(f"  {ms:9.1f}  {module}")
+    print(f"  pulp imported at startup: {'yes' if 'pulp' in imports else 'no'}")
+
+    print(f"\nCold start phases (median ms, {args.runs} runs)")
+    for name, values in phases(args.runs).items():
+        print(f"  {statistics.median(values):9.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
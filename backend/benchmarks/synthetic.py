@@ -0,0 +1,68 @@
+"""Synthetic products/plants datasets for the benchmark scripts."""
+import random
+
+
+def make_dataset(
+    n_products: int, n_plants: int, seed: int = 0, capacity_data: bool = False,
+) -> tuple[list[dict], list[dict]]:
+    """
+    Build ``n_products`` products spread over ``n_plants`` plants.
+
+    Total effective capacity is ~25% above total demand so the instances
+    are feasible, and costs vary enough that the optimizer has real choices.
+    ``capacity_data`` also fills in machine hours, setup time, floor area and
+    pallet storage, each ~30% above a proportional share of the load.
+    """
+    rng = random.Random(seed)
+    plant_ids = [f"PLANT-{i:03d}" for i in range(n_plants)]
+
+    products = []
+    for i in range(n_products):
+        products.append({
+            "product_id": f"SKU-{i:05d}",
+            "monthly_demand": float(rng.randint(500, 20000)),
+            "current_unit_cost": round(rng.uniform(5, 90), 2),
+            "current_plant_id": rng.choice(plant_ids),
+            "cycle_time_sec": float(rng.randint(20, 180)),
+            "yield_rate": round(rng.uniform(95, 99.9), 1),
+        })
+
+    total_demand = sum(p["monthly_demand"] for p in products)
+    weights = [rng.uniform(0.5, 1.5) for _ in plant_ids]
+    plants = []
+    for plant_id, weight in zip(plant_ids, weights):
+        oee = round(rng.uniform(0.8, 0.95), 2)
+        capacity = total_demand * 1.25 * weight / sum(weights) / oee
+        plants.append({
+            "plant_id": plant_id,
+            "available_capacity": round(max(capacity, 20000.0)),
+            "unit_production_cost": round(rng.uniform(15, 35), 2),
+            "transfer_fixed_cost": float(rng.randint(30, 90) * 1000),
+            "effective_oee": oee,
+            "lead_time_to_start": float(rng.randint(1, 5)),
+            "max_utilization_target": float(rng.randint(80, 95)),
+            "risk_score": round(rng.uniform(0.05, 0.4), 2),
+        })
+    if capacity_data:
+        _add_capacity_data(products, plants, weights, random.Random(seed + 1))
+    return products, plants
+
+
+def _add_capacity_data(products: list[dict], plants: list[dict], weights: list[float], rng: random.Random):
+    total_hours = sum(p["monthly_demand"] * p["cycle_time_sec"] / 3600 / (p["yield_rate"] / 100) for p in products)
+    total_demand = sum(p["monthly_demand"] for p in products)
+    lines_per_plant = len(products) / len(plants)
+    for plant, weight in zip(plants, weights):
+        share = weight / sum(weights)
+        setup_hours = float(rng.randint(2, 12))
+        area_per_product = float(rng.randint(20, 80))
+        pallets_per_unit = round(rng.uniform(0.005, 0.02), 4)
+        plant.update({
+            "available_machine_hours": round(1.3 * (total_hours * share + setup_hours * lines_per_plant)),
+            "setup_time_hours": setup_hours,
+            "changeover_cost": float(rng.randint(1, 10) * 1000),
+            "available_area_m2": round(1.3 * area_per_product * lines_per_plant * len(plants) * share),
+            "area_required_per_product_m2": area_per_product,
+            "warehouse_capacity_pallets": round(1.3 * total_demand * share * pallets_per_unit),
+            "pallets_per_unit": pallets_per_unit,
+        })
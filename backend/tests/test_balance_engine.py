@@ -0,0 +1,49 @@
+"""The flow engine for ``balance_utilization`` reaches the MILP's optimal level."""
+import contextlib
+import io
+
+import pytest
+from synthetic import make_dataset
+
+from app.schemas.item import Plant, Product, TransferPlanConfig
+from app.services import optimizer
+from app.services.balance import utilization_target
+
+
+def level(result, plants: list[Plant]) -> float:
+    """Max plant load relative to its utilization target, in %."""
+    loads = {}
+    for a in result.assignments:
+        loads[a.target_plant_id] = loads.get(a.target_plant_id, 0) + a.assigned_volume
+    return max(
+        loads.get(t.plant_id, 0) / (t.available_capacity * (t.effective_oee or 1.0) * utilization_target(t)) * 100
+        for t in plants
+    )
+
+
+@pytest.mark.parametrize("fractional", [False, True], ids=["binary", "lp"])
+@pytest.mark.parametrize("size", [(12, 4), (60, 6), (150, 8)], ids=lambda s: f"{s[0]}x{s[1]}")
+def test_flow_level_matches_milp(monkeypatch, size, fractional):
+    raw_products, raw_plants = make_dataset(*size, seed=size[0])
+    products = [Product(id=i, **p) for i, p in enumerate(raw_products, start=1)]
+    plants = [Plant(id=i, **t) for i, t in enumerate(raw_plants, start=1)]
+    flow_calls = []
+    solve_balance = optimizer.solve_balance
+    monkeypatch.setattr(optimizer, "solve_balance", lambda *a, **k: flow_calls.append(1) or solve_balance(*a, **k))
+
+    results = {}
+    for engine in ("auto", "milp"):
+        config = TransferPlanConfig(
+            objective_function="balance_utilization", allow_fractional_assignment=fractional, solver_engine=engine,
+        )
+        with contextlib.redirect_stdout(io.StringIO()):
+            results[engine] = optimizer.generate_plan(products, plants, config)
+
+    assert flow_calls == [1]
+    assert results["auto"].feasible and results["milp"].feasible
+    for result in results.values():
+        served = {}
+        for a in result.assignments:
+            served[a.product_id] = served.get(a.product_id, 0) + a.assigned_volume
+        assert served == pytest.approx({p.product_id: p.monthly_demand for p in products})
+    assert level(results["auto"], plants) == pytest.approx(level(results["milp"], plants), rel=1e-4, abs=1e-4)
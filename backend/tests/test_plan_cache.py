@@ -0,0 +1,47 @@
+"""Regression tests for plan cache shortcuts on exclusion what-ifs."""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+from app.schemas.item import TransferPlanConfig
+from app.services.optimizer import generate_plan
+from app.services.store import store
+
+GENERATE = f"{settings.API_V1_STR}/transfer-plan/generate"
+LOAD_EXAMPLE = f"{settings.API_V1_STR}/transfer-plan/load-example-data"
+
+
+@pytest.fixture
+def client():
+    client = TestClient(app)
+    assert client.post(LOAD_EXAMPLE).status_code == 200
+    return client
+
+
+def cold_solve(config: dict) -> dict:
+    snapshot = store.snapshot()
+    return generate_plan(snapshot.product_list, snapshot.plant_list, TransferPlanConfig(**config)).model_dump()
+
+
+@pytest.mark.parametrize("deterministic", [False, True])
+def test_excluding_unservable_products_is_not_answered_by_an_infeasible_subset(client, deterministic):
+    # Excluding Michigan leaves two products that can only stay there: infeasible
+    base = {"excluded_plants": ["PLANT-US-MICHIGAN"], "deterministic": deterministic}
+    first = client.post(GENERATE, json=base).json()
+    assert first["feasible"] is False
+
+    # Excluding those products too drops them from the model, which makes it feasible
+    what_if = {**base, "excluded_products": ["SENSOR-OXY400", "VALVE-EGR600"]}
+    second = client.post(GENERATE, json=what_if).json()
+    cold = cold_solve(what_if)
+    assert cold["feasible"] is True
+    assert second["feasible"] is True
+    assert second["plan_source"] != "cache"
+    assert second["total_cost"] == pytest.approx(cold["total_cost"])
+
+
+def test_exact_repeat_is_served_from_cache(client):
+    config = {"excluded_plants": ["PLANT-US-MICHIGAN"]}
+    client.post(GENERATE, json=config)
+    assert client.post(GENERATE, json=config).json()["plan_source"] == "cache"
@@ -0,0 +1,59 @@
+"""Saving plans from generate, columnar round trips and plan diffs."""
+import csv
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+
+API = settings.API_V1_STR
+
+
+@pytest.fixture
+def client():
+    client = TestClient(app)
+    assert client.post(f"{API}/transfer-plan/load-example-data").status_code == 200
+    return client
+
+
+def generate(client, name, config):
+    response = client.post(f"{API}/transfer-plan/generate", params={"save_as": name, "session_id": "s"}, json=config)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_saved_plan_round_trips(client):
+    result = generate(client, "Base", {})
+    saved = client.get(f"{API}/plans/{result['plan_id']}").json()
+    assert saved["name"] == "Base" and saved["session_id"] == "s"
+    assert saved["dataset_version"] == result["dataset_version"]
+    assert saved["result"]["fingerprint"] == result["fingerprint"]
+    assert saved["result"]["assignments"] == result["assignments"]
+
+    rows = list(csv.DictReader(io.StringIO(client.get(f"{API}/plans/{result['plan_id']}/export").text)))
+    assert len(rows) == len(result["assignments"])
+    # Plans can only be saved by the server
+    assert client.post(f"{API}/plans", json={"name": "x", "config": {}, "result": result}).status_code == 405
+
+
+def test_diff_matches_the_two_results(client):
+    base = generate(client, "Base", {})
+    what_if = generate(client, "No Michigan", {
+        "excluded_plants": ["PLANT-US-MICHIGAN"],
+        "excluded_products": ["SENSOR-OXY400", "VALVE-EGR600"],
+    })
+    diff = client.get(f"{API}/plans/{base['plan_id']}/diff/{what_if['plan_id']}").json()
+
+    def targets(result):
+        plants = {}
+        for a in result["assignments"]:
+            plants.setdefault(a["product_id"], set()).add(a["target_plant_id"])
+        return plants
+
+    before, after = targets(base), targets(what_if)
+    moved = {p for p in before.keys() | after.keys() if before.get(p) != after.get(p)}
+    assert {m["product_id"] for m in diff["moved_products"]} == moved
+    assert diff["same_dataset"] is True
+    assert diff["total_cost_delta"] == pytest.approx(what_if["total_cost"] - base["total_cost"], abs=0.01)
@@ -0,0 +1,42 @@
+"""Incremental portfolio aggregates agree with a summary rebuilt from scratch."""
+import random
+
+from synthetic import make_dataset
+
+from app.schemas.item import ProductCreate
+from app.services.portfolio import PortfolioSummaryCache
+from app.services.store import MemoryStore
+
+
+def test_incremental_summary_matches_a_full_rebuild():
+    rng = random.Random(7)
+    store = MemoryStore()
+    products, plants = make_dataset(40, 5, seed=7)
+    store.replace_dataset(products, plants)
+    plant_ids = [t["plant_id"] for t in plants] + ["PLANT-GONE", None]
+    incremental = PortfolioSummaryCache()
+    incremental.advance(store.snapshot())
+
+    for step in range(150):
+        ids = list(store.snapshot().products)
+        action = rng.random()
+        if action < 0.4 and ids:
+            store.products.update(rng.choice(ids), {
+                "monthly_demand": float(rng.randint(100, 30000)),
+                "current_plant_id": rng.choice(plant_ids),
+            })
+        elif action < 0.7 and ids:
+            store.products.delete(rng.choice(ids))
+        else:
+            store.products.upsert(ProductCreate(
+                product_id=f"NEW-{step}", monthly_demand=float(rng.randint(100, 30000)),
+                current_unit_cost=10.0, current_plant_id=rng.choice(plant_ids),
+            ))
+        if step % 3 == 0:
+            incremental.advance(store.snapshot())
+
+        snapshot = store.snapshot()
+        assert incremental.summary(snapshot) == PortfolioSummaryCache().summary(snapshot)
+
+    assert incremental.stats["full_builds"] == 1
+    assert incremental.stats["incremental_updates"] > 0
@@ -0,0 +1,113 @@
+"""Solve scheduler limits and single-solve de-duplication of generate requests."""
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.routes import transfer_plans
+from app.core.config import settings
+from app.main import app
+from app.services.cbc import SolveCancelled
+from app.services.scheduler import BATCH, INTERACTIVE, SchedulerOverloaded, SolveScheduler, scheduler
+from app.services.solver_runtime import get_optimizer
+
+GENERATE = f"{settings.API_V1_STR}/transfer-plan/generate"
+
+
+def make_scheduler(**limits) -> SolveScheduler:
+    return SolveScheduler(**{
+        "max_running": 1, "max_large": 1, "max_per_client": 2, "max_queued": 4, "large_threshold": 1000, **limits,
+    })
+
+
+def test_interactive_requests_are_granted_before_batch():
+    async def scenario():
+        sched = make_scheduler()
+        order = []
+
+        async def request(request_id, priority, hold):
+            async with sched.slot(request_id, request_id, priority, 10):
+                order.append(request_id)
+                await hold.wait()
+
+        first_done, rest_done = asyncio.Event(), asyncio.Event()
+        rest_done.set()
+        first = asyncio.ensure_future(request("first", BATCH, first_done))
+        await asyncio.sleep(0)
+        batch = asyncio.ensure_future(request("batch", BATCH, rest_done))
+        interactive = asyncio.ensure_future(request("interactive", INTERACTIVE, rest_done))
+        await asyncio.sleep(0)
+        assert sched.status()["queued"] == {INTERACTIVE: 1, BATCH: 1}
+        first_done.set()
+        await asyncio.gather(first, batch, interactive)
+        return order
+
+    assert asyncio.run(scenario()) == ["first", "interactive", "batch"]
+
+
+def test_per_client_limit_and_queued_cancel():
+    async def scenario():
+        sched = make_scheduler(max_per_client=1)
+        hold = asyncio.Event()
+
+        async def request(request_id, client_id):
+            async with sched.slot(request_id, client_id, INTERACTIVE, 10):
+                await hold.wait()
+
+        running = asyncio.ensure_future(request("a", "client-1"))
+        await asyncio.sleep(0)
+        with pytest.raises(SchedulerOverloaded):
+            async with sched.slot("b", "client-1", INTERACTIVE, 10):
+                pass
+        queued = asyncio.ensure_future(request("c", "client-2"))
+        await asyncio.sleep(0)
+        assert sched.cancel("c")
+        with pytest.raises(SolveCancelled):
+            await queued
+        hold.set()
+        await running
+        return sched.status()
+
+    status = asyncio.run(scenario())
+    assert status["rejected"] == 1 and status["cancelled"] == 1
+    assert status["running"] == 0 and status["queued"] == {INTERACTIVE: 0, BATCH: 0}
+
+
+class _CountingOptimizer:
+    """Wraps the optimizer; each solve takes at least ``delay`` seconds so requests overlap."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.solves = 0
+
+    def generate_plan(self, *args, **kwargs):
+        self.solves += 1
+        time.sleep(self.delay)
+        return get_optimizer().generate_plan(*args, **kwargs)
+
+
+def test_identical_concurrent_requests_share_one_solve(monkeypatch):
+    TestClient(app).post(f"{settings.API_V1_STR}/transfer-plan/load-example-data")
+    optimizer = _CountingOptimizer(delay=0.5)
+    monkeypatch.setattr(transfer_plans, "get_optimizer", lambda: optimizer)
+    # A single solve slot: followers must not queue behind the leader and solve again
+    monkeypatch.setattr(scheduler, "max_running", 1)
+
+    async def burst(n):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(
+                client.post(GENERATE, json={"discount_rate": 0.07}, headers={"X-Client-ID": f"client-{i}"})
+                for i in range(n)
+            ))
+
+    start = time.perf_counter()
+    responses = asyncio.run(burst(5))
+    elapsed = time.perf_counter() - start
+
+    assert [r.status_code for r in responses] == [200] * 5
+    assert optimizer.solves == 1
+    assert len({r.json()["fingerprint"] for r in responses}) == 1
+    assert elapsed < 5 * optimizer.delay
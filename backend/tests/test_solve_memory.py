@@ -0,0 +1,41 @@
+"""The memory estimate lays out the model the optimizer actually builds."""
+import pytest
+from synthetic import make_dataset
+
+from app.schemas.item import Plant, Product, TransferPlanConfig
+from app.services.capacity import PairIndex, capacity_rows
+from app.services.prefilter import prefilter_pairs
+from app.services.solve_memory import estimate_model
+
+ALL_FAMILIES = ["machine_hours", "floor_area", "pallet_storage"]
+
+
+def dataset(capacity_data: bool, limits_only: bool = False):
+    raw_products, raw_plants = make_dataset(60, 5, seed=3, capacity_data=capacity_data)
+    if limits_only:
+        # Limits without coefficients, like the example data: no capacity rows at all
+        for t in raw_plants:
+            t.update(available_machine_hours=500.0, available_area_m2=900.0, warehouse_capacity_pallets=400.0,
+                     setup_time_hours=None, area_required_per_product_m2=None, pallets_per_unit=None)
+        for p in raw_products:
+            p["cycle_time_sec"] = None
+    products = [Product(id=i + 1, **p) for i, p in enumerate(raw_products)]
+    plants = [Plant(id=i + 1, **t) for i, t in enumerate(raw_plants)]
+    return products, plants
+
+
+@pytest.mark.parametrize("capacity_data,limits_only", [(True, False), (False, True)])
+def test_capacity_rows_match_the_model(capacity_data, limits_only):
+    products, plants = dataset(capacity_data, limits_only)
+    config = TransferPlanConfig(capacity_constraints=ALL_FAMILIES)
+    pairs = prefilter_pairs(products, plants, config)
+    built = capacity_rows(products, plants, config, PairIndex(pairs))
+    plain = estimate_model(config.model_copy(update={"capacity_constraints": []}), len(pairs), products, plants)
+    estimate = estimate_model(config, len(pairs), products, plants)
+    assert estimate.rows - plain.rows == len(built)
+
+
+def test_limits_without_coefficients_keep_balance_on_the_flow_engine():
+    products, plants = dataset(capacity_data=False, limits_only=True)
+    config = TransferPlanConfig(objective_function="balance_utilization", capacity_constraints=ALL_FAMILIES)
+    assert estimate_model(config, 1_000_000, products, plants).engine == "flow"
@@ -0,0 +1,42 @@
+"""Smoke tests for the storage backends and dataset snapshots."""
+import pytest
+from synthetic import make_dataset
+
+from app.schemas.item import ProductUpdate
+from app.services.store import MemoryStore, SqliteStore, diff_snapshots
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    return MemoryStore() if request.param == "memory" else SqliteStore(str(tmp_path / "store.db"))
+
+
+def test_replace_dataset_is_a_single_version(store):
+    products, plants = make_dataset(30, 4, seed=1)
+    before = store.snapshot().version
+    store.replace_dataset(products, plants)
+
+    snapshot = store.snapshot()
+    assert snapshot.version == before + 1
+    assert len(snapshot.products) == 30 and len(snapshot.plants) == 4
+    # Ids restart from 1 on every replace
+    store.replace_dataset(products[:5], plants)
+    assert sorted(store.snapshot().products) == [1, 2, 3, 4, 5]
+
+
+def test_snapshots_are_immutable_and_diffable(store):
+    products, plants = make_dataset(20, 3, seed=2)
+    store.replace_dataset(products, plants)
+    old = store.snapshot()
+
+    store.products.update(1, ProductUpdate(monthly_demand=1.0).model_dump(exclude_unset=True))
+    store.products.delete(2)
+    new = store.snapshot()
+
+    assert old.products[1].monthly_demand == products[0]["monthly_demand"]
+    assert 2 in old.products and 2 not in new.products
+    assert store.get_snapshot(old.version) is not None
+    diff = diff_snapshots(old, new)
+    assert diff["products"] == {"added": [], "removed": [products[1]["product_id"]],
+                                "changed": [products[0]["product_id"]]}
+    assert diff["plants"] == {"added": [], "removed": [], "changed": []}
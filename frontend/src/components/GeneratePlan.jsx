@@ -1,7 +1,7 @@
 import { useState, useEffect } from 'react';
 import { api } from '../services/api';
 
-function GeneratePlan({ onPrev, onNext, onPlanGenerated, hasResult }) {
+function GeneratePlan({ onPrev, onNext, onPlanGenerated, hasResult, saveAs }) {
   const [status, setStatus] = useState({ type: '', message: '' });
   const [loading, setLoading] = useState(false);
   const [products, setProducts] = useState([]);
@@ -21,6 +21,15 @@ function GeneratePlan({ onPrev, onNext, onPlanGenerated, hasResult }) {
       } catch (error) {
         console.error('Failed to fetch data:', error);
       }
+      try {
+        // Quick server-side check: no plan can serve every product if any issue is reported
+        const summary = await api.getPortfolioSummary();
+        if (summary.infeasible) {
+          setStatus({ type: 'error', message: `Check your data before generating: ${summary.issues.join('; ')}` });
+        }
+      } catch (error) {
+        console.error('Failed to fetch summary:', error);
+      }
     };
     fetchData();
   }, []);
@@ -67,7 +76,7 @@ function GeneratePlan({ onPrev, onNext, onPlanGenerated, hasResult }) {
     };
 
     try {
-      const result = await api.generateTransferPlan(config);
+      const result = await api.generateTransferPlan(config, saveAs);
       setStatus({
         type: 'success',
         message: `Transfer plan generated successfully! (${result.optimization_time_seconds}s)`
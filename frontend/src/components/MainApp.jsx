@@ -6,13 +6,21 @@ import Results from './Results';
 function MainApp({ session, onUpdateSession }) {
   const [currentStep, setCurrentStep] = useState(1);
   const [transferPlanResult, setTransferPlanResult] = useState(null);
+  const [savedPlanId, setSavedPlanId] = useState(null);
 
   const goToStep = (step) => {
     setCurrentStep(step);
   };
 
+  // The server saves every generated plan, so plans can be listed and compared without re-solving
+  const saveAs = {
+    name: session?.name || 'Transfer plan',
+    sessionId: session?.id != null ? String(session.id) : null
+  };
+
   const handlePlanGenerated = (result) => {
     setTransferPlanResult(result);
+    setSavedPlanId(result.plan_id ?? null);
     setTimeout(() => goToStep(3), 1500);
   };
 
@@ -35,12 +43,14 @@ function MainApp({ session, onUpdateSession }) {
               onNext={() => goToStep(3)}
               onPlanGenerated={handlePlanGenerated}
               hasResult={!!transferPlanResult}
+              saveAs={saveAs}
             />
           )}
 
           {currentStep === 3 && (
             <Results
               result={transferPlanResult}
+              planId={savedPlanId}
               onPrev={() => goToStep(2)}
               onStartOver={() => goToStep(1)}
             />
@@ -1,12 +1,24 @@
 import { PieChart, Pie, Cell, BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer } from 'recharts';
+import { api } from '../services/api';
 
-function Results({ result, onPrev, onStartOver }) {
+function Results({ result, planId, onPrev, onStartOver }) {
   const exportToCSV = () => {
     if (!result || !result.assignments || result.assignments.length === 0) {
       alert('No data to export');
       return;
     }
 
+    // Saved plans are streamed (compressed) by the server instead of built in the browser
+    if (planId != null) {
+      const link = document.createElement('a');
+      link.setAttribute('href', api.exportPlanUrl(planId, 'csv'));
+      link.style.visibility = 'hidden';
+      document.body.appendChild(link);
+      link.click();
+      document.body.removeChild(link);
+      return;
+    }
+
     // Define CSV headers
     const headers = [
       'Product ID',
@@ -361,10 +373,11 @@ function Results({ result, onPrev, onStartOver }) {
 
       </div>
 
-      {result.constraints_violated.length > 0 && (
+      {(result.constraints_violated.length > 0 || result.memory_downgrade) && (
         <div className="alert alert-info">
           <h4>Notes:</h4>
           <ul>
+            {result.memory_downgrade && <li>{result.memory_downgrade}</li>}
             {result.constraints_violated.map((c, i) => <li key={i}>{c}</li>)}
           </ul>
         </div>
@@ -87,8 +87,19 @@ export const api = {
   },
 
   // Transfer Plan
-  async generateTransferPlan(config) {
-    const response = await fetch(`${API_BASE_URL}/transfer-plan/generate`, {
+  async getPortfolioSummary() {
+    const response = await fetch(`${API_BASE_URL}/transfer-plan/summary`);
+    if (!response.ok) throw new Error(`HTTP ${response.status}`);
+    return response.json();
+  },
+
+  // With saveAs ({ name, sessionId }) the server also saves the plan and returns its plan_id
+  async generateTransferPlan(config, saveAs = null) {
+    const params = new URLSearchParams();
+    if (saveAs?.name) params.set('save_as', saveAs.name);
+    if (saveAs?.sessionId) params.set('session_id', saveAs.sessionId);
+    const query = params.toString() ? `?${params}` : '';
+    const response = await fetch(`${API_BASE_URL}/transfer-plan/generate${query}`, {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
       body: JSON.stringify(config)
@@ -98,6 +109,24 @@ export const api = {
       throw new Error(error.detail || 'Failed to generate transfer plan');
     }
     return response.json();
+  },
+
+  // Saved plans
+  async getPlans(sessionId) {
+    const query = sessionId ? `?session_id=${encodeURIComponent(sessionId)}` : '';
+    const response = await fetch(`${API_BASE_URL}/plans${query}`);
+    if (!response.ok) throw new Error(`HTTP ${response.status}`);
+    return response.json();
+  },
+
+  exportPlanUrl(planId, format = 'csv') {
+    return `${API_BASE_URL}/plans/${planId}/export?format=${format}`;
+  },
+
+  async diffPlans(planA, planB) {
+    const response = await fetch(`${API_BASE_URL}/plans/${planA}/diff/${planB}`);
+    if (!response.ok) throw new Error(`HTTP ${response.status}`);
+    return response.json();
   }
 };
 